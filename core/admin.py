@@ -1,5 +1,6 @@
 from django.contrib import admin
-from .models import StockPrice, CorporateAction
+from .models import StockPrice, CorporateAction, TradingDay, AdjustmentFactor
+from .models import IngestionCheckpoint
 
 @admin.register(StockPrice)
 class StockPriceAdmin(admin.ModelAdmin):
@@ -11,3 +12,21 @@ class StockPriceAdmin(admin.ModelAdmin):
 class CorporateActionAdmin(admin.ModelAdmin):
     list_display = ("symbol", "ex_date", "action_type", "factor", "cash_value")
     list_filter = ("symbol", "action_type")
+
+
+@admin.register(TradingDay)
+class TradingDayAdmin(admin.ModelAdmin):
+    list_display = ("trade_date", "is_open")
+    list_filter = ("is_open",)
+
+
+@admin.register(AdjustmentFactor)
+class AdjustmentFactorAdmin(admin.ModelAdmin):
+    list_display = ("symbol", "seq", "ex_date", "action_type", "cum_factor", "cum_dividend")
+    list_filter = ("action_type",)
+    search_fields = ("symbol",)
+
+
+@admin.register(IngestionCheckpoint)
+class IngestionCheckpointAdmin(admin.ModelAdmin):
+    list_display = ("name", "last_trade_date", "updated_at")
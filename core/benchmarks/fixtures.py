@@ -0,0 +1,224 @@
+# core/benchmarks/fixtures.py
+
+import io
+import threading
+import zipfile
+from datetime import timedelta
+from datetime import date as date_cls
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# NSE switched the cash-market archive to the UDiFF file on this date.
+UDIFF_SINCE = date_cls(2024, 7, 8)
+
+
+def symbol_names(n):
+    return [f"SYM{i:05d}" for i in range(n)]
+
+
+def trading_days(start, count):
+    """
+    `count` weekdays from start (inclusive).
+    """
+    days = []
+    day = start
+    while len(days) < count:
+        if day.weekday() < 5:
+            days.append(day)
+        day += timedelta(days=1)
+    return days
+
+
+def closes(day, n):
+    """
+    Deterministic closes for n symbols on a day; identical across runs
+    so that timings from different commits are comparable.
+    """
+    rng = np.random.default_rng(day.toordinal())
+    base = 100 + np.arange(n) % 900
+    return np.round(base * (1 + rng.normal(0, 0.02, n)), 2)
+
+
+def archive_name(day):
+    if day >= UDIFF_SINCE:
+        return f"BhavCopy_NSE_CM_0_0_0_{day.strftime('%Y%m%d')}_F_0000.csv.zip"
+    return f"cm{day.strftime('%d%b%Y').upper()}bhav.csv.zip"
+
+
+def bhavcopy_csv(day, n):
+    """
+    A bhavcopy CSV for n symbols in the schema NSE used on that day.
+    """
+    names = symbol_names(n)
+    close = closes(day, n)
+
+    if day >= UDIFF_SINCE:
+        frame = pd.DataFrame({
+            "TradDt": day.isoformat(),
+            "BizDt": day.isoformat(),
+            "Sgmt": "CM",
+            "Src": "NSE",
+            "FinInstrmTp": "STK",
+            "FinInstrmId": np.arange(n),
+            "ISIN": "INE000000000",
+            "TckrSymb": names,
+            "SctySrs": "EQ",
+            "OpnPric": close,
+            "HghPric": close,
+            "LwPric": close,
+            "ClsPric": close,
+            "TtlTradgVol": 1000,
+        })
+    else:
+        frame = pd.DataFrame({
+            "SYMBOL": names,
+            "SERIES": "EQ",
+            "OPEN": close,
+            "HIGH": close,
+            "LOW": close,
+            "CLOSE": close,
+            "LAST": close,
+            "PREVCLOSE": close,
+            "TOTTRDQTY": 1000,
+            "TIMESTAMP": day.strftime("%d-%b-%Y").upper(),
+        })
+
+    return frame.to_csv(index=False)
+
+
+def bhavcopy_zip(day, n):
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w", zipfile.ZIP_DEFLATED) as z:
+        z.writestr(archive_name(day)[:-4], bhavcopy_csv(day, n))
+    return buf.getvalue()
+
+
+class FixtureServer:
+    """
+    Local stand-in for archives.nseindia.com: serves archives by file
+    name under /content/cm/ (either URL format), 404 for anything else.
+    Use as a context manager; base_url goes into NSE_ARCHIVE_BASE_URL.
+    """
+
+    def __init__(self, archives=None):
+        self.archives = dict(archives or {})
+        self.requests = 0
+
+        fixture = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                fixture.requests += 1
+                body = fixture.archives.get(self.path.rsplit("/", 1)[-1])
+
+                if body is None:
+                    self.send_response(404)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+
+                self.send_response(200)
+                self.send_header("Content-Type", "application/zip")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address
+        return f"http://{host}:{port}/content/cm/"
+
+    def add_days(self, days, n):
+        for day in days:
+            self.archives[archive_name(day)] = bhavcopy_zip(day, n)
+
+    def add_recorded(self, directory):
+        """
+        Serves every recorded *.csv.zip in directory under its own name.
+        """
+        for path in Path(directory).glob("*.csv.zip"):
+            self.archives[path.name] = path.read_bytes()
+
+    def __enter__(self):
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+def yahoo_download(tickers, start, end, auto_adjust=False, progress=False):
+    """
+    Offline stand-in for yfinance.download: deterministic closes for
+    every weekday in [start, end), in yfinance's multi-ticker layout.
+    """
+    tickers = list(tickers)
+    index = pd.bdate_range(start, pd.Timestamp(end) - timedelta(days=1))
+
+    matrix = np.array([closes(day.date(), len(tickers)) for day in index])
+
+    data = {
+        ("Close", ticker): matrix[:, i] if len(index) else []
+        for i, ticker in enumerate(tickers)
+    }
+
+    return pd.DataFrame(data, index=index)
+
+
+def write_price_csv(path, days, n):
+    """
+    One bhavcopy-style CSV (SYMBOL, SERIES, TIMESTAMP, CLOSE) covering
+    every day, as consumed by import_stock_prices.
+    """
+    frames = [
+        pd.DataFrame({
+            "SYMBOL": symbol_names(n),
+            "SERIES": "EQ",
+            "TIMESTAMP": day.strftime("%d-%b-%Y").upper(),
+            "CLOSE": closes(day, n),
+        })
+        for day in days
+    ]
+    pd.concat(frames).to_csv(path, index=False)
+
+
+def write_actions_csv(path, days, n):
+    """
+    An NSE corporate-actions CSV with a dividend for every symbol and a
+    split / bonus for every tenth one, spread over days.
+    """
+    rows = []
+    for i, symbol in enumerate(symbol_names(n)):
+        ex_date = days[i % len(days)].strftime("%d-%b-%Y")
+        rows.append((symbol, "Dividend - Rs 2 Per Share", ex_date))
+        if i % 10 == 0:
+            rows.append((symbol, "Bonus 1:1", ex_date))
+        elif i % 10 == 5:
+            rows.append((
+                symbol,
+                "Face Value Split (Sub-Division) - From Rs 10/- Per Share To Rs 2/- Per Share",
+                ex_date,
+            ))
+
+    pd.DataFrame({
+        "SYMBOL": [r[0] for r in rows],
+        "COMPANY NAME": [r[0] for r in rows],
+        "SERIES": "EQ",
+        "PURPOSE": [r[1] for r in rows],
+        "FACE VALUE": "10",
+        "EX-DATE": [r[2] for r in rows],
+        "RECORD DATE": "",
+    }).to_csv(path, index=False)
@@ -0,0 +1,68 @@
+# core/benchmarks/runner.py
+
+import time
+
+import numpy as np
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+PERCENTILES = (50, 90, 99)
+
+
+def measure(name, size, fn, repeat=5, setup=None):
+    """
+    Runs fn `repeat` times (setup before each run, untimed) and returns
+    latency percentiles in milliseconds plus the median query count.
+    """
+    timings = []
+    queries = []
+
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+
+        # The log is a bounded deque; a full one would read as 0 queries.
+        connection.queries_log.clear()
+
+        with CaptureQueriesContext(connection) as captured:
+            started = time.perf_counter()
+            fn()
+            timings.append((time.perf_counter() - started) * 1000)
+
+        queries.append(len(captured))
+
+    timings = np.array(timings)
+
+    result = {"name": name, "size": size, "repeat": repeat}
+    for p in PERCENTILES:
+        result[f"p{p}_ms"] = round(float(np.percentile(timings, p)), 3)
+    result["mean_ms"] = round(float(timings.mean()), 3)
+    result["min_ms"] = round(float(timings.min()), 3)
+    result["max_ms"] = round(float(timings.max()), 3)
+    result["queries"] = int(np.median(queries))
+
+    return result
+
+
+def compare(baseline, current, metric="p50_ms"):
+    """
+    Rows of (name, size, baseline, current, ratio) for benchmarks present
+    in both reports; ratio > 1 means slower than the baseline.
+    """
+    before = {(r["name"], r["size"]): r for r in baseline["results"]}
+
+    rows = []
+    for r in current["results"]:
+        old = before.get((r["name"], r["size"]))
+        if old is None:
+            continue
+
+        rows.append((
+            r["name"],
+            r["size"],
+            old[metric],
+            r[metric],
+            r[metric] / old[metric] if old[metric] else None,
+        ))
+
+    return rows
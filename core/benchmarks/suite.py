@@ -0,0 +1,323 @@
+# core/benchmarks/suite.py
+
+import io
+import os
+import platform
+import random
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from datetime import date as date_cls
+from datetime import datetime, timezone
+from decimal import Decimal
+
+import django
+from django.conf import settings
+from django.core.cache import caches
+from django.core.management import call_command
+from django.db import OperationalError, connection
+from django.test import Client
+from django.test.utils import override_settings
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from core.benchmarks import fixtures
+from core.benchmarks.runner import measure
+from core.models import AdjustmentFactor
+from core.models import CorporateAction
+from core.models import StockPrice
+from core.models import TradingDay
+from core.services import adjustment_index
+from core.services import bhavcopy_cache
+from core.services import nse_price_provider
+from core.services import trading_calendar
+from core.services import yahoo_price_provider
+from core.services.returns import calculate_portfolio_return
+
+DEFAULT_SIZES = (100, 1000, 5000)
+
+# Fixed window so that every run (and every commit) does the same work.
+START = date_cls(2024, 6, 24)
+DAYS = 20
+
+
+@contextmanager
+def environment(fixtures_dir=None, file_db=False):
+    """
+    Throwaway test database, temporary caches, the fixture NSE server and
+    the yfinance stub. Nothing touches the real database or network.
+    file_db puts a SQLite test database on disk (it is in-memory by
+    default), so that several connections can use it concurrently.
+    """
+    workdir = tempfile.mkdtemp(prefix="stockengine-bench-")
+    server = fixtures.FixtureServer()
+    if fixtures_dir:
+        server.add_recorded(fixtures_dir)
+
+    test_settings = connection.settings_dict.setdefault("TEST", {})
+    test_name = test_settings.get("NAME")
+    if file_db and connection.vendor == "sqlite":
+        test_settings["NAME"] = os.path.join(workdir, "bench.sqlite3")
+
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+
+    try:
+        with server, override_settings(
+            NSE_ARCHIVE_BASE_URL=server.base_url,
+            BHAVCOPY_CACHE_DIR=os.path.join(workdir, "bhavcopy"),
+            PRICE_STORE_DIR=os.path.join(workdir, "price_store"),
+            INGEST_LOCK_DIR=workdir,
+        ):
+            yahoo_price_provider.set_downloader(fixtures.yahoo_download)
+            yield server, workdir
+    finally:
+        yahoo_price_provider.set_downloader(None)
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        test_settings["NAME"] = test_name
+        teardown_test_environment()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def reset_state(workdir=None, tables=True):
+    """
+    Back to a cold process: empty tables, in-memory caches and (when
+    workdir is given) the on-disk bhavcopy cache.
+    """
+    if tables:
+        for model in (StockPrice, CorporateAction, AdjustmentFactor, TradingDay):
+            model.objects.all().delete()
+
+    if workdir:
+        shutil.rmtree(os.path.join(workdir, "bhavcopy"), ignore_errors=True)
+
+    for alias in settings.CACHES:
+        caches[alias].clear()
+
+    bhavcopy_cache.clear_frames()
+    yahoo_price_provider.clear_cache()
+    adjustment_index.invalidate()
+    trading_calendar.load(force=True)
+
+
+def _quiet(*args, **kwargs):
+    call_command(*args, stdout=io.StringIO(), stderr=io.StringIO(), **kwargs)
+
+
+def run(sizes=DEFAULT_SIZES, repeat=5, fixtures_dir=None):
+    """
+    Runs every benchmark at every dataset size (symbols per bhavcopy).
+    Returns a JSON-serialisable report.
+    """
+    days = fixtures.trading_days(START, DAYS)
+    start_key = days[0].strftime("%Y-%m-%d")
+    end_key = days[-1].strftime("%Y-%m-%d")
+
+    results = []
+
+    with environment(fixtures_dir) as (server, workdir):
+        for size in sizes:
+            server.add_days(days, size)
+            symbol = fixtures.symbol_names(size)[size // 2]
+
+            prices_csv = os.path.join(workdir, f"prices-{size}.csv")
+            actions_csv = os.path.join(workdir, f"actions-{size}.csv")
+            fixtures.write_price_csv(prices_csv, days, size)
+            fixtures.write_actions_csv(actions_csv, days, size)
+
+            reset_state(workdir)
+            nse_price_provider.fetch_bhavcopy_archive(end_key)
+
+            results.append(measure(
+                "bhavcopy_parse", size,
+                lambda: nse_price_provider.download_bhavcopy(end_key),
+                repeat,
+                setup=bhavcopy_cache.clear_frames,
+            ))
+
+            results.append(measure(
+                "portfolio_return_cold", size,
+                lambda: calculate_portfolio_return(
+                    symbol, start_key, end_key, Decimal("10")
+                ),
+                repeat,
+                setup=lambda: reset_state(workdir),
+            ))
+
+            results.append(measure(
+                "import_stock_prices", size,
+                lambda: _quiet("import_stock_prices", prices_csv),
+                repeat,
+                setup=reset_state,
+            ))
+
+            results.append(measure(
+                "import_corporate_actions", size,
+                lambda: _quiet("import_corporate_actions", path=actions_csv),
+                repeat,
+                setup=lambda: (
+                    CorporateAction.objects.all().delete(),
+                    AdjustmentFactor.objects.all().delete(),
+                ),
+            ))
+
+            # Warm: prices and corporate actions are loaded from here on.
+            results.append(measure(
+                "portfolio_return_warm", size,
+                lambda: calculate_portfolio_return(
+                    symbol, start_key, end_key, Decimal("10")
+                ),
+                repeat,
+            ))
+
+            client = Client()
+            url = f"/api/returns/?symbol={symbol}&from={start_key}&to={end_key}&shares=10"
+
+            results.append(measure(
+                "api_returns", size,
+                lambda: client.get(url),
+                repeat,
+                setup=lambda: reset_state(tables=False),
+            ))
+
+            results.append(measure(
+                "api_returns_cached", size,
+                lambda: client.get(url),
+                repeat,
+            ))
+
+    return {"meta": _meta(sizes, repeat, fixtures_dir), "results": results}
+
+
+def run_contention(size=DEFAULT_SIZES[-1], reads=200, batch=50):
+    """
+    Read latency on an idle database, then again while another
+    connection re-imports every price in a loop (the upserts rewrite the
+    same rows). Run once per database profile (DB_ENGINE, DB_SQLITE_WAL)
+    to compare them. The reads are plain StockPrice queries, so neither
+    the columnar price store nor a bhavcopy fallback is measured.
+    """
+    days = fixtures.trading_days(START, DAYS)
+    keys = [day.strftime("%Y-%m-%d") for day in days]
+    symbols = fixtures.symbol_names(size)
+
+    results = []
+
+    with environment(file_db=True) as (server, workdir):
+        prices_csv = os.path.join(workdir, "prices.csv")
+        fixtures.write_price_csv(prices_csv, days, size)
+
+        reset_state(workdir)
+        _quiet("import_stock_prices", prices_csv)
+
+        def measure_reads(phase):
+            rng = random.Random(0)
+
+            results.append(measure(
+                f"db_asof_batch_{phase}", size,
+                lambda: StockPrice.objects.asof_pairs([
+                    (rng.choice(symbols), rng.choice(keys))
+                    for _ in range(batch)
+                ]),
+                reads,
+            ))
+
+            results.append(measure(
+                f"db_day_closes_{phase}", size,
+                lambda: list(
+                    StockPrice.objects
+                    .filter(trade_date=rng.choice(keys))
+                    .values_list("symbol", "close_price")
+                ),
+                reads,
+            ))
+
+        measure_reads("idle")
+
+        writer = _Importer(prices_csv, rows=size * DAYS)
+        writer.start()
+        writer.running.wait()
+        try:
+            measure_reads("under_import")
+        finally:
+            writer.stop()
+
+        meta = _meta([size], reads, None)
+        meta["writer"] = writer.stats()
+        if connection.vendor == "sqlite":
+            with connection.cursor() as cursor:
+                cursor.execute("PRAGMA journal_mode")
+                meta["journal_mode"] = cursor.fetchone()[0]
+
+    return {"meta": meta, "results": results}
+
+
+class _Importer(threading.Thread):
+    """
+    Runs import_stock_prices back to back on its own connection.
+    """
+
+    def __init__(self, path, rows):
+        super().__init__(daemon=True)
+        self.path = path
+        self.rows = rows
+        self.running = threading.Event()
+        self.stopping = threading.Event()
+        self.runs = 0
+        self.errors = 0
+        self.seconds = 0.0
+
+    def run(self):
+        started = time.perf_counter()
+        try:
+            while not self.stopping.is_set():
+                self.running.set()
+                try:
+                    _quiet("import_stock_prices", self.path)
+                    self.runs += 1
+                except OperationalError:
+                    # e.g. "database is locked" once the busy timeout expires
+                    self.errors += 1
+        finally:
+            self.seconds = time.perf_counter() - started
+            self.running.set()
+            connection.close()
+
+    def stop(self):
+        self.stopping.set()
+        self.join()
+
+    def stats(self):
+        return {
+            "imports": self.runs,
+            "errors": self.errors,
+            "rows_per_sec": round(self.runs * self.rows / max(self.seconds, 1e-9)),
+        }
+
+
+def _meta(sizes, repeat, fixtures_dir):
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=settings.BASE_DIR,
+            capture_output=True,
+            text=True,
+            timeout=5,
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+
+    return {
+        "commit": commit,
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "django": django.get_version(),
+        "machine": platform.machine(),
+        "database": connection.vendor,
+        "sizes": list(sizes),
+        "repeat": repeat,
+        "window": [START.isoformat(), DAYS],
+        "recorded_fixtures": fixtures_dir,
+    }
@@ -0,0 +1,70 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from core.management.commands.import_stock_prices import expand_paths
+from core.services import backfill
+from core.services import price_store
+
+class Command(BaseCommand):
+    help = "Backfill StockPrice from bhavcopy zips/CSVs with parallel parsers"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "path",
+            type=str,
+            help="Bhavcopy file, directory of bhavcopies, or glob pattern",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            help="Parser processes (default: one per core)",
+        )
+        parser.add_argument("--batch-size", type=int, default=5_000)
+        parser.add_argument(
+            "--stats",
+            type=str,
+            help="Write the per-stage throughput as JSON here",
+        )
+        parser.add_argument(
+            "--rebuild-store",
+            action="store_true",
+            help="Rebuild the columnar price store afterwards",
+        )
+
+    def handle(self, *args, **kwargs):
+        paths = expand_paths(kwargs["path"])
+        if not paths:
+            raise CommandError(f"No files match {kwargs['path']}")
+
+        def progress(path, rows, stats):
+            self.stdout.write(
+                f"[{stats.files}/{len(paths)}] {path}: {rows} rows, "
+                f"{stats.rows / stats.elapsed:,.0f} rows/sec"
+            )
+
+        stats = backfill.backfill(
+            paths,
+            workers=kwargs["workers"],
+            batch_size=kwargs["batch_size"],
+            on_file=progress,
+        )
+
+        for path, error in stats.failed:
+            self.stderr.write(f"⚠ {path}: {error}")
+
+        if stats.rows and kwargs["rebuild_store"]:
+            price_store.build_store()
+
+        report = stats.as_dict()
+        if kwargs["stats"]:
+            with open(kwargs["stats"], "w") as f:
+                json.dump(report, f, indent=2)
+
+        self.stdout.write(
+            "  ".join(f"{key}={value}" for key, value in report.items())
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Backfill finished. Rows written: {stats.rows} from "
+            f"{stats.files} file(s) in {stats.elapsed:.1f}s "
+            f"({len(stats.failed)} failed)"
+        ))
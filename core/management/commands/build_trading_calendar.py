@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+from core.services import trading_calendar
+
+class Command(BaseCommand):
+    help = "Rebuild the trading calendar from StockPrice dates"
+
+    def handle(self, *args, **kwargs):
+        sessions, holidays = trading_calendar.rebuild_from_stock_prices()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Trading calendar rebuilt. Sessions: {sessions}, holidays: {holidays}"
+        ))
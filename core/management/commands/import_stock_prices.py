@@ -1,37 +1,167 @@
+import glob
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 import pandas as pd
 from django.core.management.base import BaseCommand
+from django.db import transaction
 from core.models import StockPrice
+from core.services import data_versions
+from core.services import price_store
+from core.services import trading_calendar
+
+COLUMNS = ("SYMBOL", "SERIES", "TIMESTAMP", "CLOSE")
+
+
+def expand_paths(path):
+    """
+    A single CSV, a directory of daily CSVs, or a glob pattern.
+    """
+    if os.path.isdir(path):
+        return sorted(
+            glob.glob(os.path.join(path, "*.csv"))
+            + glob.glob(os.path.join(path, "*.csv.zip"))
+        )
+
+    if glob.has_magic(path):
+        return sorted(glob.glob(path))
+
+    return [path]
+
+
+def prepare_chunk(df):
+    """
+    Vectorised filter / type conversion of a raw bhavcopy chunk into
+    (symbol, trade_date, close) columns.
+    """
+    df.columns = df.columns.str.strip().str.upper()
+    df = df[df["SERIES"].str.strip() == "EQ"]
+
+    out = pd.DataFrame({
+        "symbol": df["SYMBOL"].str.strip(),
+        "trade_date": pd.to_datetime(df["TIMESTAMP"], errors="coerce", format="%d-%b-%Y"),
+        "close": pd.to_numeric(df["CLOSE"], errors="coerce"),
+    })
+
+    return out.dropna()
+
+
+def read_chunks(path, chunksize):
+    reader = pd.read_csv(
+        path,
+        chunksize=chunksize,
+        dtype=str,
+        usecols=lambda c: c.strip().upper() in COLUMNS,
+    )
+
+    for chunk in reader:
+        yield prepare_chunk(chunk)
+
+
+def read_file(path, chunksize):
+    frames = list(read_chunks(path, chunksize))
+    if not frames:
+        return pd.DataFrame(columns=["symbol", "trade_date", "close"])
+    return pd.concat(frames, ignore_index=True)
+
+
+def write_prices(frame, batch_size):
+    objs = [
+        StockPrice(symbol=symbol, trade_date=trade_date, close_price=close)
+        for symbol, trade_date, close in zip(
+            frame["symbol"].tolist(),
+            frame["trade_date"].dt.date.tolist(),
+            frame["close"].round(2).tolist(),
+        )
+    ]
+
+    with transaction.atomic():
+        StockPrice.objects.bulk_create(
+            objs,
+            batch_size=batch_size,
+            update_conflicts=True,
+            unique_fields=["symbol", "trade_date"],
+            update_fields=["close_price"],
+        )
+
+    data_versions.bump(frame["symbol"].unique())
+    return len(objs)
+
 
 class Command(BaseCommand):
-    help = "Import stock prices from bhavcopy CSV"
+    help = "Import stock prices from bhavcopy CSV(s)"
 
     def add_arguments(self, parser):
-        parser.add_argument("csv_path", type=str)
+        parser.add_argument(
+            "csv_path",
+            type=str,
+            help="CSV file, directory of CSVs, or glob pattern",
+        )
+        parser.add_argument("--chunksize", type=int, default=200_000)
+        parser.add_argument("--batch-size", type=int, default=5_000)
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=1,
+            help="Parallel file readers (writes stay on one connection)",
+        )
+        parser.add_argument(
+            "--rebuild-store",
+            action="store_true",
+            help="Rebuild the columnar price store afterwards (until then, "
+                 "imported symbols are read from the table)",
+        )
 
     def handle(self, *args, **kwargs):
-        path = kwargs["csv_path"]
+        paths = expand_paths(kwargs["csv_path"])
+        chunksize = kwargs["chunksize"]
+        batch_size = kwargs["batch_size"]
+        workers = kwargs["workers"]
 
-        df = pd.read_csv(path)
-        df.columns = df.columns.str.strip().str.upper()
+        started = time.perf_counter()
+        written = 0
+        dates = set()
 
-        df = df[df["SERIES"] == "EQ"]
-        df["TIMESTAMP"] = pd.to_datetime(df["TIMESTAMP"], errors="coerce")
-        df = df.dropna(subset=["SYMBOL", "TIMESTAMP", "CLOSE"])
+        for frame in self._frames(paths, chunksize, workers):
+            if frame.empty:
+                continue
 
-        created = 0
+            written += write_prices(frame, batch_size)
+            dates.update(frame["trade_date"].dt.date.unique())
 
-        for _, row in df.iterrows():
-            obj, is_created = StockPrice.objects.get_or_create(
-                symbol=row["SYMBOL"].strip(),
-                trade_date=row["TIMESTAMP"].date(),
-                defaults={
-                    "close_price": row["CLOSE"]
-                }
+            elapsed = time.perf_counter() - started
+            self.stdout.write(
+                f"{written} rows, {written / elapsed:,.0f} rows/sec"
             )
 
-            if is_created:
-                created += 1
+        trading_calendar.record_sessions(open_dates=dates)
+
+        # Symbols written here are read from the table until the store
+        # is rebuilt; a full rebuild per import is opt-in.
+        if written and kwargs["rebuild_store"]:
+            price_store.build_store()
 
+        elapsed = time.perf_counter() - started
         self.stdout.write(self.style.SUCCESS(
-            f"✅ Stock prices imported. Rows created: {created}"
+            f"✅ Stock prices imported. Rows written: {written} "
+            f"from {len(paths)} file(s) in {elapsed:.1f}s "
+            f"({written / max(elapsed, 1e-9):,.0f} rows/sec)"
         ))
+
+    def _frames(self, paths, chunksize, workers):
+        if len(paths) == 1 or workers <= 1:
+            for path in paths:
+                yield from read_chunks(path, chunksize)
+            return
+
+        # Bounded window of in-flight files so memory stays flat.
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            pending = []
+            for path in paths:
+                pending.append(pool.submit(read_file, path, chunksize))
+                if len(pending) >= workers * 2:
+                    yield pending.pop(0).result()
+
+            for future in pending:
+                yield future.result()
@@ -0,0 +1,61 @@
+import time
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from core.services import ingestion
+from core.services import price_store
+
+class Command(BaseCommand):
+    help = "Ingest NSE bhavcopies published since the last checkpoint (cron-safe)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--from",
+            dest="start",
+            help="Ignore the checkpoint and start from this date",
+        )
+        parser.add_argument("--until", help="Last date (default: today)")
+        parser.add_argument("--max-days", type=int)
+        parser.add_argument("--batch-size", type=int, default=5_000)
+        parser.add_argument(
+            "--rebuild-store",
+            action="store_true",
+            help="Rebuild the columnar price store afterwards",
+        )
+
+    def handle(self, *args, **kwargs):
+        try:
+            start, until = (
+                datetime.strptime(kwargs[k], "%Y-%m-%d").date() if kwargs[k] else None
+                for k in ("start", "until")
+            )
+        except ValueError:
+            raise CommandError("--from/--until must be YYYY-MM-DD")
+
+        started = time.perf_counter()
+
+        try:
+            done = ingestion.ingest(
+                until=until,
+                start=start,
+                max_days=kwargs["max_days"],
+                batch_size=kwargs["batch_size"],
+            )
+        except ingestion.IngestionLocked as exc:
+            self.stdout.write(f"⏭ {exc}")
+            return
+
+        for day, rows in done:
+            self.stdout.write(
+                f"{day} {'holiday' if rows is None else f'{rows} rows'}"
+            )
+
+        written = sum(rows or 0 for _, rows in done)
+        if written and kwargs["rebuild_store"]:
+            price_store.build_store()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Bhavcopies ingested. Sessions: "
+            f"{sum(rows is not None for _, rows in done)}, rows: {written} "
+            f"in {time.perf_counter() - started:.1f}s"
+        ))
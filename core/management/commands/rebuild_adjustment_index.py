@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+from core.services import adjustment_index
+
+class Command(BaseCommand):
+    help = "Rebuild the cumulative corporate-action adjustment index"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--symbol",
+            action="append",
+            help="Only rebuild these symbols (repeatable)",
+        )
+
+    def handle(self, *args, **kwargs):
+        symbols = kwargs["symbol"]
+
+        rows = adjustment_index.rebuild(
+            dict.fromkeys(symbols) if symbols else None
+        )
+
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Adjustment index rebuilt. Rows: {rows}"
+        ))
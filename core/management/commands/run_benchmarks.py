@@ -0,0 +1,81 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from core.benchmarks import suite
+from core.benchmarks.runner import compare
+
+class Command(BaseCommand):
+    help = "Benchmark the returns pipeline offline and report JSON"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes",
+            type=str,
+            default=",".join(str(s) for s in suite.DEFAULT_SIZES),
+            help="Comma-separated symbols per bhavcopy",
+        )
+        parser.add_argument("--repeat", type=int, default=5)
+        parser.add_argument(
+            "--contention",
+            action="store_true",
+            help="Read latency while imports run instead (first size only)",
+        )
+        parser.add_argument(
+            "--reads",
+            type=int,
+            default=200,
+            help="Timed reads per phase with --contention",
+        )
+        parser.add_argument(
+            "--fixtures",
+            type=str,
+            help="Directory of recorded NSE *.csv.zip archives to serve too",
+        )
+        parser.add_argument("--output", type=str, help="Write the JSON report here")
+        parser.add_argument(
+            "--compare",
+            type=str,
+            help="Earlier JSON report to compare p50 latencies against",
+        )
+
+    def handle(self, *args, **kwargs):
+        try:
+            sizes = [int(s) for s in kwargs["sizes"].split(",") if s.strip()]
+        except ValueError:
+            raise CommandError("--sizes must be comma-separated integers")
+
+        if kwargs["contention"]:
+            report = suite.run_contention(sizes[0], kwargs["reads"])
+        else:
+            report = suite.run(sizes, kwargs["repeat"], kwargs["fixtures"])
+        text = json.dumps(report, indent=2)
+
+        if kwargs["output"]:
+            with open(kwargs["output"], "w") as f:
+                f.write(text)
+        else:
+            self.stdout.write(text)
+
+        # Without --output stdout is the JSON report; keep it parseable.
+        # (style_func=str: stderr would otherwise colour everything red.)
+        log = self.stdout if kwargs["output"] else self.stderr
+
+        if kwargs["compare"]:
+            with open(kwargs["compare"]) as f:
+                baseline = json.load(f)
+
+            log.write(
+                f"p50 vs {baseline['meta'].get('commit') or kwargs['compare']}:",
+                style_func=str,
+            )
+            for name, size, before, after, ratio in compare(baseline, report):
+                log.write(
+                    f"  {name:<26} {size:>6} {before:>10.2f} → {after:>10.2f} ms"
+                    + (f"  ×{ratio:.2f}" if ratio is not None else ""),
+                    style_func=str,
+                )
+
+        log.write(
+            f"✅ Benchmarks finished. {len(report['results'])} results",
+            style_func=self.style.SUCCESS,
+        )
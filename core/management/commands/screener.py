@@ -0,0 +1,50 @@
+import csv
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from core.services.screener import SORT_KEYS, get_screener, top_movers
+
+class Command(BaseCommand):
+    help = "Top / bottom movers across every symbol between two dates"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--from", dest="start", required=True)
+        parser.add_argument("--to", dest="end", required=True)
+        parser.add_argument("--top", type=int, default=20)
+        parser.add_argument("--sort", choices=SORT_KEYS, default="total_return_pct")
+        parser.add_argument(
+            "--csv",
+            type=str,
+            help="Write every symbol's row to this CSV instead of printing",
+        )
+
+    def handle(self, *args, **kwargs):
+        started = time.perf_counter()
+
+        try:
+            result = get_screener(kwargs["start"], kwargs["end"])
+        except ValueError as exc:
+            raise CommandError(str(exc))
+
+        rows = result["rows"]
+
+        if kwargs["csv"]:
+            with open(kwargs["csv"], "w", newline="") as f:
+                if rows:
+                    writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+                    writer.writeheader()
+                    writer.writerows(rows)
+        else:
+            best, worst = top_movers(result, kwargs["top"], kwargs["sort"])
+            for title, movers in (("Best", best), ("Worst", worst)):
+                self.stdout.write(f"{title} by {kwargs['sort']}:")
+                for row in movers:
+                    self.stdout.write(
+                        f"  {row['symbol']:<20} {row[kwargs['sort']]:>10.2f}%"
+                    )
+
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Screened {len(rows)} symbols "
+            f"({result['from_session']} → {result['to_session']}) "
+            f"in {time.perf_counter() - started:.2f}s"
+        ))
@@ -0,0 +1,90 @@
+import time
+from datetime import date as date_cls
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from core.services import bhavcopy_loader
+from core.services import price_store
+
+class Command(BaseCommand):
+    help = "Backfill StockPrice from NSE bhavcopies for a date range"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--from", dest="start", required=True)
+        parser.add_argument(
+            "--to",
+            dest="end",
+            help="Last date (default: today)",
+        )
+        parser.add_argument(
+            "--symbol",
+            action="append",
+            help="Only load these symbols (repeatable; default: every EQ row)",
+        )
+        parser.add_argument(
+            "--symbols-file",
+            type=str,
+            help="File with one symbol per line",
+        )
+        parser.add_argument("--workers", type=int, default=4)
+        parser.add_argument(
+            "--rebuild-store",
+            action="store_true",
+            help="Rebuild the columnar price store afterwards",
+        )
+
+    def handle(self, *args, **kwargs):
+        try:
+            start = datetime.strptime(kwargs["start"], "%Y-%m-%d").date()
+            end = (
+                datetime.strptime(kwargs["end"], "%Y-%m-%d").date()
+                if kwargs["end"] else date_cls.today()
+            )
+        except ValueError:
+            raise CommandError("--from/--to must be YYYY-MM-DD")
+
+        symbols = set(kwargs["symbol"] or [])
+        if kwargs["symbols_file"]:
+            with open(kwargs["symbols_file"]) as f:
+                symbols.update(line.strip() for line in f if line.strip())
+        symbols = {s.upper().strip() for s in symbols} or None
+
+        dates = bhavcopy_loader.candidate_dates(start, end, symbols)
+        total = len(dates)
+
+        self.stdout.write(f"{total} date(s) to fetch")
+
+        started = time.perf_counter()
+        done = written = missing = failed = 0
+
+        for trading_date, rows, error in bhavcopy_loader.load_dates(
+            dates, symbols, kwargs["workers"]
+        ):
+            done += 1
+            if error is not None:
+                failed += 1
+                outcome = f"failed: {error}"
+            elif rows is None:
+                missing += 1
+                outcome = "no bhavcopy"
+            else:
+                written += rows
+                outcome = f"{rows} rows"
+
+            elapsed = time.perf_counter() - started
+            eta = elapsed / done * (total - done)
+            self.stdout.write(
+                f"[{done}/{total}] {trading_date} {outcome} | "
+                f"{done / elapsed:.2f} dates/sec, "
+                f"{written / elapsed:,.0f} rows/sec, ETA {eta:.0f}s"
+            )
+
+        if written and kwargs["rebuild_store"]:
+            price_store.build_store()
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Prices warmed. Dates: {done - missing - failed} loaded, "
+            f"{missing} without bhavcopy, {failed} failed (rerun to retry); "
+            f"rows written: {written} in {elapsed:.1f}s"
+        ))
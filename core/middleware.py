@@ -0,0 +1,85 @@
+from django.conf import settings
+
+from core.utils import tracing
+
+
+class TimingMiddleware:
+    """
+    Traces each request: a Server-Timing header with per-stage span
+    totals, a "timing" section in DRF payloads for ?debug=timing, and
+    per-route histograms for /api/metrics/. With TRACING_ENABLED off,
+    only ?debug=timing requests are traced.
+
+    A streamed body is produced after the view returns, so the trace is
+    made current again for each chunk and the request is observed once
+    the stream ends; its Server-Timing header, sent ahead of the body,
+    covers the time to the first byte only.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        debug = request.GET.get("debug") == "timing"
+
+        if not debug and not getattr(settings, "TRACING_ENABLED", True):
+            return self.get_response(request)
+
+        request.timing_debug = debug
+        trace, token = tracing.start_trace()
+        try:
+            response = self.get_response(request)
+        finally:
+            tracing.end_trace(token)
+
+        route = getattr(request.resolver_match, "route", None) or "unmatched"
+        response["Server-Timing"] = trace.server_timing()
+
+        if not response.streaming:
+            tracing.observe(f"request {route}", trace.elapsed_ms())
+        elif response.is_async:
+            response.streaming_content = _traced_async(trace, route, response.streaming_content)
+        else:
+            response.streaming_content = _traced(trace, route, response.streaming_content)
+
+        return response
+
+    def process_template_response(self, request, response):
+        # DRF responses are still unrendered here, so .data can be extended.
+        data = getattr(response, "data", None)
+        trace = tracing.current_trace()
+
+        if getattr(request, "timing_debug", False) and trace and isinstance(data, dict):
+            response.data = {**data, "timing": trace.summary()}
+
+        return response
+
+
+def _traced(trace, route, content):
+    try:
+        while True:
+            token = tracing.resume_trace(trace)
+            try:
+                part = next(content, None)
+            finally:
+                tracing.end_trace(token)
+            if part is None:
+                return
+            yield part
+    finally:
+        tracing.observe(f"request {route}", trace.elapsed_ms())
+
+
+async def _traced_async(trace, route, content):
+    try:
+        while True:
+            token = tracing.resume_trace(trace)
+            try:
+                part = await anext(content, None)
+            finally:
+                tracing.end_trace(token)
+            if part is None:
+                return
+            yield part
+    finally:
+        tracing.observe(f"request {route}", trace.elapsed_ms())
@@ -0,0 +1,24 @@
+# Generated by Django 6.0.1 on 2026-10-18 09:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TradingDay',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('trade_date', models.DateField(unique=True)),
+                ('is_open', models.BooleanField(default=True)),
+            ],
+            options={
+                'ordering': ['trade_date'],
+            },
+        ),
+    ]
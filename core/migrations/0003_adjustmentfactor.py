@@ -0,0 +1,70 @@
+# Generated by Django 6.0.1 on 2026-10-18 11:40
+
+from decimal import Decimal
+
+from django.db import migrations, models
+
+
+def build_index(apps, schema_editor):
+    CorporateAction = apps.get_model("core", "CorporateAction")
+    AdjustmentFactor = apps.get_model("core", "AdjustmentFactor")
+
+    rows = []
+    state = {}
+
+    for action in CorporateAction.objects.order_by("symbol", "ex_date", "id"):
+        seq, cum_factor, cum_dividend = state.get(
+            action.symbol, (0, Decimal("1"), Decimal("0"))
+        )
+
+        if action.action_type in ("SPLIT", "BONUS") and action.factor:
+            cum_factor *= Decimal(action.factor)
+        elif action.action_type == "DIVIDEND" and action.cash_value is not None:
+            cum_dividend += cum_factor * Decimal(action.cash_value)
+        else:
+            continue
+
+        seq += 1
+        state[action.symbol] = (seq, cum_factor, cum_dividend)
+
+        rows.append(AdjustmentFactor(
+            symbol=action.symbol,
+            seq=seq,
+            ex_date=action.ex_date,
+            action_type=action.action_type,
+            factor=action.factor,
+            cash_value=action.cash_value,
+            cum_factor=cum_factor,
+            cum_dividend=cum_dividend,
+        ))
+
+    AdjustmentFactor.objects.bulk_create(rows, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_tradingday'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AdjustmentFactor',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('symbol', models.CharField(max_length=20)),
+                ('seq', models.PositiveIntegerField()),
+                ('ex_date', models.DateField()),
+                ('action_type', models.CharField(max_length=10)),
+                ('factor', models.DecimalField(blank=True, decimal_places=4, max_digits=10, null=True)),
+                ('cash_value', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True)),
+                ('cum_factor', models.DecimalField(decimal_places=12, max_digits=30)),
+                ('cum_dividend', models.DecimalField(decimal_places=12, max_digits=30)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['symbol', 'ex_date'], name='core_adjust_symbol_2682b4_idx')],
+                'unique_together': {('symbol', 'seq')},
+            },
+        ),
+        migrations.RunPython(build_index, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 6.0.1 on 2026-10-18 15:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_ingestioncheckpoint'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='stockprice',
+            index=models.Index(fields=['symbol', 'trade_date', 'close_price'], name='core_stockp_symbol_0361e9_idx'),
+        ),
+        migrations.RemoveIndex(
+            model_name='stockprice',
+            name='core_stockp_symbol_327610_idx',
+        ),
+        migrations.AlterField(
+            model_name='stockprice',
+            name='symbol',
+            field=models.CharField(max_length=20),
+        ),
+    ]
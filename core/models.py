@@ -1,14 +1,133 @@
-from django.db import models
+from datetime import date as date_type
+from datetime import timedelta
+
+from django.db import connections, models
+
+
+class StalePriceError(ValueError):
+    """
+    The last close on or before a date is older than the staleness limit,
+    typically because the symbol was delisted or suspended.
+    """
+
+    def __init__(self, symbol, date, last_trade_date):
+        self.symbol = symbol
+        self.date = date
+        self.last_trade_date = last_trade_date
+        super().__init__(
+            f"Last close for {symbol} on or before {date} is from "
+            f"{last_trade_date}, past the staleness limit "
+            f"(delisted or suspended?)"
+        )
+
+
+class StockPriceQuerySet(models.QuerySet):
+
+    def asof(self, symbols, dates, max_staleness=None):
+        """
+        Last close on or before each date for every symbol; see asof_pairs.
+        """
+        if isinstance(symbols, str):
+            symbols = [symbols]
+        return self.asof_pairs(
+            [(symbol, date) for symbol in symbols for date in dates],
+            max_staleness,
+        )
+
+    def asof_pairs(self, pairs, max_staleness=None):
+        """
+        Resolves (symbol, date) pairs (dates as date or YYYY-MM-DD) to the
+        last close on or before the date. Returns (prices, errors) keyed
+        by pair: prices[pair] = (trade_date, close). A close more than
+        max_staleness (days or a timedelta) before its date is reported
+        as a StalePriceError instead; pairs with no close are in neither.
+
+        One statement per batch: a correlated MAX(trade_date) per pair,
+        which is a single seek on the (symbol, trade_date) index, joined
+        back for the close. Ignores any filters on the queryset.
+        """
+        if isinstance(max_staleness, int):
+            max_staleness = timedelta(days=max_staleness)
+
+        pairs = list(dict.fromkeys(pairs))
+        targets = [
+            date if isinstance(date, date_type) else date_type.fromisoformat(date)
+            for _, date in pairs
+        ]
+
+        connection = connections[self.db]
+        batch = max((connection.features.max_query_params or 2000) // 2, 1)
+
+        prices = {}
+        errors = {}
+        for start in range(0, len(pairs), batch):
+            for i, trade_date, close in self._asof_rows(
+                connection,
+                [
+                    (pairs[i][0], targets[i])
+                    for i in range(start, min(start + batch, len(pairs)))
+                ],
+                start,
+            ):
+                pair = pairs[i]
+                if max_staleness is not None and targets[i] - trade_date > max_staleness:
+                    errors[pair] = StalePriceError(pair[0], pair[1], trade_date)
+                else:
+                    prices[pair] = (trade_date, close)
+
+        return prices, errors
+
+    def _asof_rows(self, connection, pairs, offset):
+        meta = self.model._meta
+        table = connection.ops.quote_name(meta.db_table)
+        symbol = connection.ops.quote_name(meta.get_field("symbol").column)
+        trade_date_field = meta.get_field("trade_date")
+        close_field = meta.get_field("close_price")
+        trade_date = connection.ops.quote_name(trade_date_field.column)
+        close = connection.ops.quote_name(close_field.column)
+
+        # SQLite stores dates as ISO text; elsewhere the untyped parameter
+        # must be cast for the comparison with the date column.
+        target = "%s" if connection.vendor == "sqlite" else "CAST(%s AS DATE)"
+
+        targets = " UNION ALL ".join(
+            f"SELECT {offset + n} AS i, %s AS symbol, {target} AS target"
+            for n in range(len(pairs))
+        )
+        params = []
+        for name, day in pairs:
+            params += [name, connection.ops.adapt_datefield_value(day)]
+
+        sql = (
+            f"SELECT t.i, p.{trade_date}, p.{close} "
+            f"FROM ({targets}) t "
+            f"JOIN {table} p ON p.{symbol} = t.symbol AND p.{trade_date} = ("
+            f"SELECT MAX(q.{trade_date}) FROM {table} q "
+            f"WHERE q.{symbol} = t.symbol AND q.{trade_date} <= t.target)"
+        )
+
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            for i, day, value in cursor.fetchall():
+                yield (
+                    i,
+                    trade_date_field.to_python(day),
+                    round(close_field.to_python(value), close_field.decimal_places),
+                )
+
 
 class StockPrice(models.Model):
-    symbol = models.CharField(max_length=20, db_index=True)
+    symbol = models.CharField(max_length=20)
     trade_date = models.DateField(db_index=True)
     close_price = models.DecimalField(max_digits=10, decimal_places=2)
 
+    objects = StockPriceQuerySet.as_manager()
+
     class Meta:
         unique_together = ("symbol", "trade_date")
         indexes = [
-            models.Index(fields=["symbol", "trade_date"]),
+            # Covering: as-of and range reads never touch the table.
+            models.Index(fields=["symbol", "trade_date", "close_price"]),
         ]
 
 
@@ -45,3 +164,75 @@ class CorporateAction(models.Model):
             models.Index(fields=["symbol", "ex_date"]),
         ]
 
+
+
+class TradingDay(models.Model):
+    trade_date = models.DateField(unique=True)
+    is_open = models.BooleanField(default=True)
+
+    class Meta:
+        ordering = ["trade_date"]
+
+
+class AdjustmentFactor(models.Model):
+    """
+    Per-symbol running totals over the applied corporate actions, in
+    ex_date order. cum_factor is the split/bonus share multiplier since
+    listing; cum_dividend is dividend cash per original share.
+    Maintained by core.services.adjustment_index.
+    """
+
+    symbol = models.CharField(max_length=20)
+    seq = models.PositiveIntegerField()
+    ex_date = models.DateField()
+    action_type = models.CharField(max_length=10)
+
+    factor = models.DecimalField(
+        max_digits=10,
+        decimal_places=4,
+        null=True,
+        blank=True
+    )
+
+    cash_value = models.DecimalField(
+        max_digits=10,
+        decimal_places=2,
+        null=True,
+        blank=True
+    )
+
+    cum_factor = models.DecimalField(max_digits=30, decimal_places=12)
+    cum_dividend = models.DecimalField(max_digits=30, decimal_places=12)
+
+    class Meta:
+        unique_together = ("symbol", "seq")
+        indexes = [
+            models.Index(fields=["symbol", "ex_date"]),
+        ]
+
+
+class IngestionCheckpoint(models.Model):
+    """
+    Last trade date fully ingested by a named incremental pipeline.
+    """
+
+    name = models.CharField(max_length=50, unique=True)
+    last_trade_date = models.DateField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name} @ {self.last_trade_date}"
+
+
+class DataVersion(models.Model):
+    """
+    Change counter of one symbol's prices and corporate actions ("*" for
+    the whole market). Shared by every process through the database;
+    maintained by core.services.data_versions.
+    """
+
+    key = models.CharField(max_length=20, unique=True)
+    version = models.PositiveBigIntegerField(default=1)
+
+    def __str__(self):
+        return f"{self.key} v{self.version}"
@@ -0,0 +1,43 @@
+import csv
+import io
+
+from rest_framework.renderers import BaseRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+# Streaming endpoints answer ?format=ndjson / ?format=csv with their own
+# StreamingHttpResponse; these renderers let DRF's format negotiation
+# accept those formats and render the non-streamed (error) responses.
+
+
+class NDJSONRenderer(BaseRenderer):
+    media_type = "application/x-ndjson"
+    format = "ndjson"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+
+        items = data if isinstance(data, list) else [data]
+        encoder = JSONEncoder()
+        return "".join(encoder.encode(item) + "\n" for item in items).encode()
+
+
+class CSVRenderer(BaseRenderer):
+    media_type = "text/csv"
+    format = "csv"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+
+        rows = data if isinstance(data, list) else [data]
+        fields = list(rows[0]) if rows else []
+
+        out = io.StringIO()
+        writer = csv.writer(out)
+        writer.writerow(fields)
+        for row in rows:
+            writer.writerow([row.get(field, "") for field in fields])
+        return out.getvalue().encode()
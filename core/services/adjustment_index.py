@@ -0,0 +1,245 @@
+# core/services/adjustment_index.py
+
+import threading
+import time
+from bisect import bisect_right
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import OuterRef
+from django.db.models import Q
+from django.db.models import Subquery
+
+from core.models import AdjustmentFactor
+from core.models import CorporateAction
+from core.services import data_versions
+
+# Per-process copies are refreshed at least this often so that rebuilds
+# done by another worker become visible.
+CACHE_TTL = 60
+
+_lock = threading.Lock()
+_indexes = {}   # symbol -> (loaded_at, SymbolIndex)
+
+
+class SymbolIndex:
+    """
+    Cumulative adjustment factors for one symbol, sorted by ex_date.
+    Any (from, to] window resolves with two binary searches.
+    """
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.ordinals = [row["ex_date"].toordinal() for row in rows]
+        # Running totals as exact (numerator, denominator) int pairs.
+        self.totals = [
+            (row["cum_factor"].as_integer_ratio(), row["cum_dividend"].as_integer_ratio())
+            for row in rows
+        ]
+
+    def _position(self, day):
+        return bisect_right(self.ordinals, day.toordinal()) - 1
+
+    def _totals(self, i):
+        if i < 0:
+            return (1, 1), (0, 1)
+        return self.totals[i]
+
+    def window(self, start_date, end_date):
+        """
+        Returns (base, end, actions) for start_date < ex_date <= end_date:
+        the exact (cum_factor, cum_dividend) ratios in force at each end
+        of the window, and the (row, totals) pairs of the actions in it.
+        """
+        i = self._position(start_date)
+        j = self._position(end_date)
+
+        if j <= i:
+            base = self._totals(i)
+            return base, base, []
+
+        return (
+            self._totals(i),
+            self._totals(j),
+            list(zip(self.rows[i + 1:j + 1], self.totals[i + 1:j + 1])),
+        )
+
+
+def _load(symbols):
+    rows = {symbol: [] for symbol in symbols}
+
+    for row in (
+        AdjustmentFactor.objects
+        .filter(symbol__in=symbols)
+        .order_by("symbol", "seq")
+        .values(
+            "symbol", "ex_date", "action_type", "factor", "cash_value",
+            "cum_factor", "cum_dividend",
+        )
+    ):
+        rows[row["symbol"]].append(row)
+
+    return {symbol: SymbolIndex(r) for symbol, r in rows.items()}
+
+
+def get_indexes(symbols):
+    """
+    Returns {symbol: SymbolIndex}; cache misses load in one query.
+    """
+    now = time.monotonic()
+    found = {}
+
+    with _lock:
+        for symbol in symbols:
+            entry = _indexes.get(symbol)
+            if entry and now - entry[0] < CACHE_TTL:
+                found[symbol] = entry[1]
+
+    missing = [s for s in set(symbols) if s not in found]
+    if missing:
+        loaded = _load(missing)
+        with _lock:
+            for symbol, index in loaded.items():
+                _indexes[symbol] = (now, index)
+        found.update(loaded)
+
+    return found
+
+
+def get_index(symbol):
+    return get_indexes([symbol])[symbol]
+
+
+def invalidate(symbols=None):
+    with _lock:
+        if symbols is None:
+            _indexes.clear()
+        else:
+            for symbol in symbols:
+                _indexes.pop(symbol, None)
+
+
+# (symbol, since) windows per statement; each costs two parameters and
+# SQLite parses the OR chain as one nested expression.
+REBUILD_BATCH = 400
+
+
+def _batches(since_by_symbol):
+    items = sorted(since_by_symbol.items())
+    for start in range(0, len(items), REBUILD_BATCH):
+        yield items[start:start + REBUILD_BATCH]
+
+
+def _window(batch):
+    """
+    ex_date >= since for each (symbol, since); since=None is the whole symbol.
+    """
+    q = Q(symbol__in=[symbol for symbol, since in batch if since is None])
+    for symbol, since in batch:
+        if since is not None:
+            q |= Q(symbol=symbol, ex_date__gte=since)
+    return q
+
+
+def _actions(since_by_symbol):
+    if since_by_symbol is None:
+        yield from CorporateAction.objects.order_by("symbol", "ex_date", "id").values_list(
+            "symbol", "ex_date", "action_type", "factor", "cash_value",
+        )
+        return
+
+    for batch in _batches(since_by_symbol):
+        yield from (
+            CorporateAction.objects.filter(_window(batch))
+            .order_by("symbol", "ex_date", "id")
+            .values_list("symbol", "ex_date", "action_type", "factor", "cash_value")
+        )
+
+
+def _seeds(since_by_symbol):
+    """
+    {symbol: (seq, cum_factor, cum_dividend)} of the last row kept, i.e.
+    the highest seq left once the window has been deleted.
+    """
+    seeds = {}
+    symbols = [symbol for symbol, since in since_by_symbol.items() if since is not None]
+
+    for start in range(0, len(symbols), REBUILD_BATCH):
+        last = (
+            AdjustmentFactor.objects
+            .filter(symbol=OuterRef("symbol"))
+            .order_by("-seq")
+            .values("seq")[:1]
+        )
+        for symbol, seq, cum_factor, cum_dividend in (
+            AdjustmentFactor.objects
+            .filter(symbol__in=symbols[start:start + REBUILD_BATCH], seq=Subquery(last))
+            .values_list("symbol", "seq", "cum_factor", "cum_dividend")
+        ):
+            seeds[symbol] = (seq, cum_factor, cum_dividend)
+
+    return seeds
+
+
+def rebuild_symbol(symbol, since=None):
+    """
+    Recomputes the index of one symbol from `since` (an ex_date) onwards,
+    seeding from the last row before it; since=None rebuilds everything.
+    """
+    return rebuild({symbol: since})
+
+
+def rebuild(since_by_symbol=None):
+    """
+    Incremental rebuild for {symbol: earliest changed ex_date}, where a
+    None date rebuilds the whole symbol; since_by_symbol=None rebuilds
+    every symbol. Set-based: the delete, the seeds and the actions are a
+    statement each per REBUILD_BATCH symbols, followed by one bulk insert
+    and one version bump. Returns the number of rows written.
+    """
+    with transaction.atomic():
+        if since_by_symbol is None:
+            symbols = set(
+                AdjustmentFactor.objects.values_list("symbol", flat=True).distinct()
+            )
+            AdjustmentFactor.objects.all().delete()
+            state = {}
+        else:
+            since_by_symbol = dict(since_by_symbol)
+            symbols = set(since_by_symbol)
+            for batch in _batches(since_by_symbol):
+                AdjustmentFactor.objects.filter(_window(batch)).delete()
+            state = _seeds(since_by_symbol)
+
+        new_rows = []
+        for symbol, ex_date, action_type, factor, cash_value in _actions(since_by_symbol):
+            seq, cum_factor, cum_dividend = state.get(symbol, (0, Decimal("1"), Decimal("0")))
+
+            if action_type in ("SPLIT", "BONUS") and factor:
+                cum_factor *= Decimal(factor)
+
+            elif action_type == "DIVIDEND" and cash_value is not None:
+                cum_dividend += cum_factor * Decimal(cash_value)
+
+            else:
+                continue
+
+            seq += 1
+            state[symbol] = (seq, cum_factor, cum_dividend)
+            symbols.add(symbol)
+            new_rows.append(AdjustmentFactor(
+                symbol=symbol,
+                seq=seq,
+                ex_date=ex_date,
+                action_type=action_type,
+                factor=factor,
+                cash_value=cash_value,
+                cum_factor=cum_factor,
+                cum_dividend=cum_dividend,
+            ))
+
+        AdjustmentFactor.objects.bulk_create(new_rows, batch_size=1000)
+
+    invalidate(symbols)
+    data_versions.bump(symbols)
+    return len(new_rows)
@@ -0,0 +1,223 @@
+# core/services/backfill.py
+
+import os
+import time
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import date as date_cls
+from decimal import Decimal
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+
+import django
+import numpy as np
+from django.db import transaction
+
+from core.models import StockPrice
+from core.services import bhavcopy_parser
+from core.services import data_versions
+from core.services import trading_calendar
+from core.utils.fixed_point import to_paise_array
+
+# Bulk backfill of bhavcopy files:
+#   parser processes  zip/CSV -> (close paise, day ordinal, symbol) arrays,
+#                     written into a shared-memory block per file
+#   this process      the single DB writer: maps each block, upserts the
+#                     rows in batches and unlinks it
+# Only a block name and a row count cross the process boundary.
+
+SYMBOL_DTYPE = np.dtype("S20")   # StockPrice.symbol max_length
+ROW_BYTES = 8 + 4 + SYMBOL_DTYPE.itemsize
+
+
+def _layout(n):
+    # int64 first so every column stays naturally aligned.
+    return (
+        (np.int64, 0),
+        (np.int32, 8 * n),
+        (SYMBOL_DTYPE, 12 * n),
+    )
+
+
+def _views(buf, n):
+    return [
+        np.ndarray(n, dtype=dtype, buffer=buf, offset=offset)
+        for dtype, offset in _layout(n)
+    ]
+
+
+def parse_to_shared(path):
+    """
+    Parser worker: returns (path, block name, rows, cpu seconds).
+    The caller owns (and must unlink) the block.
+    """
+    started = time.process_time()
+
+    df = bhavcopy_parser.parse_path(path, trade_dates=True)
+    df = df[df["close"].notna().to_numpy() & (df["trade_date"].to_numpy() > 0)]
+    n = len(df)
+
+    shm = SharedMemory(create=True, size=max(n * ROW_BYTES, 1))
+    try:
+        paise, days, symbols = _views(shm.buf, n)
+        paise[:] = to_paise_array(df["close"].to_numpy())
+        days[:] = df["trade_date"].to_numpy()
+        symbols[:] = df.index.to_numpy().astype(SYMBOL_DTYPE)
+        del paise, days, symbols
+    finally:
+        shm.close()
+
+    return path, shm.name, n, time.process_time() - started
+
+
+class Stats:
+    """
+    Per-stage totals. Parse time is summed over the workers; the writer
+    waiting on parsers (idle) means more workers would help, a writer
+    that never waits means the database is the bottleneck.
+    """
+
+    def __init__(self, workers):
+        self.workers = workers
+        self.files = 0
+        self.rows = 0
+        self.parse_seconds = 0.0
+        self.load_seconds = 0.0
+        self.write_seconds = 0.0
+        self.idle_seconds = 0.0
+        self.failed = []    # (path, error)
+        self.started = time.perf_counter()
+
+    @property
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+    def as_dict(self):
+        def rate(seconds):
+            return round(self.rows / seconds) if seconds else None
+
+        return {
+            "workers": self.workers,
+            "files": self.files,
+            "failed": len(self.failed),
+            "rows": self.rows,
+            "seconds": round(self.elapsed, 3),
+            "rows_per_sec": rate(self.elapsed),
+            "parse_rows_per_cpu_sec": rate(self.parse_seconds),
+            "load_rows_per_sec": rate(self.load_seconds),
+            "write_rows_per_sec": rate(self.write_seconds),
+            "writer_idle_pct": round(100 * self.idle_seconds / self.elapsed, 1),
+        }
+
+
+def _load(name, n):
+    """
+    Copies one block into StockPrice objects and frees it.
+    """
+    shm = SharedMemory(name=name)
+    try:
+        paise, days, symbols = _views(shm.buf, n)
+
+        dates = {d: date_cls.fromordinal(d) for d in np.unique(days).tolist()}
+        rows = [
+            StockPrice(
+                symbol=symbol,
+                trade_date=dates[day],
+                close_price=Decimal(close).scaleb(-2),
+            )
+            for symbol, day, close in zip(
+                symbols.astype(str).tolist(), days.tolist(), paise.tolist()
+            )
+        ]
+        del paise, days, symbols
+    finally:
+        shm.close()
+        shm.unlink()
+
+    return rows, set(dates.values())
+
+
+def _discard(name):
+    shm = SharedMemory(name=name)
+    shm.close()
+    shm.unlink()
+
+
+def backfill(paths, workers=None, batch_size=5_000, on_file=None):
+    """
+    Parses `paths` in a process pool and upserts every EQ close from
+    this process, one transaction per file. At most 2 x workers files
+    are parsed ahead of the writer, so memory stays flat. Unreadable
+    files are skipped and listed in stats.failed. on_file(path, rows,
+    stats) is called after each file is written. Returns Stats.
+    """
+    workers = workers or os.cpu_count() or 1
+    stats = Stats(workers)
+    sessions = set()
+
+    # Started here so that the workers share it: blocks they create are
+    # then only reported as leaked if this process never unlinks them.
+    resource_tracker.ensure_running()
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=django.setup) as pool:
+        queue = iter(paths)
+        pending = set()
+        paths_by_future = {}
+
+        def refill():
+            while len(pending) < workers * 2:
+                path = next(queue, None)
+                if path is None:
+                    return
+                future = pool.submit(parse_to_shared, path)
+                paths_by_future[future] = path
+                pending.add(future)
+
+        refill()
+        try:
+            while pending:
+                waited = time.perf_counter()
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                stats.idle_seconds += time.perf_counter() - waited
+
+                for future in done:
+                    pending.discard(future)
+                    try:
+                        path, name, n, cpu = future.result()
+                    except (ValueError, OSError, zipfile.BadZipFile) as exc:
+                        stats.failed.append((paths_by_future[future], str(exc)))
+                        continue
+                    stats.parse_seconds += cpu
+
+                    started = time.perf_counter()
+                    rows, days = _load(name, n)
+                    stats.load_seconds += time.perf_counter() - started
+
+                    started = time.perf_counter()
+                    with transaction.atomic():
+                        StockPrice.objects.bulk_create(
+                            rows,
+                            batch_size=batch_size,
+                            update_conflicts=True,
+                            unique_fields=["symbol", "trade_date"],
+                            update_fields=["close_price"],
+                        )
+                    stats.write_seconds += time.perf_counter() - started
+
+                    data_versions.bump({row.symbol for row in rows})
+                    sessions |= days
+                    stats.files += 1
+                    stats.rows += len(rows)
+
+                    if on_file is not None:
+                        on_file(path, len(rows), stats)
+
+                refill()
+        finally:
+            # A failed write leaves parsed blocks nobody will read.
+            for future in pending:
+                if not future.cancel() and future.exception() is None:
+                    _discard(future.result()[1])
+
+    trading_calendar.record_sessions(open_dates=sessions)
+    return stats
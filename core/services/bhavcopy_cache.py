@@ -0,0 +1,240 @@
+# core/services/bhavcopy_cache.py
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import date as date_cls
+from datetime import datetime
+from pathlib import Path
+
+from django.conf import settings
+
+
+_lock = threading.Lock()
+_frames = OrderedDict()
+_snapshots = OrderedDict()
+
+_stats = {
+    "disk_hits": 0,
+    "disk_misses": 0,
+    "negative_hits": 0,
+    "frame_hits": 0,
+    "frame_misses": 0,
+    "snapshot_hits": 0,
+    "snapshot_misses": 0,
+    "stores": 0,
+    "negative_stores": 0,
+    "evictions": 0,
+}
+
+
+def _cache_dir():
+    return Path(getattr(
+        settings,
+        "BHAVCOPY_CACHE_DIR",
+        settings.BASE_DIR / "cache" / "bhavcopy",
+    ))
+
+
+def _max_bytes():
+    return getattr(settings, "BHAVCOPY_CACHE_MAX_BYTES", 512 * 1024 * 1024)
+
+
+def _frame_cache_size():
+    return getattr(settings, "BHAVCOPY_FRAME_CACHE_SIZE", 32)
+
+
+def _snapshot_cache_size():
+    return getattr(settings, "BHAVCOPY_SNAPSHOT_CACHE_SIZE", 256)
+
+
+def _negative_ttl():
+    return getattr(settings, "BHAVCOPY_NEGATIVE_TTL", 3600)
+
+
+def _count(key, n=1):
+    with _lock:
+        _stats[key] += n
+
+
+def _date_path(date: str):
+    return _cache_dir() / "dates" / f"{date}.json"
+
+
+def _object_path(digest: str):
+    return _cache_dir() / "objects" / digest[:2] / f"{digest}.zip"
+
+
+def _atomic_write(path: Path, data: bytes):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}")
+    with open(tmp, "wb") as fh:
+        fh.write(data)
+    os.replace(tmp, path)
+
+
+def is_settled(date: str):
+    """
+    A missing bhavcopy is only final once the day is safely in the past;
+    NSE publishes the current session's file in the evening.
+    """
+    dt = datetime.strptime(date, "%Y-%m-%d").date()
+    return (date_cls.today() - dt).days > 3
+
+
+# -------------------------
+# Archive (on-disk) cache
+# -------------------------
+
+def lookup_archive(date: str):
+    """
+    Returns (hit, content) for a trade date.
+    hit=True with content=None means the date is negatively cached
+    (holiday / weekend: no bhavcopy published).
+    """
+    path = _date_path(date)
+
+    try:
+        entry = json.loads(path.read_text())
+    except (OSError, ValueError):
+        _count("disk_misses")
+        return False, None
+
+    if entry.get("missing"):
+        if is_settled(date) or time.time() - entry["checked_at"] < _negative_ttl():
+            _count("negative_hits")
+            return True, None
+
+        path.unlink(missing_ok=True)
+        _count("disk_misses")
+        return False, None
+
+    obj = _object_path(entry["sha256"])
+
+    try:
+        content = obj.read_bytes()
+    except OSError:
+        # Object was evicted; drop the dangling date entry.
+        path.unlink(missing_ok=True)
+        _count("disk_misses")
+        return False, None
+
+    os.utime(obj)
+    _count("disk_hits")
+    return True, content
+
+
+def store_archive(date: str, content: bytes, url: str = ""):
+    digest = hashlib.sha256(content).hexdigest()
+    obj = _object_path(digest)
+
+    if not obj.exists():
+        _atomic_write(obj, content)
+
+    entry = {"sha256": digest, "size": len(content), "url": url}
+    _atomic_write(_date_path(date), json.dumps(entry).encode())
+    _count("stores")
+
+    evict()
+
+
+def store_missing(date: str):
+    entry = {"missing": True, "checked_at": time.time()}
+    _atomic_write(_date_path(date), json.dumps(entry).encode())
+    _count("negative_stores")
+
+
+def evict():
+    """
+    Least-recently-used eviction of archive objects until the cache
+    fits inside BHAVCOPY_CACHE_MAX_BYTES.
+    """
+    root = _cache_dir() / "objects"
+    if not root.exists():
+        return
+
+    objects = []
+    total = 0
+    for path in root.glob("*/*.zip"):
+        st = path.stat()
+        objects.append((st.st_mtime, st.st_size, path))
+        total += st.st_size
+
+    limit = _max_bytes()
+    if total <= limit:
+        return
+
+    objects.sort()
+    for _, size, path in objects:
+        if total <= limit:
+            break
+        path.unlink(missing_ok=True)
+        total -= size
+        _count("evictions")
+
+
+# -------------------------
+# Parsed DataFrame LRU
+# -------------------------
+
+def get_frame(date: str):
+    with _lock:
+        df = _frames.get(date)
+        if df is None:
+            _stats["frame_misses"] += 1
+            return None
+
+        _frames.move_to_end(date)
+        _stats["frame_hits"] += 1
+        return df
+
+
+def put_frame(date: str, df):
+    with _lock:
+        _frames[date] = df
+        _frames.move_to_end(date)
+
+        while len(_frames) > _frame_cache_size():
+            _frames.popitem(last=False)
+
+
+# -------------------------
+# Per-date price snapshots
+# -------------------------
+
+def get_snapshot(date: str):
+    with _lock:
+        snapshot = _snapshots.get(date)
+        if snapshot is None:
+            _stats["snapshot_misses"] += 1
+            return None
+
+        _snapshots.move_to_end(date)
+        _stats["snapshot_hits"] += 1
+        return snapshot
+
+
+def put_snapshot(date: str, snapshot):
+    with _lock:
+        _snapshots[date] = snapshot
+        _snapshots.move_to_end(date)
+
+        while len(_snapshots) > _snapshot_cache_size():
+            _snapshots.popitem(last=False)
+
+
+def clear_frames():
+    with _lock:
+        _frames.clear()
+        _snapshots.clear()
+
+
+def cache_stats():
+    with _lock:
+        stats = dict(_stats)
+        stats["frames_cached"] = len(_frames)
+        stats["snapshots_cached"] = len(_snapshots)
+    return stats
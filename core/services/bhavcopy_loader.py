@@ -0,0 +1,111 @@
+# core/services/bhavcopy_loader.py
+
+import math
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import timedelta
+
+from django.db.models import Count
+
+from core.models import StockPrice
+from core.models import TradingDay
+from core.services import nse_price_provider
+from core.services import trading_calendar
+from core.services.db_price_provider import store_stock_prices
+
+
+def candidate_dates(start_date, end_date, symbols=None):
+    """
+    Weekdays in [start_date, end_date] still worth fetching, so that
+    reruns resume where they stopped: not a known closure and not already
+    complete in StockPrice. A date is complete once every one of
+    `symbols` has its close, or, without symbols, once it holds a full
+    session (FULL_SESSION_MIN_SYMBOLS closes); a few written-back closes
+    do not make it complete.
+    """
+    present = StockPrice.objects.filter(
+        trade_date__gte=start_date, trade_date__lte=end_date
+    )
+    if symbols:
+        present = present.filter(symbol__in=symbols)
+        needed = len(set(symbols))
+    else:
+        needed = trading_calendar.FULL_SESSION_MIN_SYMBOLS
+
+    skip = {
+        trade_date
+        for trade_date, n in (
+            present
+            .values("trade_date")
+            .annotate(n=Count("symbol", distinct=True))
+            .values_list("trade_date", "n")
+        )
+        if n >= needed
+    }
+    skip.update(
+        TradingDay.objects
+        .filter(trade_date__gte=start_date, trade_date__lte=end_date, is_open=False)
+        .values_list("trade_date", flat=True)
+    )
+
+    dates = []
+    day = start_date
+    while day <= end_date:
+        if day.weekday() < 5 and day not in skip:
+            dates.append(day)
+        day += timedelta(days=1)
+
+    return dates
+
+
+def snapshot_rows(trading_date: str, snapshot, symbols=None):
+    """
+    (symbol, trade_date_str, close) rows of one {symbol: OHLCV} snapshot.
+    """
+    if symbols:
+        items = ((s, snapshot[s]) for s in symbols if s in snapshot)
+    else:
+        items = snapshot.items()
+
+    return [
+        (symbol, trading_date, quote.close)
+        for symbol, quote in items
+        if quote.close is not None and not math.isnan(quote.close)
+    ]
+
+
+def _fetch(trading_date: str):
+    return trading_date, nse_price_provider.get_price_snapshot(trading_date)
+
+
+def load_dates(dates, symbols=None, workers=4):
+    """
+    Downloads the bhavcopy of every date once (in parallel) and bulk-loads
+    its EQ closes into StockPrice on the calling thread. Yields
+    (date_str, rows_written, error) as each date completes: rows_written
+    is None for dates without a bhavcopy, or when the download failed,
+    with the exception in error. A failed date does not stop the others.
+    """
+    keys = [d.strftime("%Y-%m-%d") for d in dates]
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(_fetch, key): key for key in keys}
+
+        for future in as_completed(futures):
+            try:
+                trading_date, snapshot = future.result()
+            except Exception as exc:
+                yield futures[future], None, exc
+                continue
+
+            if snapshot is None:
+                yield trading_date, None, None
+                continue
+
+            rows = snapshot_rows(trading_date, snapshot, symbols)
+            if rows:
+                store_stock_prices(rows)
+
+            # Archives already on disk skip the fetch-time calendar update.
+            trading_calendar.record_sessions(open_dates=[trading_date])
+
+            yield trading_date, len(rows), None
@@ -0,0 +1,173 @@
+# core/services/bhavcopy_parser.py
+
+import csv
+import io
+import os
+import zipfile
+from datetime import datetime
+from importlib.util import find_spec
+
+import numpy as np
+import pandas as pd
+
+# Column names (upper-cased, stripped) per field across the NSE schemas:
+# UDiFF (TckrSymb...), sec_bhavdata_full (CLOSE_PRICE...) and the old
+# cm...bhav.csv (CLOSE...).
+COLUMN_MAP = {
+    "SYMBOL": ["SYMBOL", "TCKRSYMB", "SC_NAME"],
+    "SERIES": ["SERIES", "SCTYSRS"],
+    "OPEN": ["OPEN_PRICE", "OPEN", "OPNPRIC"],
+    "HIGH": ["HIGH_PRICE", "HIGH", "HGHPRIC"],
+    "LOW": ["LOW_PRICE", "LOW", "LWPRIC"],
+    "CLOSE": ["CLOSE_PRICE", "CLOSE", "CLSPRIC"],
+    "VOLUME": ["TTL_TRD_QNTY", "TOTTRDQTY", "TTLTRADGVOL"],
+    "DATE": ["DATE1", "TIMESTAMP", "TRADDT"],
+}
+
+PRICE_FIELDS = ("OPEN", "HIGH", "LOW", "CLOSE", "VOLUME")
+
+HAS_PYARROW = find_spec("pyarrow") is not None
+
+# pyarrow's thread-pool start-up costs more than it saves on small files.
+PYARROW_MIN_BYTES = 512 * 1024
+
+
+def read_header(z: zipfile.ZipFile, name: str):
+    return _header(lambda: z.open(name))
+
+
+def _header(open_file):
+    with open_file() as f:
+        line = f.readline().decode("utf-8-sig")
+    return next(csv.reader([line]))
+
+
+def detect_schema(header):
+    """
+    Maps each COLUMN_MAP field to the raw header name present in the file
+    (None when absent). Raises ValueError without symbol or close.
+    """
+    present = {column.strip().upper(): column for column in header}
+
+    schema = {
+        field: next((present[k] for k in keys if k in present), None)
+        for field, keys in COLUMN_MAP.items()
+    }
+
+    if not schema["SYMBOL"] or not schema["CLOSE"]:
+        raise ValueError(f"Unsupported NSE structure: {header}")
+
+    return schema
+
+
+def _read(open_file, size, schema, text_fields):
+    usecols = [
+        schema[field] for field in text_fields + PRICE_FIELDS
+        if schema[field]
+    ]
+    dtype = {column: "float64" for column in usecols}
+    for field in text_fields:
+        if schema[field]:
+            dtype[schema[field]] = "str"
+
+    if HAS_PYARROW and size >= PYARROW_MIN_BYTES:
+        try:
+            with open_file() as f:
+                return pd.read_csv(f, usecols=usecols, dtype=dtype, engine="pyarrow")
+        except Exception:
+            pass    # fall back to the C engine below
+
+    try:
+        with open_file() as f:
+            return pd.read_csv(f, usecols=usecols, dtype=dtype)
+    except ValueError:
+        # Non-numeric placeholders ("-") in a price column.
+        with open_file() as f:
+            df = pd.read_csv(f, usecols=usecols, dtype=str)
+
+        for field in PRICE_FIELDS:
+            if schema[field]:
+                df[schema[field]] = pd.to_numeric(
+                    df[schema[field]].str.strip(), errors="coerce"
+                )
+        return df
+
+
+def _day_ordinals(values):
+    """
+    Date ordinals (int32) for a column of NSE date strings: ISO (UDiFF)
+    or 01-Jan-2024 (older schemas). Each distinct string is parsed once;
+    unparseable ones become 0.
+    """
+    codes, uniques = pd.factorize(values.astype(str).str.strip())
+
+    ordinals = np.zeros(len(uniques) + 1, dtype=np.int32)
+    for i, text in enumerate(uniques):
+        for fmt in ("%Y-%m-%d", "%d-%b-%Y"):
+            try:
+                ordinals[i] = datetime.strptime(text, fmt).toordinal()
+                break
+            except ValueError:
+                pass
+
+    return ordinals[codes]  # code -1 (missing) picks the trailing 0
+
+
+def parse(content: bytes, trade_dates=False):
+    """
+    Parses a bhavcopy zip into a compact frame of the EQ series: index
+    symbol (upper-cased, stripped, unique), float64 columns open, high,
+    low, close, volume. Only those columns are read from the CSV.
+    With trade_dates, an int32 trade_date column (date ordinals, 0 when
+    missing) is added and rows are unique per (symbol, trade_date), so
+    multi-day files work too.
+    """
+    z = zipfile.ZipFile(io.BytesIO(content))
+    name = z.namelist()[0]
+
+    return _parse(lambda: z.open(name), z.getinfo(name).file_size, trade_dates)
+
+
+def parse_path(path, trade_dates=False):
+    """
+    parse() for a bhavcopy on disk, zipped or plain CSV.
+    """
+    if zipfile.is_zipfile(path):
+        with open(path, "rb") as f:
+            return parse(f.read(), trade_dates)
+
+    return _parse(lambda: open(path, "rb"), os.path.getsize(path), trade_dates)
+
+
+def _parse(open_file, size, trade_dates):
+    schema = detect_schema(_header(open_file))
+
+    text_fields = ("SYMBOL", "SERIES", "DATE") if trade_dates else ("SYMBOL", "SERIES")
+    df = _read(open_file, size, schema, text_fields)
+
+    if schema["SERIES"]:
+        series = df[schema["SERIES"]].astype(str).str.strip().str.upper()
+        df = df[series.to_numpy() == "EQ"]
+
+    symbols = df[schema["SYMBOL"]].astype(str).str.strip().str.upper()
+
+    columns = {
+        field.lower(): (
+            df[schema[field]].to_numpy(dtype=np.float64)
+            if schema[field] else np.nan
+        )
+        for field in PRICE_FIELDS
+    }
+    if trade_dates:
+        columns["trade_date"] = (
+            _day_ordinals(df[schema["DATE"]]) if schema["DATE"]
+            else np.zeros(len(df), dtype=np.int32)
+        )
+
+    frame = pd.DataFrame(columns, index=pd.Index(symbols.to_numpy(), name="symbol"))
+
+    if trade_dates:
+        keys = pd.MultiIndex.from_arrays([frame.index, frame["trade_date"]])
+        return frame[~keys.duplicated(keep="first")]
+
+    return frame[~frame.index.duplicated(keep="first")]
@@ -0,0 +1,65 @@
+# core/services/data_versions.py
+
+from django.db import connection
+from django.db import transaction
+from django.db.models import F
+
+from core.models import DataVersion
+
+# Per-symbol data version. Anything cached from a symbol's prices or
+# corporate actions includes this in its key; bumping it orphans every
+# such entry at once. MARKET is bumped along with any symbol, for
+# results that span every symbol (e.g. the screener).
+# Versions live in the database rather than a cache so that every worker
+# process sees a bump at once and none is ever evicted; a symbol without
+# a row is at version 1.
+
+MARKET = "*"
+
+
+def _key(symbol):
+    return symbol.upper().strip()
+
+
+def get_version(symbol):
+    return get_versions([symbol])[symbol]
+
+
+def _batches(keys):
+    keys = sorted(keys)
+    batch = max(connection.features.max_query_params or 2000, 1)
+    for start in range(0, len(keys), batch):
+        yield keys[start:start + batch]
+
+
+def get_versions(symbols):
+    keys = {_key(s): s for s in symbols}
+    found = {}
+    for batch in _batches(keys):
+        found.update(
+            DataVersion.objects
+            .filter(key__in=batch)
+            .values_list("key", "version")
+        )
+
+    return {symbol: found.get(key, 1) for key, symbol in keys.items()}
+
+
+def bump(symbols):
+    keys = {_key(s) for s in symbols}
+    if not keys:
+        return
+
+    keys.add(MARKET)
+
+    with transaction.atomic():
+        # Rows start at the implicit version 1; the increment is done by
+        # the database, so concurrent bumps never collapse into one.
+        DataVersion.objects.bulk_create(
+            [DataVersion(key=key) for key in keys],
+            ignore_conflicts=True,
+        )
+        for batch in _batches(keys):
+            DataVersion.objects.filter(key__in=batch).update(
+                version=F("version") + 1
+            )
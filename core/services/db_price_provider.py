@@ -0,0 +1,126 @@
+# core/services/db_price_provider.py
+
+from datetime import date as date_cls
+from datetime import datetime
+from datetime import timedelta
+from decimal import Decimal
+
+from django.conf import settings
+
+from core.models import StockPrice
+from core.services import data_versions
+from core.services import price_store
+from core.services import trading_calendar
+
+def _is_weekend_gap(trade_date, target):
+    # Without calendar coverage: a Fri close answers Sat/Sun; anything older
+    # must come from the network (the session may not be imported yet).
+    day = trade_date + timedelta(days=1)
+    while day <= target:
+        if day.weekday() < 5:
+            return False
+        day += timedelta(days=1)
+    return True
+
+
+def get_stock_prices_db(symbol: str, dates):
+    """
+    Returns {date_str: close} for every date whose last close on or before
+    it is present in StockPrice. Dates that cannot be answered from the
+    table are left out. One indexed query for all dates.
+    """
+    symbol = symbol.upper().strip()
+    found, _ = get_stock_prices_db_many([(symbol, d) for d in dates])
+    return {d: price for (_, d), price in found.items()}
+
+
+def get_stock_prices_db_many(pairs):
+    """
+    Batch form of get_stock_prices_db for (symbol, date_str) pairs.
+    Returns (prices, errors) keyed by pair. Pairs are answered from the
+    columnar price store when one is built and their symbol has not been
+    written since, the rest with one as-of
+    query; errors holds a StalePriceError for symbols whose last close
+    is older than PRICE_MAX_STALENESS_DAYS.
+    """
+    pairs = set(pairs)
+    if not pairs:
+        return {}, {}
+
+    targets = {
+        d: datetime.strptime(d, "%Y-%m-%d").date() for _, d in pairs
+    }
+    sessions = {
+        d: trading_calendar.previous_session(target)
+        for d, target in targets.items()
+    }
+
+    prices = {}
+
+    store = price_store.get_store()
+    if store is not None:
+        fresh = store.fresh({symbol for symbol, _ in pairs})
+        for symbol, date in pairs:
+            if symbol not in fresh:
+                continue
+
+            row = store.asof(symbol, targets[date].toordinal())
+            if row is None:
+                continue
+
+            trade_date = date_cls.fromordinal(row[0])
+            if _accept(trade_date, targets[date], sessions[date]):
+                prices[(symbol, date)] = row[1] / 100
+
+        pairs = {pair for pair in pairs if pair not in prices}
+        if not pairs:
+            return prices, {}
+
+    found, errors = StockPrice.objects.asof_pairs(pairs, _max_staleness())
+
+    for (symbol, date), (trade_date, close) in found.items():
+        if _accept(trade_date, targets[date], sessions[date]):
+            prices[(symbol, date)] = float(close)
+
+    return prices, errors
+
+
+def _max_staleness():
+    return getattr(settings, "PRICE_MAX_STALENESS_DAYS", 30)
+
+
+def _accept(trade_date, target, session):
+    """
+    A stored close answers `target` only if it is the calendar's previous
+    session, or (without calendar coverage) only a weekend lies between.
+    """
+    return trade_date == session or _is_weekend_gap(trade_date, target)
+
+
+def store_stock_price(symbol: str, trade_date: str, close: float):
+    """
+    Writes a network-fetched close back into StockPrice.
+    Existing rows are left untouched.
+    """
+    store_stock_prices([(symbol, trade_date, close)])
+
+
+def store_stock_prices(rows):
+    """
+    Bulk write-back of (symbol, trade_date_str, close) rows.
+    """
+    rows = list(rows)
+
+    StockPrice.objects.bulk_create(
+        [
+            StockPrice(
+                symbol=symbol.upper().strip(),
+                trade_date=datetime.strptime(trade_date, "%Y-%m-%d").date(),
+                close_price=Decimal(str(close)).quantize(Decimal("0.01")),
+            )
+            for symbol, trade_date, close in rows
+        ],
+        ignore_conflicts=True,
+    )
+
+    data_versions.bump(symbol for symbol, _, _ in rows)
@@ -0,0 +1,230 @@
+# core/services/http_client.py
+
+import random
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# Upper bounds (seconds) of the latency histogram buckets.
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+
+class CircuitOpenError(Exception):
+    pass
+
+
+class CircuitBreaker:
+    """
+    Opens after `threshold` consecutive failures and rejects calls for
+    `cooldown` seconds; after that a single trial call is let through
+    (half-open) and its outcome closes or re-opens the circuit.
+    """
+
+    def __init__(self, threshold=5, cooldown=300):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = None
+        self._trial = False
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._state()
+
+    def _state(self):
+        if self._opened_at is None:
+            return "closed"
+        if time.monotonic() - self._opened_at >= self.cooldown:
+            return "half-open"
+        return "open"
+
+    def allow(self):
+        with self._lock:
+            state = self._state()
+            if state == "closed":
+                return True
+            if state == "half-open" and not self._trial:
+                self._trial = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._trial or self._failures >= self.threshold:
+                self._opened_at = time.monotonic()
+            self._trial = False
+
+
+class _Metrics:
+    def __init__(self):
+        self.requests = 0
+        self.failures = 0
+        self.retries = 0
+        self.rejected = 0
+        self.statuses = {}
+        self.latency_total = 0.0
+        self.latency_max = 0.0
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+
+    def observe(self, seconds, status):
+        self.requests += 1
+        self.latency_total += seconds
+        self.latency_max = max(self.latency_max, seconds)
+        self.statuses[status] = self.statuses.get(status, 0) + 1
+
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if seconds <= bound:
+                self.buckets[i] += 1
+                break
+        else:
+            self.buckets[-1] += 1
+
+    def as_dict(self):
+        return {
+            "requests": self.requests,
+            "failures": self.failures,
+            "retries": self.retries,
+            "rejected": self.rejected,
+            "statuses": dict(self.statuses),
+            "latency_avg": (
+                self.latency_total / self.requests if self.requests else None
+            ),
+            "latency_max": self.latency_max,
+            "latency_buckets": dict(zip(
+                [str(b) for b in LATENCY_BUCKETS] + ["+Inf"], self.buckets
+            )),
+        }
+
+
+class ProviderClient:
+    """
+    Shared HTTP client for one upstream provider: keep-alive session
+    pool, bounded concurrency, exponential backoff with jitter on
+    throttling / transient errors, a circuit breaker, and per-label
+    (e.g. URL format) latency and failure metrics.
+    """
+
+    def __init__(
+        self,
+        name,
+        headers=None,
+        pool_size=16,
+        max_concurrency=4,
+        retries=3,
+        backoff=0.5,
+        breaker=None,
+    ):
+        self.name = name
+        self.retries = retries
+        self.backoff = backoff
+        self.breaker = breaker or CircuitBreaker()
+
+        self._session = requests.Session()
+        self._session.headers.update(headers or {})
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size)
+        self._session.mount("https://", adapter)
+        self._session.mount("http://", adapter)
+
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._lock = threading.Lock()
+        self._metrics = {}
+
+    def _label_metrics(self, label):
+        with self._lock:
+            if label not in self._metrics:
+                self._metrics[label] = _Metrics()
+            return self._metrics[label]
+
+    def get(self, url, label="default", timeout=30):
+        """
+        Returns the final Response (any non-retryable status, e.g. 200 or
+        404). Raises CircuitOpenError while the circuit is open, or the
+        last error once retries are exhausted.
+        """
+        metrics = self._label_metrics(label)
+
+        if not self.breaker.allow():
+            with self._lock:
+                metrics.rejected += 1
+            raise CircuitOpenError(f"{self.name} circuit is open")
+
+        # Every way out of the loop (including an unexpected exception)
+        # records the outcome, so a half-open trial is always settled.
+        succeeded = False
+        try:
+            response = self._attempts(url, timeout, metrics)
+            succeeded = (
+                response is not None
+                and response.status_code not in RETRY_STATUSES
+            )
+            return response
+        finally:
+            if succeeded:
+                self.breaker.record_success()
+            else:
+                self.breaker.record_failure()
+
+    def _attempts(self, url, timeout, metrics):
+        attempt = 0
+        while True:
+            started = time.perf_counter()
+            error = None
+            response = None
+
+            with self._slots:
+                try:
+                    response = self._session.get(url, timeout=timeout)
+                except requests.RequestException as e:
+                    error = e
+
+            elapsed = time.perf_counter() - started
+            status = response.status_code if response is not None else "error"
+
+            with self._lock:
+                metrics.observe(elapsed, status)
+
+            if error is None and response.status_code not in RETRY_STATUSES:
+                return response
+
+            if attempt >= self.retries:
+                with self._lock:
+                    metrics.failures += 1
+
+                if error is not None:
+                    raise error
+                return response
+
+            attempt += 1
+            with self._lock:
+                metrics.retries += 1
+
+            delay = self.backoff * (2 ** (attempt - 1))
+            if response is not None and response.headers.get("Retry-After", "").isdigit():
+                delay = max(delay, int(response.headers["Retry-After"]))
+
+            time.sleep(delay * (0.5 + random.random()))
+
+    def metrics(self):
+        with self._lock:
+            labels = {
+                label: m.as_dict() for label, m in self._metrics.items()
+            }
+
+        return {
+            "provider": self.name,
+            "circuit": self.breaker.state,
+            "formats": labels,
+        }
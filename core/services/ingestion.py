@@ -0,0 +1,175 @@
+# core/services/ingestion.py
+
+import os
+from contextlib import contextmanager
+from datetime import date as date_cls
+from datetime import timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import transaction
+
+from core.models import IngestionCheckpoint
+from core.models import StockPrice
+from core.models import TradingDay
+from core.services import bhavcopy_cache
+from core.services import data_versions
+from core.services import nse_price_provider
+from core.services import trading_calendar
+
+try:
+    import fcntl
+except ImportError:     # Windows: no cron, no lock
+    fcntl = None
+
+CHECKPOINT = "nse_bhavcopy"
+
+# Where a pipeline without a checkpoint (or stored prices) starts.
+BOOTSTRAP_DAYS = 7
+
+
+class IngestionLocked(Exception):
+    pass
+
+
+@contextmanager
+def ingestion_lock(name=CHECKPOINT):
+    """
+    Non-blocking per-pipeline file lock, so overlapping cron runs exit
+    instead of ingesting the same session twice.
+    """
+    lock_dir = os.fspath(getattr(
+        settings,
+        "INGEST_LOCK_DIR",
+        settings.BASE_DIR / "cache",
+    ))
+    os.makedirs(lock_dir, exist_ok=True)
+
+    with open(os.path.join(lock_dir, f"{name}.lock"), "w") as f:
+        if fcntl is not None:
+            try:
+                fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                raise IngestionLocked(f"{name} ingestion already running")
+        yield
+
+
+def _start_date(checkpoint):
+    if checkpoint.last_trade_date:
+        return checkpoint.last_trade_date + timedelta(days=1)
+
+    # Not simply the latest stored date: a few written-back closes for
+    # today would skip the sessions before it.
+    latest = trading_calendar.last_full_session()
+    if latest:
+        return latest + timedelta(days=1)
+
+    return date_cls.today() - timedelta(days=BOOTSTRAP_DAYS)
+
+
+def frame_rows(df, trading_date):
+    """
+    StockPrice objects for a parsed bhavcopy frame (EQ rows indexed by
+    symbol, either NSE schema; see bhavcopy_parser).
+    """
+    closes = df["close"].dropna().round(2)
+
+    return [
+        StockPrice(
+            symbol=symbol,
+            trade_date=trading_date,
+            close_price=Decimal(str(close)),
+        )
+        for symbol, close in zip(closes.index.tolist(), closes.tolist())
+    ]
+
+
+def ingest(until=None, start=None, max_days=None, batch_size=5_000):
+    """
+    Ingests every session after the checkpoint up to `until` (default
+    today), oldest first. Each session's upsert and checkpoint move
+    commit together. Stops at the first date whose bhavcopy could not be
+    had and is not a known holiday (not published yet, or a failed
+    download), so the next run retries it. Returns
+    [(date, rows or None)] for the dates processed.
+    """
+    until = until or date_cls.today()
+
+    with ingestion_lock():
+        checkpoint, _ = IngestionCheckpoint.objects.get_or_create(name=CHECKPOINT)
+        day = start or _start_date(checkpoint)
+
+        done = []
+        while day <= until and (max_days is None or len(done) < max_days):
+            if day.weekday() >= 5:
+                day += timedelta(days=1)
+                continue
+
+            key = day.strftime("%Y-%m-%d")
+            df = nse_price_provider.download_bhavcopy(key)
+
+            if df is None:
+                if not _is_holiday(day, key, until):
+                    break
+
+                _advance(checkpoint, day)
+                done.append((day, None))
+                day += timedelta(days=1)
+                continue
+
+            rows = frame_rows(df, day)
+
+            with transaction.atomic():
+                StockPrice.objects.bulk_create(
+                    rows,
+                    batch_size=batch_size,
+                    update_conflicts=True,
+                    unique_fields=["symbol", "trade_date"],
+                    update_fields=["close_price"],
+                )
+                _advance(checkpoint, day)
+
+            data_versions.bump(row.symbol for row in rows)
+            trading_calendar.record_sessions(open_dates=[day])
+
+            done.append((day, len(rows)))
+            day += timedelta(days=1)
+
+        return done
+
+
+def _is_holiday(day, key, until):
+    """
+    A weekday without a bhavcopy is a holiday only when the absence is on
+    record: a known closure, or a cached 404 that can no longer change
+    (the date is settled, or a later session is already published). A
+    timeout, throttling or an unreadable archive also leave df None, and
+    must be retried instead.
+    """
+    if TradingDay.objects.filter(trade_date=day, is_open=False).exists():
+        return True
+
+    hit, content = bhavcopy_cache.lookup_archive(key)
+    if not (hit and content is None):
+        return False
+
+    return bhavcopy_cache.is_settled(key) or _published_after(day, until)
+
+
+def _published_after(day, until):
+    # The next weekdays' archives are fetched (and cached) anyway once
+    # the checkpoint moves on.
+    last = min(until, day + timedelta(days=trading_calendar.MAX_HOLIDAY_GAP_DAYS))
+    day += timedelta(days=1)
+    while day <= last:
+        if day.weekday() < 5:
+            key = day.strftime("%Y-%m-%d")
+            if nse_price_provider.download_bhavcopy(key) is not None:
+                return True
+        day += timedelta(days=1)
+    return False
+
+
+def _advance(checkpoint, day):
+    checkpoint.last_trade_date = day
+    checkpoint.save(update_fields=["last_trade_date", "updated_at"])
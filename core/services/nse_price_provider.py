@@ -1,123 +1,249 @@
 # core/services/nse_price_provider.py
 
-import requests
-import pandas as pd
-import zipfile
-import io
+from collections import namedtuple
 from datetime import datetime
 from datetime import timedelta
 
+from django.conf import settings
+
+from core.services import bhavcopy_cache
+from core.services import bhavcopy_parser
+from core.services import trading_calendar
+from core.services.http_client import CircuitBreaker
+from core.services.http_client import ProviderClient
+from core.utils.single_flight import SingleFlight
+from core.utils.tracing import traced
+
 HEADERS = {
     "User-Agent": "Mozilla/5.0",
     "Referer": "https://www.nseindia.com",
     "Accept": "*/*"
 }
 
-
-def download_bhavcopy(date: str):
-    dt = datetime.strptime(date, "%Y-%m-%d")
-
-    urls = [
+OHLCV = namedtuple("OHLCV", ["open", "high", "low", "close", "volume"])
+
+# Concurrent requests for the same date share one download / parse.
+_flight = SingleFlight()
+
+# Shared by every thread of the process. While the circuit is open,
+# archive fetches fail fast and callers fall back to the local cache,
+# StockPrice or Yahoo.
+client = ProviderClient(
+    "nse",
+    headers=HEADERS,
+    pool_size=getattr(settings, "NSE_HTTP_POOL_SIZE", 16),
+    max_concurrency=getattr(settings, "NSE_HTTP_MAX_CONCURRENCY", 4),
+    retries=getattr(settings, "NSE_HTTP_RETRIES", 3),
+    backoff=getattr(settings, "NSE_HTTP_BACKOFF", 0.5),
+    breaker=CircuitBreaker(
+        threshold=getattr(settings, "NSE_BREAKER_THRESHOLD", 5),
+        cooldown=getattr(settings, "NSE_BREAKER_COOLDOWN", 300),
+    ),
+)
+
+
+def _archive_urls(dt: datetime):
+    base = getattr(
+        settings,
+        "NSE_ARCHIVE_BASE_URL",
+        "https://archives.nseindia.com/content/cm/",
+    )
+
+    return [
         # New format
-        f"https://archives.nseindia.com/content/cm/"
-        f"BhavCopy_NSE_CM_0_0_0_{dt.strftime('%Y%m%d')}_F_0000.csv.zip",
+        ("new", f"{base}BhavCopy_NSE_CM_0_0_0_{dt.strftime('%Y%m%d')}_F_0000.csv.zip"),
 
         # Old fallback format
-        f"https://archives.nseindia.com/content/cm/"
-        f"cm{dt.strftime('%d%b%Y').upper()}bhav.csv.zip"
+        ("old", f"{base}cm{dt.strftime('%d%b%Y').upper()}bhav.csv.zip"),
     ]
 
-    for url in urls:
+
+@traced("nse.download")
+def _download_archive(date: str):
+    """
+    Fetches the raw bhavcopy zip from NSE.
+    Returns (content, url, definitive); definitive is True only when every
+    URL answered 404, i.e. the exchange was closed on that day.
+    """
+    dt = datetime.strptime(date, "%Y-%m-%d")
+    definitive = True
+
+    for label, url in _archive_urls(dt):
         try:
-            r = requests.get(url, headers=HEADERS, timeout=30)
-            if r.status_code != 200:
-                continue
+            r = client.get(url, label=label, timeout=30)
+        except Exception:
+            definitive = False
+            continue
 
-            if not r.content.startswith(b"PK"):
-                continue
+        if r.status_code != 200:
+            if r.status_code != 404:
+                definitive = False
+            continue
 
-            z = zipfile.ZipFile(io.BytesIO(r.content))
-            csv_file = z.namelist()[0]
+        if not r.content.startswith(b"PK"):
+            definitive = False
+            continue
 
-            df = pd.read_csv(z.open(csv_file))
+        return r.content, url, True
 
-            df.columns = (
-                df.columns.astype(str)
-                .str.upper()
-                .str.strip()
-            )
+    return None, None, definitive
 
-            return df
 
-        except Exception:
-            continue
+def fetch_bhavcopy_archive(date: str):
+    """
+    Returns the bhavcopy zip bytes for a date, served from the local
+    archive cache when possible. None when no bhavcopy exists.
+    """
+    hit, content = bhavcopy_cache.lookup_archive(date)
+    if hit:
+        return content
+
+    return _flight.do(("archive", date), _fetch_and_store_archive, date)
+
+
+def _fetch_and_store_archive(date: str):
+    hit, content = bhavcopy_cache.lookup_archive(date)
+    if hit:
+        return content
+
+    content, url, definitive = _download_archive(date)
+
+    if content is not None:
+        bhavcopy_cache.store_archive(date, content, url)
+        trading_calendar.record_sessions(open_dates=[date])
+    elif definitive:
+        bhavcopy_cache.store_missing(date)
+        # A 404 is only a closure once the file can no longer appear:
+        # today's bhavcopy is published in the evening.
+        if bhavcopy_cache.is_settled(date) or trading_calendar.has_session_after(date):
+            trading_calendar.record_sessions(closed_dates=[date])
+
+    return content
+
+
+@traced("nse.parse")
+def _parse_archive(content: bytes):
+    return bhavcopy_parser.parse(content)
+
+
+def download_bhavcopy(date: str):
+    """
+    Returns the parsed bhavcopy for a date (EQ series indexed by symbol,
+    see bhavcopy_parser.parse), or None if unavailable.
+    The DataFrame is shared through the in-process LRU; do not mutate it.
+    """
+    df = bhavcopy_cache.get_frame(date)
+    if df is not None:
+        return df
+
+    content = fetch_bhavcopy_archive(date)
+    if content is None:
+        return None
+
+    try:
+        df = _parse_archive(content)
+    except Exception:
+        return None
 
-    return None
+    bhavcopy_cache.put_frame(date, df)
+    return df
 
 
 def get_stock_price(symbol: str, date: str):
     """
     Returns NSE official price for given symbol and date.
     """
+    return get_stock_quote(symbol, date)[1]
+
+
+def get_stock_quote(symbol: str, date: str):
+    """
+    Returns (trading_date, close) from the NSE bhavcopy of the last
+    trading day on or before the given date.
+    """
+    symbol = symbol.upper().strip()
+    quotes = get_stock_quotes([symbol], date)
+
+    if symbol not in quotes:
+        raise ValueError(f"{symbol} not found on {date}")
+
+    return quotes[symbol]
+
+
+def get_stock_quotes(symbols, date: str):
+    """
+    Batch form of get_stock_quote: one bhavcopy serves every symbol.
+    Returns {symbol: (trading_date, close)} for the symbols found.
+    """
 
     trading_date = get_previous_trading_day(date)
-    df = download_bhavcopy(trading_date)
+    snapshot = get_price_snapshot(trading_date)
 
-    if df is None:
+    if snapshot is None:
         raise ValueError(f"Bhavcopy not found for {trading_date}")
 
-  
+    quotes = {}
+    for symbol in symbols:
+        symbol = symbol.upper().strip()
+        if symbol in snapshot:
+            quotes[symbol] = (trading_date, snapshot[symbol].close)
 
-    symbol = symbol.upper().strip()
+    return quotes
 
-    column_map = {
-        "SYMBOL": ["SYMBOL", "TCKRSYMB", "SC_NAME"],
-        "SERIES": ["SERIES", "SCTYSRS"],
-        "OPEN": ["OPEN_PRICE", "OPEN", "OPNPRIC"],
-        "HIGH": ["HIGH_PRICE", "HIGH", "HGHPRIC"],
-        "LOW": ["LOW_PRICE", "LOW", "LWPRIC"],
-        "CLOSE": ["CLOSE_PRICE", "CLOSE", "CLSPRIC"],
-        "VOLUME": ["TTL_TRD_QNTY", "TOTTRDQTY", "TTLTRADGVOL"]
-    }
-
-    def find(keys):
-        for k in keys:
-            if k in df.columns:
-                return k
-        return None
 
-    symbol_col = find(column_map["SYMBOL"])
-    series_col = find(column_map["SERIES"])
-    close_col = find(column_map["CLOSE"])
+def get_price_snapshot(trading_date: str):
+    """
+    Returns {symbol: OHLCV} for the EQ series of one trading day, or None
+    when no bhavcopy exists. Built once per date and shared by every
+    symbol; concurrent callers for a date wait on a single build.
+    """
+    snapshot = bhavcopy_cache.get_snapshot(trading_date)
+    if snapshot is not None:
+        return snapshot
 
-    if not symbol_col or not close_col:
-        raise ValueError(f"Unsupported NSE structure: {list(df.columns)}")
+    return _flight.do(("snapshot", trading_date), _build_snapshot, trading_date)
 
-    df[symbol_col] = df[symbol_col].astype(str).str.upper().str.strip()
-    stock = df[df[symbol_col] == symbol]
 
-    if series_col:
-        df[series_col] = df[series_col].astype(str).str.upper().str.strip()
-        stock = stock[stock[series_col] == "EQ"]
+def _build_snapshot(trading_date: str):
+    snapshot = bhavcopy_cache.get_snapshot(trading_date)
+    if snapshot is not None:
+        return snapshot
 
-    if stock.empty:
-        raise ValueError(f"{symbol} not found on {date}")
+    df = download_bhavcopy(trading_date)
+    if df is None:
+        return None
 
-    row = stock.iloc[0]
+    snapshot = snapshot_from_frame(df)
+    bhavcopy_cache.put_snapshot(trading_date, snapshot)
+    return snapshot
 
-    return float(row[close_col])
+
+@traced("nse.snapshot")
+def snapshot_from_frame(df):
+    """
+    {symbol: OHLCV} from a parsed bhavcopy frame. Rows without a close
+    (NaN, e.g. a "-" placeholder) are dropped so that they never reach
+    the screener or StockPrice.
+    """
+    df = df[df["close"].notna()]
+    columns = [df[field].tolist() for field in OHLCV._fields]
+    return dict(zip(df.index.tolist(), map(OHLCV, *columns)))
 
 
 def get_previous_trading_day(date: str, max_lookback: int = 10):
     """
-    Finds the nearest previous trading day (including given date)
-    by checking bhavcopy availability.
+    Finds the nearest previous trading day (including given date).
+    Answered from the trading calendar when it covers the date,
+    otherwise by checking bhavcopy availability.
     """
+    session = trading_calendar.previous_session(date)
+    if session is not None:
+        return session.strftime("%Y-%m-%d")
+
     dt = datetime.strptime(date, "%Y-%m-%d")
 
     for _ in range(max_lookback):
-        df = download_bhavcopy(dt.strftime("%Y-%m-%d"))
-        if df is not None:
+        if fetch_bhavcopy_archive(dt.strftime("%Y-%m-%d")) is not None:
             return dt.strftime("%Y-%m-%d")
 
         dt -= timedelta(days=1)
@@ -1,19 +1,227 @@
-from core.services.nse_price_provider import get_stock_price as nse_price
-from core.services.yahoo_price_provider import get_stock_price_yahoo
+import asyncio
+import contextvars
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import async_to_sync
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+
+from core.services.db_price_provider import get_stock_prices_db_many
+from core.services.db_price_provider import store_stock_prices
+from core.services.nse_price_provider import get_stock_quotes as nse_quotes
+from core.services.yahoo_price_provider import get_stock_quotes_yahoo
+from core.utils.tracing import span
+
+# Blocking provider calls run here rather than in the event loop's default
+# executor, so an abandoned (timed-out) call never holds up loop shutdown.
+EXECUTOR_WORKERS = 16
+_executor = ThreadPoolExecutor(
+    max_workers=EXECUTOR_WORKERS, thread_name_prefix="price"
+)
+
+# Live calls queue in the executor and wait for a thread within their
+# deadline (one still queued at the deadline is cancelled and never
+# runs). A call abandoned while running keeps its thread until it
+# returns; once every thread is held that way, new calls fail at once
+# instead of queueing behind them.
+_abandoned_lock = threading.Lock()
+_abandoned = 0
+
 
 def get_stock_price(symbol: str, date: str):
     """
     Unified price resolver:
-    1. Try NSE bhavcopy
-    2. Fallback to Yahoo Finance
+    1. Local StockPrice table
+    2. NSE bhavcopy
+    3. Fallback to Yahoo Finance
+    """
+    return get_stock_prices(symbol, [date])[date]
+
+
+def get_stock_prices(symbol: str, dates):
+    """
+    Resolves several dates for one symbol.
+    All dates are first answered from StockPrice in a single query;
+    only the misses go to the network (concurrently), and are written back.
+    """
+    symbol = symbol.upper().strip()
+    prices, errors = get_stock_prices_many([(symbol, d) for d in dates])
+
+    if errors:
+        raise next(iter(errors.values()))
+
+    return {d: prices[(symbol, d)] for d in dates}
+
+
+def get_stock_prices_many(pairs):
+    """
+    Resolves a batch of (symbol, date_str) pairs.
+    Returns (prices, errors), both keyed by pair.
+    Synchronous entry point over aget_stock_prices_many.
     """
+    return async_to_sync(aget_stock_prices_many)(pairs)
 
+
+async def aget_stock_prices_many(pairs):
+    """
+    One StockPrice query for the batch, then every missing date is
+    resolved concurrently: NSE (one bhavcopy per date) hedged by Yahoo.
+    Pairs the network cannot answer either report the table's
+    StalePriceError when there is one (a delisted or suspended symbol).
+    """
+    pairs = {(symbol.upper().strip(), date) for symbol, date in pairs}
+    with span("resolver.db"):
+        prices, stale = await sync_to_async(get_stock_prices_db_many)(pairs)
+
+    by_date = {}
+    for symbol, date in pairs:
+        if (symbol, date) not in prices:
+            by_date.setdefault(date, set()).add(symbol)
+
+    with span("resolver.network"):
+        resolved = await asyncio.gather(*(
+            _resolve_date(symbols, date) for date, symbols in by_date.items()
+        ))
+
+    errors = {}
+    fetched = []
+    for (date, symbols), quotes in zip(by_date.items(), resolved):
+        for symbol in symbols:
+            if symbol not in quotes:
+                errors[(symbol, date)] = stale.get((symbol, date)) or ValueError(
+                    f"Price not available for {symbol} on or before {date}"
+                )
+                continue
+
+            trade_date, price = quotes[symbol]
+            prices[(symbol, date)] = price
+            fetched.append((symbol, trade_date, price))
+
+    if fetched:
+        with span("resolver.writeback"):
+            await sync_to_async(store_stock_prices)(fetched)
+
+    return prices, errors
+
+
+def _run(context, fn, *args):
     try:
-        return nse_price(symbol, date)
-    except Exception as nse_error:
-        try:
-            return get_stock_price_yahoo(symbol, date)
-        except Exception as yahoo_error:
-            raise ValueError(
-                f"Price not available for {symbol} on or before {date}"
-            )
+        return context.run(fn, *args)
+    finally:
+        # Pool threads live outside the request cycle, so nothing else
+        # closes the DB connections that provider calls open in them.
+        close_old_connections()
+
+
+def abandoned_calls():
+    with _abandoned_lock:
+        return _abandoned
+
+
+def _abandon(future):
+    global _abandoned
+
+    def finished(_):
+        global _abandoned
+        with _abandoned_lock:
+            _abandoned -= 1
+
+    with _abandoned_lock:
+        _abandoned += 1
+    future.add_done_callback(finished)
+
+
+async def _with_deadline(deadline, fn, *args):
+    if abandoned_calls() >= EXECUTOR_WORKERS:
+        raise asyncio.TimeoutError(
+            f"all {EXECUTOR_WORKERS} provider threads are held by abandoned calls"
+        )
+
+    # The executor does not carry contextvars (the request trace) over.
+    context = contextvars.copy_context()
+    future = _executor.submit(_run, context, fn, *args)
+
+    try:
+        return await asyncio.wait_for(asyncio.wrap_future(future), deadline)
+    except (asyncio.TimeoutError, asyncio.CancelledError):
+        # Past the deadline, or the caller gave up (e.g. the other
+        # provider answered first).
+        if not future.cancel() and not future.done():
+            _abandon(future)
+        raise
+
+
+async def _yahoo_quotes(symbols, date):
+    quotes = await _with_deadline(
+        _yahoo_deadline(),
+        get_stock_quotes_yahoo,
+        [(symbol, date) for symbol in symbols],
+    )
+    return {symbol: quote for (symbol, _), quote in quotes.items()}
+
+
+async def _resolve_date(symbols, date):
+    """
+    Hedged fetch for one date: NSE starts first; Yahoo is started for
+    whatever NSE has not answered once PRICE_HEDGE_DELAY passes or NSE
+    fails. Returns as soon as every symbol has a quote or both providers
+    are done, so the worst case is roughly one provider deadline.
+    """
+    symbols = sorted(symbols)
+    quotes = {}
+
+    nse = asyncio.ensure_future(
+        _with_deadline(_nse_deadline(), nse_quotes, symbols, date)
+    )
+    yahoo = None
+    hedged = False
+
+    try:
+        await asyncio.wait({nse}, timeout=_hedge_delay())
+
+        while True:
+            if nse is not None and nse.done():
+                if not nse.cancelled() and nse.exception() is None:
+                    for symbol, quote in nse.result().items():
+                        quotes.setdefault(symbol, quote)
+                nse = None
+
+            if yahoo is not None and yahoo.done():
+                if not yahoo.cancelled() and yahoo.exception() is None:
+                    for symbol, quote in yahoo.result().items():
+                        quotes.setdefault(symbol, quote)
+                yahoo = None
+
+            if len(quotes) == len(symbols):
+                break
+
+            if not hedged:
+                hedged = True
+                remaining = [s for s in symbols if s not in quotes]
+                yahoo = asyncio.ensure_future(_yahoo_quotes(remaining, date))
+
+            pending = {task for task in (nse, yahoo) if task is not None}
+            if not pending:
+                break
+
+            await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for task in (nse, yahoo):
+            if task is not None:
+                task.cancel()
+
+    return quotes
+
+
+def _nse_deadline():
+    return getattr(settings, "PRICE_NSE_DEADLINE", 20)
+
+
+def _yahoo_deadline():
+    return getattr(settings, "PRICE_YAHOO_DEADLINE", 15)
+
+
+def _hedge_delay():
+    return getattr(settings, "PRICE_HEDGE_DELAY", 3)
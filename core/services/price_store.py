@@ -0,0 +1,217 @@
+# core/services/price_store.py
+
+import json
+import os
+import shutil
+import threading
+import time
+from array import array
+from pathlib import Path
+
+import numpy as np
+from django.conf import settings
+
+from core.models import StockPrice
+from core.services import data_versions
+from core.utils.fixed_point import to_paise
+
+# Read-only columnar copy of StockPrice:
+#   symbols.npy  sorted symbol names            (n,)   <U20
+#   offsets.npy  row range of each symbol        (n+1,) int64
+#   days.npy     trade dates as date ordinals    (rows,) int32
+#   closes.npy   closes in integer paise         (rows,) int64
+# Arrays are memory-mapped, so every worker process shares the same
+# page-cache copy. Builds go to a fresh directory and CURRENT is switched
+# atomically; readers pick the new build up on their next check.
+# meta.json records the data version of every symbol at build time: a
+# symbol written since (a write-back, an import) is answered from
+# StockPrice until the next build.
+
+CHECK_INTERVAL = 30
+
+_lock = threading.Lock()
+_store = None
+_checked_at = 0.0
+
+
+def _root():
+    return Path(getattr(
+        settings,
+        "PRICE_STORE_DIR",
+        settings.BASE_DIR / "cache" / "price_store",
+    ))
+
+
+class PriceStore:
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.symbols = np.load(path / "symbols.npy")
+        self.offsets = np.load(path / "offsets.npy", mmap_mode="r")
+        self.days = np.load(path / "days.npy", mmap_mode="r")
+        self.closes = np.load(path / "closes.npy", mmap_mode="r")
+        self.meta = json.loads((path / "meta.json").read_text())
+        self.versions = self.meta.get("versions", {})
+
+    @property
+    def max_day(self):
+        return self.meta["max_day"]
+
+    def fresh(self, symbols):
+        """
+        The subset of symbols whose data has not changed since the build.
+        """
+        current = data_versions.get_versions(symbols)
+        return {s for s, v in current.items() if self.versions.get(s) == v}
+
+    def is_current(self):
+        """
+        True while no symbol has changed since the build.
+        """
+        return data_versions.get_version(data_versions.MARKET) == self.meta.get("data_version")
+
+    def _range(self, symbol):
+        i = int(np.searchsorted(self.symbols, symbol))
+        if i == len(self.symbols) or self.symbols[i] != symbol:
+            return None
+        return int(self.offsets[i]), int(self.offsets[i + 1])
+
+    def series(self, symbol, start_day, end_day):
+        """
+        Zero-copy (days, closes_paise) views for start_day <= day <= end_day.
+        """
+        bounds = self._range(symbol)
+        if bounds is None:
+            return self.days[:0], self.closes[:0]
+
+        lo, hi = bounds
+        days = self.days[lo:hi]
+        a = int(np.searchsorted(days, start_day, side="left"))
+        b = int(np.searchsorted(days, end_day, side="right"))
+        return days[a:b], self.closes[lo + a:lo + b]
+
+    def asof(self, symbol, day):
+        """
+        Returns (day, close_paise) of the last row on or before day.
+        """
+        bounds = self._range(symbol)
+        if bounds is None:
+            return None
+
+        lo, hi = bounds
+        i = int(np.searchsorted(self.days[lo:hi], day, side="right")) - 1
+        if i < 0:
+            return None
+
+        return int(self.days[lo + i]), int(self.closes[lo + i])
+
+
+def get_store():
+    """
+    The current PriceStore, or None when no store has been built.
+    """
+    global _store, _checked_at
+
+    now = time.monotonic()
+    if now - _checked_at < CHECK_INTERVAL:
+        return _store
+
+    with _lock:
+        _checked_at = now
+
+        try:
+            name = (_root() / "CURRENT").read_text().strip()
+        except OSError:
+            _store = None
+            return None
+
+        if _store is None or _store.path.name != name:
+            try:
+                _store = PriceStore(_root() / name)
+            except (OSError, ValueError):
+                _store = None
+
+        return _store
+
+
+def build_store(chunk_size=100_000):
+    """
+    Streams StockPrice (ordered by symbol, trade_date) into a new store
+    directory and makes it current. Returns (symbols, rows).
+    """
+    root = _root()
+    root.mkdir(parents=True, exist_ok=True)
+
+    # Read before the rows: a write during the build moves the version
+    # on, and the store then defers to StockPrice for it.
+    market_version = data_versions.get_version(data_versions.MARKET)
+
+    name = f"build-{time.time_ns()}-{os.getpid()}"
+    path = root / name
+    path.mkdir()
+
+    symbols = []
+    offsets = array("q")
+    days = array("i")
+    closes = array("q")
+
+    last_symbol = None
+    for symbol, trade_date, close in (
+        StockPrice.objects
+        .order_by("symbol", "trade_date")
+        .values_list("symbol", "trade_date", "close_price")
+        .iterator(chunk_size=chunk_size)
+    ):
+        if symbol != last_symbol:
+            symbols.append(symbol)
+            offsets.append(len(days))
+            last_symbol = symbol
+
+        days.append(trade_date.toordinal())
+        closes.append(to_paise(close))
+
+    offsets.append(len(days))
+
+    day_array = np.frombuffer(days, dtype=np.int32)
+
+    np.save(path / "symbols.npy", np.array(symbols, dtype="<U20"))
+    np.save(path / "offsets.npy", np.frombuffer(offsets, dtype=np.int64))
+    np.save(path / "days.npy", day_array)
+    np.save(path / "closes.npy", np.frombuffer(closes, dtype=np.int64))
+
+    versions = data_versions.get_versions(symbols)
+    if data_versions.get_version(data_versions.MARKET) != market_version:
+        # Some symbol changed mid-build and which one is unknown.
+        versions = {}
+
+    (path / "meta.json").write_text(json.dumps({
+        "built_at": time.time(),
+        "symbols": len(symbols),
+        "rows": len(days),
+        "min_day": int(day_array.min()) if len(day_array) else None,
+        "max_day": int(day_array.max()) if len(day_array) else None,
+        "data_version": market_version,
+        "versions": versions,
+    }))
+
+    try:
+        previous = (root / "CURRENT").read_text().strip()
+    except OSError:
+        previous = None
+
+    tmp = root / f".CURRENT.{os.getpid()}"
+    tmp.write_text(name)
+    os.replace(tmp, root / "CURRENT")
+
+    # The build just replaced is kept for processes that read CURRENT
+    # before the switch and have yet to open it. Older ones are deleted;
+    # a process still mapping one keeps reading it (unlinked files stay
+    # mapped) until its next check moves it on.
+    for old in root.glob("build-*"):
+        if old.name not in (name, previous):
+            shutil.rmtree(old, ignore_errors=True)
+
+    global _checked_at
+    _checked_at = 0.0
+
+    return len(symbols), len(days)
@@ -1,7 +1,35 @@
-from decimal import Decimal
+from decimal import Decimal, InvalidOperation
 from datetime import datetime
-from core.models import CorporateAction
-from core.services.price_resolver import get_stock_price
+from core.services import adjustment_index
+from core.services.price_resolver import get_stock_prices
+from core.services.price_resolver import get_stock_prices_many
+from core.utils.tracing import span
+from core.utils.tracing import traced
+from core.utils.fixed_point import PAISE, to_paise
+
+# Flat per-holding columns (CSV exports); corporate_actions is nested.
+HOLDING_FIELDS = (
+    "symbol", "from", "to", "initial_shares", "final_shares",
+    "start_price", "end_price", "initial_value", "price_gain",
+    "price_gain_pct", "dividend_gain", "total_gain", "total_gain_pct",
+    "final_value", "error",
+)
+
+
+def parse_shares(value):
+    """
+    A share count as a Decimal; ValueError unless it is a finite number
+    greater than zero.
+    """
+    try:
+        shares = Decimal(str(value))
+    except InvalidOperation:
+        raise ValueError(f"Invalid share count: {value!r}")
+
+    if not shares.is_finite() or shares <= 0:
+        raise ValueError(f"Share count must be a positive number, not {value!r}")
+
+    return shares
 
 
 def calculate_portfolio_return(
@@ -13,73 +41,272 @@ def calculate_portfolio_return(
     start_date = datetime.strptime(start_date, "%Y-%m-%d").date()
     end_date = datetime.strptime(end_date, "%Y-%m-%d").date()
 
-    shares = Decimal(str(initial_shares))
-    cash = Decimal("0")
+    # Prices (DB → NSE → Yahoo fallback handled inside resolver)
+    start_key = start_date.strftime("%Y-%m-%d")
+    end_key = end_date.strftime("%Y-%m-%d")
+    with span("returns.prices"):
+        prices = get_stock_prices(symbol, [start_key, end_key])
 
-    # Prices (NSE → Yahoo fallback handled inside resolver)
-    start_price = Decimal(
-        str(get_stock_price(symbol, start_date.strftime("%Y-%m-%d")))
-    )
-    end_price = Decimal(
-        str(get_stock_price(symbol, end_date.strftime("%Y-%m-%d")))
+    with span("returns.adjustments"):
+        index = adjustment_index.get_index(symbol)
+
+    return _holding_return(
+        symbol,
+        start_date,
+        end_date,
+        initial_shares,
+        prices[start_key],
+        prices[end_key],
+        index,
     )
 
-    initial_value = shares * start_price
 
-    actions = CorporateAction.objects.filter(
-        symbol=symbol,
-        ex_date__gt=start_date,
-        ex_date__lte=end_date
-    ).order_by("ex_date")
+def calculate_holdings_returns(holdings, start_date, end_date):
+    """
+    Returns for a whole portfolio.
+    holdings: [{"symbol", "shares", "buy_date" (optional)}]; a holding
+    without buy_date is held from start_date. Invalid holdings get an
+    error result of their own instead of failing the portfolio.
+    Prices are resolved as one batch and the corporate-action indexes of
+    every symbol are loaded with a single query.
+    """
+    results = list(iter_holdings_returns(holdings, start_date, end_date))
+
+    return {
+        "to": datetime.strptime(end_date, "%Y-%m-%d").date(),
+        "holdings": results,
+        "summary": _summarise(results),
+    }
+
+
+def iter_holdings_returns(holdings, start_date, end_date, batch_size=None):
+    """
+    Yields the result of each holding, in order. With batch_size, prices
+    and indexes are resolved that many holdings at a time, so streamed
+    responses start early and stay flat in memory; otherwise the whole
+    portfolio is one batch.
+    """
+    end_date = datetime.strptime(end_date, "%Y-%m-%d").date()
+    end_key = end_date.strftime("%Y-%m-%d")
+
+    positions = []
+    for holding in holdings:
+        try:
+            positions.append(_position(holding, start_date))
+        except ValueError as exc:
+            positions.append({
+                "symbol": holding.get("symbol") if isinstance(holding, dict) else None,
+                "to": end_date,
+                "error": f"invalid holding: {exc}",
+            })
+
+    size = batch_size or max(len(positions), 1)
+    for i in range(0, len(positions), size):
+        yield from _batch_returns(positions[i:i + size], end_date, end_key)
+
+
+def _position(holding, start_date):
+    """
+    (symbol, start, shares) of one holding; ValueError when it is invalid.
+    """
+    if not isinstance(holding, dict):
+        raise ValueError("a holding must be an object")
+
+    symbol = holding.get("symbol")
+    if not isinstance(symbol, str) or not symbol.strip():
+        raise ValueError("symbol must be a non-empty string")
+
+    buy_date = holding.get("buy_date") or start_date
+    if not buy_date:
+        raise ValueError("from is required for holdings without buy_date")
+
+    try:
+        start = datetime.strptime(buy_date, "%Y-%m-%d").date()
+    except (TypeError, ValueError):
+        raise ValueError(f"buy_date must be YYYY-MM-DD, not {buy_date!r}")
+
+    return symbol.upper().strip(), start, parse_shares(holding.get("shares", "1"))
+
+
+def _batch_returns(positions, end_date, end_key):
+    # Invalid holdings arrive as ready-made error results.
+    valid = [p for p in positions if isinstance(p, tuple)]
+
+    pairs = set()
+    for symbol, start, _ in valid:
+        pairs.add((symbol, start.strftime("%Y-%m-%d")))
+        pairs.add((symbol, end_key))
+
+    with span("returns.prices"):
+        prices, errors = get_stock_prices_many(pairs) if pairs else ({}, {})
+
+    with span("returns.adjustments"):
+        indexes = adjustment_index.get_indexes(
+            {symbol for symbol, _, _ in valid}
+        )
+
+    for position in positions:
+        if not isinstance(position, tuple):
+            yield position
+            continue
+
+        symbol, start, shares = position
+        start_key = start.strftime("%Y-%m-%d")
+
+        missing = [
+            errors[key] for key in ((symbol, start_key), (symbol, end_key))
+            if key in errors
+        ]
+        if missing:
+            yield {
+                "symbol": symbol,
+                "from": start,
+                "to": end_date,
+                "error": str(missing[0]),
+            }
+            continue
+
+        yield _holding_return(
+            symbol,
+            start,
+            end_date,
+            shares,
+            prices[(symbol, start_key)],
+            prices[(symbol, end_key)],
+            indexes[symbol],
+        )
+
+
+class Summary:
+    """
+    Running portfolio totals, so that streamed results need not be kept.
+    """
+
+    def __init__(self):
+        self.holdings = 0
+        self.priced_holdings = 0
+        self.initial_value = 0
+        self.price_gain = 0
+        self.dividend_gain = 0
+        self.total_gain = 0
+
+    def add(self, result):
+        self.holdings += 1
+        if "error" in result:
+            return
+
+        self.priced_holdings += 1
+        self.initial_value += result["initial_value"]
+        self.price_gain += result["price_gain"]
+        self.dividend_gain += result["dividend_gain"]
+        self.total_gain += result["total_gain"]
+
+    def as_dict(self):
+        initial_value = self.initial_value
+
+        return {
+            "holdings": self.holdings,
+            "priced_holdings": self.priced_holdings,
+            "initial_value": initial_value,
+            "price_gain": self.price_gain,
+            "price_gain_pct": (
+                self.price_gain / initial_value * 100 if initial_value else None
+            ),
+            "dividend_gain": self.dividend_gain,
+            "total_gain": self.total_gain,
+            "total_gain_pct": (
+                self.total_gain / initial_value * 100 if initial_value else None
+            ),
+            "final_value": initial_value + self.total_gain,
+        }
+
+
+def _summarise(results):
+    summary = Summary()
+    for result in results:
+        summary.add(result)
+    return summary.as_dict()
+
+
+@traced("returns.compute")
+def _holding_return(
+    symbol,
+    start_date,
+    end_date,
+    initial_shares,
+    start_price,
+    end_price,
+    index,
+):
+    # Exact fixed-point arithmetic on plain ints: prices in paise, share
+    # counts and the index's running totals as (numerator, denominator)
+    # pairs, so every figure is an integer fraction until its final
+    # (correctly rounded) division.
+    i, i_den = parse_shares(initial_shares).as_integer_ratio()
+    start = to_paise(start_price)
+    end = to_paise(end_price)
+
+    # Cumulative factor index: two binary searches for the whole window.
+    base, last, actions = index.window(start_date, end_date)
+    (c, c_den), (e, e_den) = base
+
+    def shares_at(factor):
+        # Shares held under a cumulative factor, relative to the base.
+        a, a_den = factor
+        return i * a * c_den / (i_den * a_den * c)
+
+    def cash_since_start(dividend):
+        # Dividend cash per holding accumulated since start_date.
+        n, n_den = dividend
+        return i * (n * e_den - e * n_den) * c_den / (i_den * n_den * e_den * c)
 
     action_log = []
+    factor_before = base[0]
 
-    for action in actions:
+    for row, (factor, dividend) in actions:
 
         # SPLIT / BONUS → affects shares only
-        if action.action_type in ("SPLIT", "BONUS") and action.factor:
-            old_shares = shares
-            shares *= Decimal(action.factor)
-
+        if row["action_type"] in ("SPLIT", "BONUS"):
             action_log.append({
-                "date": action.ex_date,
-                "type": action.action_type,
-                "factor": float(action.factor),
-                "shares_before": float(old_shares),
-                "shares_after": float(shares),
+                "date": row["ex_date"],
+                "type": row["action_type"],
+                "factor": float(row["factor"]),
+                "shares_before": shares_at(factor_before),
+                "shares_after": shares_at(factor),
             })
 
         # DIVIDEND → CASH ONLY
-        elif action.action_type == "DIVIDEND" and action.cash_value is not None:
-            dividend_cash = shares * Decimal(action.cash_value)
-            cash += dividend_cash
-
+        else:
+            v, v_den = row["cash_value"].as_integer_ratio()
+            a, a_den = factor
             action_log.append({
-                "date": action.ex_date,
+                "date": row["ex_date"],
                 "type": "DIVIDEND_CASH",
-                "dividend_per_share": float(action.cash_value),
-                "cash_received": float(dividend_cash),
-                "total_cash": float(cash),
+                "dividend_per_share": float(row["cash_value"]),
+                "cash_received": i * a * c_den * v / (i_den * a_den * c * v_den),
+                "total_cash": cash_since_start(dividend),
             })
 
+        factor_before = factor
+
+    # Share multiplier m / m_den and dividend per start share dn / dn_den
+    # (rupees) over the whole window.
+    (a, a_den), (n, n_den) = last
+    m, m_den = a * c_den, a_den * c
+    dn, dn_den = (n * e_den - e * n_den) * c_den, n_den * e_den * c
+
     # -------------------------
     # 🔹 CLEAN FINANCIAL METRICS
     # -------------------------
 
-    # Price-only gain (NO dividends)
-    price_gain = (end_price - start_price) * shares
-    price_gain_pct = (
-        (end_price - start_price) / start_price
-    ) * 100
-
-    # Dividend-only gain
-    dividend_gain = cash
-
-    # Total gain = price gain + dividends
-    total_gain = price_gain + dividend_gain
-    total_gain_pct = (total_gain / initial_value) * 100
+    # Price-only gain (NO dividends), paise * i_den * m_den
+    price_gain = (end - start) * i * m
+    price_gain_pct = (end - start) * 100 / start
 
-    final_value = initial_value + total_gain
+    # Total gain = price gain + dividends, over den (paise)
+    den = i_den * m_den * dn_den
+    total_gain = price_gain * dn_den + i * dn * m_den * PAISE
+    initial_value = i * start * m_den * dn_den
 
     return {
         "symbol": symbol,
@@ -87,25 +314,25 @@ def calculate_portfolio_return(
         "to": end_date,
 
         "initial_shares": float(initial_shares),
-        "final_shares": float(shares),
+        "final_shares": i * m / (i_den * m_den),
 
-        "start_price": float(start_price),
-        "end_price": float(end_price),
+        "start_price": start / PAISE,
+        "end_price": end / PAISE,
 
-        "initial_value": float(initial_value),
+        "initial_value": i * start / (i_den * PAISE),
 
         # ✅ PRICE-ONLY
-        "price_gain": float(price_gain),
-        "price_gain_pct": float(price_gain_pct),
+        "price_gain": price_gain / (i_den * m_den * PAISE),
+        "price_gain_pct": price_gain_pct,
 
         # ✅ DIVIDENDS (SEPARATE)
-        "dividend_gain": float(dividend_gain),
+        "dividend_gain": i * dn / (i_den * dn_den),
 
         # ✅ TOTAL (EXPLICIT)
-        "total_gain": float(total_gain),
-        "total_gain_pct": float(total_gain_pct),
+        "total_gain": total_gain / (den * PAISE),
+        "total_gain_pct": total_gain * 100 / initial_value,
 
-        "final_value": float(final_value),
+        "final_value": (initial_value + total_gain) / (den * PAISE),
 
         "corporate_actions": action_log,
     }
@@ -0,0 +1,113 @@
+# core/services/returns_cache.py
+
+import hashlib
+from datetime import date as date_cls
+from datetime import datetime
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import caches
+
+from core.services import data_versions
+from core.services.returns import calculate_portfolio_return
+
+# Results are cached for one share and scaled on the way out: every
+# money / share figure is linear in the initial share count, the
+# percentages do not depend on it.
+SCALED_FIELDS = (
+    "initial_shares", "final_shares", "initial_value", "price_gain",
+    "dividend_gain", "total_gain", "final_value",
+)
+SCALED_ACTION_FIELDS = (
+    "shares_before", "shares_after", "cash_received", "total_cash",
+)
+
+ONE = Decimal("1")
+
+
+def _cache():
+    return caches[getattr(settings, "RETURNS_CACHE_ALIAS", "default")]
+
+
+def is_cacheable(start_date: str, end_date: str):
+    """
+    A return is fixed once both dates are in the past.
+    """
+    today = date_cls.today()
+    return all(
+        datetime.strptime(d, "%Y-%m-%d").date() < today
+        for d in (start_date, end_date)
+    )
+
+
+def _key(symbol, start_date, end_date):
+    return (
+        f"returns:{symbol}:{start_date}:{end_date}"
+        f":v{data_versions.get_version(symbol)}"
+    )
+
+
+def etag(symbol, start_date, end_date, shares):
+    """
+    Strong validator for one response: changes whenever the symbol's data
+    version does, so it can be checked without computing the result.
+    """
+    raw = f"{_key(symbol, start_date, end_date)}:{Decimal(shares).normalize()}"
+    return '"' + hashlib.sha1(raw.encode()).hexdigest() + '"'
+
+
+def get_portfolio_return(symbol, start_date, end_date, shares):
+    """
+    calculate_portfolio_return through the per-share result cache.
+    Only windows entirely in the past are cached.
+    """
+    symbol = symbol.upper().strip()
+    shares = Decimal(shares)
+
+    if not is_cacheable(start_date, end_date):
+        return calculate_portfolio_return(
+            symbol=symbol,
+            start_date=start_date,
+            end_date=end_date,
+            initial_shares=shares,
+        )
+
+    cache = _cache()
+    key = _key(symbol, start_date, end_date)
+
+    result = cache.get(key)
+    if result is None:
+        result = calculate_portfolio_return(
+            symbol=symbol,
+            start_date=start_date,
+            end_date=end_date,
+            initial_shares=ONE,
+        )
+        cache.set(key, result)
+
+    return scale(result, shares)
+
+
+def scale(result, shares):
+    """
+    A per-share result scaled to `shares` initial shares.
+    """
+    if shares == ONE:
+        return result
+
+    def times(value):
+        return float(Decimal(str(value)) * shares)
+
+    scaled = dict(result)
+    for field in SCALED_FIELDS:
+        scaled[field] = times(result[field])
+
+    scaled["corporate_actions"] = [
+        {
+            k: times(v) if k in SCALED_ACTION_FIELDS else v
+            for k, v in action.items()
+        }
+        for action in result["corporate_actions"]
+    ]
+
+    return scaled
@@ -0,0 +1,203 @@
+# core/services/screener.py
+
+import heapq
+from datetime import datetime
+from itertools import islice
+
+import numpy as np
+import pandas as pd
+from django.conf import settings
+from django.core.cache import cache
+
+from core.models import AdjustmentFactor
+from core.models import StockPrice
+from core.services import data_versions
+from core.services import nse_price_provider
+from core.services import price_store
+from core.services import trading_calendar
+
+SORT_KEYS = ("total_return_pct", "price_return_pct", "dividend_yield_pct")
+
+ROW_FIELDS = (
+    "symbol", "start_price", "end_price", "shares", "dividend",
+    "price_return_pct", "dividend_yield_pct", "total_return_pct",
+)
+
+
+def get_screener(start_date: str, end_date: str):
+    """
+    Total return of every symbol between two dates, per one share held
+    at the start: the same figures as calculate_portfolio_return, but
+    computed for the whole market from two close snapshots and one
+    grouped corporate-action query. Cached per (from, to).
+
+    Returns {"from", "to", "from_session", "to_session", "rows"} with
+    rows sorted by total_return_pct, best first.
+    """
+    key = (
+        f"screener:{start_date}:{end_date}"
+        f":v{data_versions.get_version(data_versions.MARKET)}"
+    )
+    result = cache.get(key)
+    if result is None:
+        result = _build(start_date, end_date)
+        cache.set(key, result, getattr(settings, "SCREENER_CACHE_TTL", 3600))
+
+    return result
+
+
+def top_movers(result, n=20, sort="total_return_pct"):
+    """
+    Returns (best, worst) n rows of a get_screener result.
+    """
+    rows = sorted(
+        result["rows"], key=lambda r: r[sort], reverse=True
+    )
+    return rows[:n], rows[::-1][:n]
+
+
+def ranked_rows(result, sort="total_return_pct", limit=0):
+    """
+    Iterates the rows of a get_screener result best first by `sort`, the
+    first `limit` only when given. The rows are cached in total_return_pct
+    order, so that sort is streamed as is; a limit on another key takes
+    the top rows with a heap, and only an unlimited one sorts them all.
+    """
+    rows = result["rows"]
+
+    if sort == "total_return_pct":
+        return islice(rows, limit or None)
+
+    if limit:
+        return iter(heapq.nlargest(limit, rows, key=lambda r: r[sort]))
+    return iter(sorted(rows, key=lambda r: r[sort], reverse=True))
+
+
+def _build(start_date, end_date):
+    start = datetime.strptime(start_date, "%Y-%m-%d").date()
+    end = datetime.strptime(end_date, "%Y-%m-%d").date()
+
+    start_session = nse_price_provider.get_previous_trading_day(start_date)
+    end_session = nse_price_provider.get_previous_trading_day(end_date)
+
+    start_close = get_closes(start_session)
+    end_close = get_closes(end_session)
+
+    frame = pd.DataFrame({
+        "start_price": start_close,
+        "end_price": end_close,
+    }).dropna()
+    frame = frame[frame["start_price"] > 0]
+
+    multiplier, dividend = _adjustments(frame.index, start, end)
+
+    price_gain = (frame["end_price"] - frame["start_price"]) * multiplier
+
+    frame["shares"] = multiplier
+    frame["dividend"] = dividend
+    frame["price_return_pct"] = (
+        (frame["end_price"] - frame["start_price"]) / frame["start_price"] * 100
+    )
+    frame["dividend_yield_pct"] = dividend / frame["start_price"] * 100
+    frame["total_return_pct"] = (
+        (price_gain + dividend) / frame["start_price"] * 100
+    )
+
+    frame = frame.sort_values("total_return_pct", ascending=False)
+    frame = frame.round(4)
+
+    rows = [
+        {"symbol": symbol, **values}
+        for symbol, values in zip(
+            frame.index.tolist(), frame.to_dict("records")
+        )
+    ]
+
+    return {
+        "from": start,
+        "to": end,
+        "from_session": start_session,
+        "to_session": end_session,
+        "rows": rows,
+    }
+
+
+def get_closes(trading_date: str):
+    """
+    {symbol: close} for one session as a Series: from the columnar price
+    store (while no price has changed since its build), then StockPrice,
+    then the NSE bhavcopy. Stored closes are used only for a full session
+    (FULL_SESSION_MIN_SYMBOLS symbols); a date holding just a few
+    written-back symbols would otherwise hide the rest of the market.
+    """
+    day = datetime.strptime(trading_date, "%Y-%m-%d").date()
+
+    store = price_store.get_store()
+    if (
+        store is not None
+        and store.max_day
+        and day.toordinal() <= store.max_day
+        and store.is_current()
+    ):
+        owners = np.repeat(
+            np.arange(len(store.symbols)), np.diff(store.offsets)
+        )
+        mask = np.asarray(store.days) == day.toordinal()
+        if mask.sum() >= trading_calendar.FULL_SESSION_MIN_SYMBOLS:
+            return pd.Series(
+                np.asarray(store.closes)[mask] / 100,
+                index=store.symbols[owners[mask]],
+                dtype=np.float64,
+            )
+
+    rows = list(
+        StockPrice.objects
+        .filter(trade_date=day)
+        .values_list("symbol", "close_price")
+    )
+    stored = pd.Series(
+        {symbol: float(close) for symbol, close in rows}, dtype=np.float64
+    )
+    if len(stored) >= trading_calendar.FULL_SESSION_MIN_SYMBOLS:
+        return stored
+
+    snapshot = nse_price_provider.get_price_snapshot(trading_date)
+    if not snapshot:
+        # No bhavcopy to be had: a partial session beats none.
+        return stored
+
+    return pd.Series(
+        {symbol: quote.close for symbol, quote in snapshot.items()},
+        dtype=np.float64,
+    )
+
+
+def _adjustments(symbols, start, end):
+    """
+    Vectorised AdjustmentFactor window for every symbol at once: returns
+    (share_multiplier, dividend_per_start_share) Series aligned to
+    symbols, for actions with start < ex_date <= end.
+    """
+    rows = list(
+        AdjustmentFactor.objects
+        .filter(ex_date__lte=end)
+        .order_by("symbol", "seq")
+        .values_list("symbol", "ex_date", "cum_factor", "cum_dividend")
+    )
+
+    frame = pd.DataFrame(
+        rows, columns=["symbol", "ex_date", "cum_factor", "cum_dividend"]
+    )
+    frame["cum_factor"] = frame["cum_factor"].astype(np.float64)
+    frame["cum_dividend"] = frame["cum_dividend"].astype(np.float64)
+
+    # Cumulative totals in force at each end of the window.
+    at_end = frame.groupby("symbol").last()
+    at_start = frame[frame["ex_date"] <= start].groupby("symbol").last()
+
+    f_end = at_end["cum_factor"].reindex(symbols, fill_value=1.0)
+    d_end = at_end["cum_dividend"].reindex(symbols, fill_value=0.0)
+    f_start = at_start["cum_factor"].reindex(symbols, fill_value=1.0)
+    d_start = at_start["cum_dividend"].reindex(symbols, fill_value=0.0)
+
+    return f_end / f_start, (d_end - d_start) / f_start
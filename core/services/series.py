@@ -0,0 +1,177 @@
+# core/services/series.py
+
+from datetime import date as date_cls
+
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+
+from core.models import StockPrice
+from core.services import adjustment_index
+from core.services import data_versions
+from core.services import price_store
+from core.utils.fixed_point import from_paise_array
+
+FREQUENCIES = ("daily", "weekly", "monthly", "lttb")
+
+
+def get_price_series(symbol, start_date, end_date, freq="daily", points=500):
+    """
+    Daily series for a symbol between two dates (inclusive), columnar:
+    date, raw close, split/bonus-adjusted close (in end-date share units)
+    and a total-return index (base 100, dividends reinvested).
+    Cached per symbol; the cache key carries the symbol's data version.
+    """
+    symbol = symbol.upper().strip()
+
+    key = (
+        f"series:{symbol}:{start_date}:{end_date}:{freq}:{points}"
+        f":v{data_versions.get_version(symbol)}"
+    )
+    series = cache.get(key)
+    if series is None:
+        series = _build_series(symbol, start_date, end_date, freq, points)
+        cache.set(key, series, getattr(settings, "SERIES_CACHE_TTL", 3600))
+
+    return series
+
+
+def _load_closes(symbol, start_date, end_date):
+    """
+    (days, closes) arrays from the columnar store when it covers the
+    range and the symbol is unchanged since the build, otherwise from
+    StockPrice.
+    """
+    store = price_store.get_store()
+    if (
+        store is not None
+        and store.max_day
+        and end_date.toordinal() <= store.max_day
+        and store.fresh([symbol])
+    ):
+        days, paise = store.series(
+            symbol, start_date.toordinal(), end_date.toordinal()
+        )
+        if len(days):
+            return np.asarray(days, dtype=np.int32), from_paise_array(paise)
+
+    rows = list(
+        StockPrice.objects
+        .filter(symbol=symbol, trade_date__gte=start_date, trade_date__lte=end_date)
+        .order_by("trade_date")
+        .values_list("trade_date", "close_price")
+    )
+
+    days = np.fromiter((d.toordinal() for d, _ in rows), dtype=np.int32, count=len(rows))
+    close = np.fromiter((float(c) for _, c in rows), dtype=np.float64, count=len(rows))
+    return days, close
+
+
+def _build_series(symbol, start_date, end_date, freq, points):
+    days, close = _load_closes(symbol, start_date, end_date)
+
+    if not len(days):
+        return None
+
+    adj_close, tr_index = adjust(symbol, days, close)
+
+    keep = downsample(days, tr_index, freq, points)
+
+    return {
+        "symbol": symbol,
+        "from": start_date,
+        "to": end_date,
+        "freq": freq,
+        "points": int(len(keep)),
+        "date": [date_cls.fromordinal(int(d)) for d in days[keep]],
+        "close": close[keep].round(2).tolist(),
+        "adj_close": adj_close[keep].round(4).tolist(),
+        "tr_index": tr_index[keep].round(4).tolist(),
+    }
+
+
+def adjust(symbol, days, close):
+    """
+    Vectorised corporate-action adjustment of a close series.
+    Returns (adjusted_close, total_return_index).
+    """
+    index = adjustment_index.get_index(symbol)
+
+    ex_days = np.asarray(index.ordinals, dtype=np.int32)
+    cum_factor = np.array([float(r["cum_factor"]) for r in index.rows])
+    cum_dividend = np.array([float(r["cum_dividend"]) for r in index.rows])
+
+    # Cumulative totals in force at each trading day.
+    pos = np.searchsorted(ex_days, days, side="right") - 1
+    factor = np.where(pos >= 0, cum_factor[pos] if len(ex_days) else 1.0, 1.0)
+    dividend = np.where(pos >= 0, cum_dividend[pos] if len(ex_days) else 0.0, 0.0)
+
+    adj_close = close * factor / factor[-1]
+
+    # Day-over-day growth of one share with dividends reinvested at close:
+    # shares scale by F[t]/F[t-1], and dividends per share held at t-1
+    # are (D[t] - D[t-1]) / F[t-1].
+    gross = np.ones_like(close)
+    gross[1:] = (
+        close[1:] * factor[1:] / factor[:-1]
+        + (dividend[1:] - dividend[:-1]) / factor[:-1]
+    ) / close[:-1]
+
+    tr_index = 100.0 * np.cumprod(gross)
+
+    return adj_close, tr_index
+
+
+def downsample(days, values, freq, points):
+    """
+    Returns the positions to keep: period-end sessions for weekly /
+    monthly, Largest-Triangle-Three-Buckets for lttb.
+    """
+    n = len(days)
+
+    if freq == "weekly":
+        period = (days - 1) // 7     # ordinal 1 is a Monday
+    elif freq == "monthly":
+        epoch = date_cls(1970, 1, 1).toordinal()
+        period = (days - epoch).astype("datetime64[D]").astype("datetime64[M]")
+    elif freq == "lttb":
+        return lttb(days.astype(np.float64), values, points)
+    else:
+        return np.arange(n)
+
+    last = np.flatnonzero(period[1:] != period[:-1])
+    return np.append(last, n - 1)
+
+
+def lttb(x, y, threshold):
+    """
+    Largest-Triangle-Three-Buckets: picks `threshold` points that keep
+    the visual shape of the series.
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    keep = np.empty(threshold, dtype=np.int64)
+    keep[0] = 0
+    keep[-1] = n - 1
+
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    a = 0
+
+    for i in range(threshold - 2):
+        lo, hi = edges[i], edges[i + 1]
+
+        nxt_lo = hi
+        nxt_hi = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[nxt_lo:nxt_hi].mean()
+        avg_y = y[nxt_lo:nxt_hi].mean()
+
+        area = np.abs(
+            (x[a] - avg_x) * (y[lo:hi] - y[a])
+            - (x[a] - x[lo:hi]) * (avg_y - y[a])
+        )
+        a = lo + int(np.argmax(area))
+        keep[i + 1] = a
+
+    return keep
@@ -0,0 +1,208 @@
+# core/services/trading_calendar.py
+
+import threading
+import time
+from bisect import bisect_right
+from bisect import insort
+from datetime import date as date_cls
+from datetime import datetime
+from datetime import timedelta
+
+from django.db.models import Count
+
+from core.models import StockPrice
+from core.models import TradingDay
+
+# A date counts as a full-market session (usable for inferring holidays
+# in the gaps between sessions) only when this many symbols traded.
+FULL_SESSION_MIN_SYMBOLS = 100
+
+# Gaps longer than this between full sessions are treated as missing
+# data rather than a run of holidays.
+MAX_HOLIDAY_GAP_DAYS = 6
+
+RELOAD_INTERVAL = 60
+
+_lock = threading.Lock()
+_open = []      # sorted ordinals of known sessions
+_closed = []    # sorted ordinals of known weekday closures
+_loaded_at = None
+
+
+def _to_date(value):
+    if isinstance(value, str):
+        return datetime.strptime(value, "%Y-%m-%d").date()
+    if isinstance(value, datetime):
+        return value.date()
+    return value
+
+
+def _weekdays_between(lo: int, hi: int):
+    """
+    Number of Mon-Fri days in the ordinal range (lo, hi].
+    """
+    def upto(n):
+        # date.fromordinal(1) is a Monday
+        weeks, rest = divmod(n, 7)
+        return weeks * 5 + min(rest, 5)
+
+    return upto(hi) - upto(lo)
+
+
+def load(force=False):
+    global _open, _closed, _loaded_at
+
+    with _lock:
+        if not force and _loaded_at and time.monotonic() - _loaded_at < RELOAD_INTERVAL:
+            return
+
+        opened, closed = [], []
+        for trade_date, is_open in (
+            TradingDay.objects
+            .order_by("trade_date")
+            .values_list("trade_date", "is_open")
+        ):
+            if is_open:
+                opened.append(trade_date.toordinal())
+            elif trade_date.weekday() < 5:
+                closed.append(trade_date.toordinal())
+
+        _open, _closed = opened, closed
+        _loaded_at = time.monotonic()
+
+
+def _lookup(target: int):
+    i = bisect_right(_open, target)
+    if i == 0:
+        return None
+
+    session = _open[i - 1]
+    if session == target:
+        return session
+
+    # Every weekday after the session must be a known closure,
+    # otherwise the calendar simply has a hole there.
+    known_closed = bisect_right(_closed, target) - bisect_right(_closed, session)
+    if known_closed != _weekdays_between(session, target):
+        return None
+
+    return session
+
+
+def previous_session(date):
+    """
+    Returns the last trading session on or before date, or None when the
+    calendar does not cover that date. Two binary searches.
+    """
+    target = _to_date(date).toordinal()
+
+    load()
+    session = _lookup(target)
+
+    return date_cls.fromordinal(session) if session is not None else None
+
+
+def has_session_after(date):
+    """
+    True when a session later than date is already known.
+    """
+    target = _to_date(date).toordinal()
+
+    load()
+    return bisect_right(_open, target) < len(_open)
+
+
+def record_sessions(open_dates=(), closed_dates=()):
+    """
+    Persists observed sessions / closures and updates the in-memory arrays.
+    An observed session always wins over an earlier closure.
+    """
+    open_dates = {_to_date(d) for d in open_dates}
+    closed_dates = {_to_date(d) for d in closed_dates} - open_dates
+
+    if closed_dates:
+        TradingDay.objects.bulk_create(
+            [TradingDay(trade_date=d, is_open=False) for d in closed_dates],
+            ignore_conflicts=True,
+        )
+
+    if open_dates:
+        TradingDay.objects.bulk_create(
+            [TradingDay(trade_date=d, is_open=True) for d in open_dates],
+            update_conflicts=True,
+            unique_fields=["trade_date"],
+            update_fields=["is_open"],
+            batch_size=1000,
+        )
+
+    with _lock:
+        for d in open_dates:
+            o = d.toordinal()
+            i = bisect_right(_closed, o)
+            if i and _closed[i - 1] == o:
+                del _closed[i - 1]
+            i = bisect_right(_open, o)
+            if not i or _open[i - 1] != o:
+                insort(_open, o)
+
+        for d in closed_dates:
+            o = d.toordinal()
+            i = bisect_right(_open, o)
+            if d.weekday() < 5 and not (i and _open[i - 1] == o):
+                i = bisect_right(_closed, o)
+                if not i or _closed[i - 1] != o:
+                    insort(_closed, o)
+
+
+def last_full_session():
+    """
+    Latest StockPrice date holding a full-market session (at least
+    FULL_SESSION_MIN_SYMBOLS closes), or None.
+    """
+    return (
+        StockPrice.objects
+        .values("trade_date")
+        .annotate(n=Count("id"))
+        .filter(n__gte=FULL_SESSION_MIN_SYMBOLS)
+        .order_by("-trade_date")
+        .values_list("trade_date", flat=True)
+        .first()
+    )
+
+
+def rebuild_from_stock_prices():
+    """
+    Fills the calendar from StockPrice: every stored date is a session,
+    and weekdays between two consecutive full-market sessions are holidays.
+    Returns (sessions, holidays) counts.
+    """
+    counts = (
+        StockPrice.objects
+        .values("trade_date")
+        .annotate(n=Count("id"))
+        .order_by("trade_date")
+        .values_list("trade_date", "n")
+    )
+
+    sessions = []
+    full_sessions = []
+    for trade_date, n in counts:
+        sessions.append(trade_date)
+        if n >= FULL_SESSION_MIN_SYMBOLS:
+            full_sessions.append(trade_date)
+
+    holidays = []
+    for prev, nxt in zip(full_sessions, full_sessions[1:]):
+        if (nxt - prev).days > MAX_HOLIDAY_GAP_DAYS:
+            continue
+
+        day = prev + timedelta(days=1)
+        while day < nxt:
+            if day.weekday() < 5:
+                holidays.append(day)
+            day += timedelta(days=1)
+
+    record_sessions(open_dates=sessions, closed_dates=holidays)
+    load(force=True)
+
+    return len(sessions), len(holidays)
@@ -1,32 +1,192 @@
-import yfinance as yf
-import pandas as pd
+import threading
+import time
 from datetime import timedelta
 
-def get_stock_price_yahoo(symbol: str, date: str):
+import numpy as np
+import pandas as pd
+
+from core.utils.tracing import span
+from core.utils.tracing import traced
+
+# How far back a Yahoo close may be from the requested date.
+LOOKBACK_DAYS = 10
+
+FRAME_CACHE_SIZE = 16
+
+# Frames whose range reaches this close to today may still be missing the
+# latest session, so they are only reused for a short while.
+RECENT_DAYS = 3
+RECENT_TTL = 15 * 60
+
+_lock = threading.Lock()
+_frames = []    # [(tickers, start, end, fetched_at, closes)], most recent last
+_downloader = None
+
+
+def set_downloader(fn):
     """
-    Yahoo fallback price provider.
-    Returns last available close <= date.
+    Replaces yfinance.download (same call signature) - used by tests and
+    benchmarks to run without network access. Pass None to restore.
     """
+    global _downloader
+    _downloader = fn
+    clear_cache()
 
-    yf_symbol = f"{symbol}.NS"
-    target_date = pd.to_datetime(date)
 
-    start = target_date - timedelta(days=10)
-    end = target_date + timedelta(days=1)
+def clear_cache():
+    with _lock:
+        _frames.clear()
 
-    df = yf.download(
-        yf_symbol,
+
+@traced("yahoo.download")
+def _download(tickers, start, end):
+    if _downloader is not None:
+        download = _downloader
+    else:
+        import yfinance as yf
+        download = yf.download
+
+    # Raw closes: they are written back into StockPrice, and corporate
+    # actions are applied on top of them (yfinance adjusts by default).
+    return download(
+        list(tickers),
         start=start.strftime("%Y-%m-%d"),
         end=end.strftime("%Y-%m-%d"),
-        progress=False
+        auto_adjust=False,
+        progress=False,
     )
 
-    if df.empty:
-        raise ValueError("Yahoo price data not found")
 
-    df = df[df.index <= target_date]
+@traced("yahoo.parse")
+def _close_frame(df, tickers):
+    """
+    Normalises a yf.download result to a DataFrame of closes with one
+    column per ticker, indexed by trade date.
+    """
+    if df is None or df.empty:
+        return pd.DataFrame(columns=list(tickers), dtype=float)
+
+    if isinstance(df.columns, pd.MultiIndex):
+        closes = df["Close"]
+    else:
+        closes = df[["Close"]].rename(columns={"Close": tickers[0]})
+
+    if isinstance(closes, pd.Series):
+        closes = closes.to_frame(tickers[0])
+
+    closes.index = pd.to_datetime(closes.index).tz_localize(None).normalize()
+    return closes.sort_index()
+
+
+def _cached_frame(tickers, start, end):
+    now = time.monotonic()
+    recent = pd.Timestamp.today().normalize() - timedelta(days=RECENT_DAYS)
+
+    with _lock:
+        for i in range(len(_frames) - 1, -1, -1):
+            f_tickers, f_start, f_end, fetched_at, closes = _frames[i]
+
+            if f_end >= recent and now - fetched_at > RECENT_TTL:
+                del _frames[i]
+                continue
+
+            if f_start <= start and f_end >= end and set(tickers) <= f_tickers:
+                _frames.append(_frames.pop(i))
+                return closes
+
+    return None
+
+
+def _get_closes(tickers, start, end):
+    closes = _cached_frame(tickers, start, end)
+    if closes is not None:
+        return closes
+
+    closes = _close_frame(_download(tickers, start, end), tickers)
+
+    with _lock:
+        _frames.append((set(tickers), start, end, time.monotonic(), closes))
+        del _frames[:-FRAME_CACHE_SIZE]
+
+    return closes
+
+
+def get_stock_quotes_yahoo(requests):
+    """
+    Batch Yahoo lookup for a set of (symbol, date_str) requests.
+    One multi-ticker download over the covering date range, then a
+    vectorised as-of (last close <= date) lookup per ticker.
+    Returns {(symbol, date_str): (trading_date, close)} for the requests
+    that could be answered.
+    """
+    requests = sorted(set(requests))
+    if not requests:
+        return {}
+
+    targets = pd.to_datetime([d for _, d in requests])
+    tickers = tuple(sorted({f"{symbol}.NS" for symbol, _ in requests}))
+
+    start = targets.min() - timedelta(days=LOOKBACK_DAYS)
+    end = targets.max() + timedelta(days=1)
+
+    closes = _get_closes(tickers, start, end)
+
+    with span("yahoo.lookup"):
+        return _lookup(closes, requests, targets)
+
+
+def _lookup(closes, requests, targets):
+    by_symbol = {}
+    for (symbol, date), target in zip(requests, targets):
+        by_symbol.setdefault(symbol, []).append((date, target))
+
+    quotes = {}
+    for symbol, wanted in by_symbol.items():
+        ticker = f"{symbol}.NS"
+        if ticker not in closes.columns:
+            continue
+
+        series = closes[ticker].dropna()
+        if series.empty:
+            continue
+
+        index = series.index.values
+        values = series.values
+        wanted_dates = np.array([t for _, t in wanted], dtype="datetime64[ns]")
+
+        pos = np.searchsorted(index, wanted_dates, side="right") - 1
+
+        for (date, target), p in zip(wanted, pos):
+            if p < 0:
+                continue
+
+            trade_date = series.index[p]
+            if target - trade_date > timedelta(days=LOOKBACK_DAYS):
+                continue
+
+            quotes[(symbol, date)] = (
+                trade_date.strftime("%Y-%m-%d"),
+                float(values[p]),
+            )
+
+    return quotes
+
+
+def get_stock_price_yahoo(symbol: str, date: str):
+    """
+    Yahoo fallback price provider.
+    Returns last available close <= date.
+    """
+    return get_stock_quote_yahoo(symbol, date)[1]
+
+
+def get_stock_quote_yahoo(symbol: str, date: str):
+    """
+    Returns (trading_date, close) for the last Yahoo close <= date.
+    """
+    quotes = get_stock_quotes_yahoo([(symbol, date)])
 
-    if df.empty:
+    if (symbol, date) not in quotes:
         raise ValueError("Yahoo price not found before date")
 
-    return float(df["Close"].iloc[-1])
+    return quotes[(symbol, date)]
@@ -0,0 +1,21 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from core.models import CorporateAction
+from core.models import StockPrice
+from core.services import adjustment_index
+from core.services import data_versions
+
+
+@receiver(post_save, sender=CorporateAction)
+@receiver(post_delete, sender=CorporateAction)
+def rebuild_adjustment_index(sender, instance, **kwargs):
+    # ex_date may have moved, so rebuild the whole symbol (cheap).
+    adjustment_index.rebuild_symbol(instance.symbol)
+
+
+@receiver(post_save, sender=StockPrice)
+@receiver(post_delete, sender=StockPrice)
+def bump_data_version(sender, instance, **kwargs):
+    # Bulk writes bump versions themselves; this covers admin / ORM edits.
+    data_versions.bump([instance.symbol])
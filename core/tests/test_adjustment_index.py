@@ -0,0 +1,111 @@
+from datetime import date
+from decimal import Decimal
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from core.models import AdjustmentFactor
+from core.models import CorporateAction
+from core.services import adjustment_index
+from core.services import data_versions
+
+
+def _action(symbol, ex_date, action_type, factor=None, cash_value=None):
+    return CorporateAction(
+        symbol=symbol,
+        ex_date=ex_date,
+        action_type=action_type,
+        factor=Decimal(factor) if factor else None,
+        cash_value=Decimal(cash_value) if cash_value else None,
+    )
+
+
+def _rows():
+    return list(
+        AdjustmentFactor.objects.order_by("symbol", "seq").values_list(
+            "symbol", "seq", "ex_date", "cum_factor", "cum_dividend",
+        )
+    )
+
+
+class RebuildTests(TestCase):
+
+    def setUp(self):
+        adjustment_index.invalidate()
+        self.addCleanup(adjustment_index.invalidate)
+
+        # bulk_create sends no signals, so only explicit rebuilds run.
+        CorporateAction.objects.bulk_create([
+            _action("INFY", date(2024, 1, 10), "DIVIDEND", cash_value="10"),
+            _action("INFY", date(2024, 3, 10), "SPLIT", factor="2"),
+            _action("TCS", date(2024, 2, 10), "BONUS", factor="1.5"),
+            _action("TCS", date(2024, 4, 10), "OTHER"),
+        ])
+        adjustment_index.rebuild()
+
+    def test_full_rebuild_accumulates_per_symbol(self):
+        self.assertEqual(_rows(), [
+            ("INFY", 1, date(2024, 1, 10), Decimal("1"), Decimal("10")),
+            ("INFY", 2, date(2024, 3, 10), Decimal("2"), Decimal("10")),
+            ("TCS", 1, date(2024, 2, 10), Decimal("1.5"), Decimal("0")),
+        ])
+
+    def test_incremental_rebuild_matches_a_full_rebuild(self):
+        CorporateAction.objects.bulk_create([
+            _action("INFY", date(2024, 5, 10), "DIVIDEND", cash_value="5"),
+            _action("TCS", date(2024, 1, 5), "DIVIDEND", cash_value="4"),
+            _action("WIPRO", date(2024, 6, 1), "SPLIT", factor="5"),
+        ])
+
+        written = adjustment_index.rebuild({
+            "INFY": date(2024, 5, 10),
+            "TCS": date(2024, 1, 5),
+            "WIPRO": None,
+        })
+        incremental = _rows()
+
+        adjustment_index.rebuild()
+
+        self.assertEqual(written, 4)
+        self.assertEqual(incremental, _rows())
+        self.assertIn(
+            ("INFY", 3, date(2024, 5, 10), Decimal("2"), Decimal("20")),
+            incremental,
+        )
+
+    def test_incremental_rebuild_bumps_the_rebuilt_symbols(self):
+        before = data_versions.get_versions(["INFY", "TCS"])
+
+        adjustment_index.rebuild({"INFY": date(2024, 3, 1)})
+
+        after = data_versions.get_versions(["INFY", "TCS"])
+        self.assertEqual(after["INFY"], before["INFY"] + 1)
+        self.assertEqual(after["TCS"], before["TCS"])
+
+    def test_query_count_does_not_grow_with_symbols(self):
+        def count(n):
+            symbols = [f"S{i}" for i in range(n)]
+            CorporateAction.objects.bulk_create([
+                _action(symbol, date(2024, 1, 10), "SPLIT", factor="2")
+                for symbol in symbols
+            ])
+            with CaptureQueriesContext(connection) as queries:
+                adjustment_index.rebuild(dict.fromkeys(symbols, date(2024, 1, 1)))
+            return len(queries)
+
+        self.assertEqual(count(3), count(30))
+
+    def test_saving_an_action_rebuilds_its_symbol(self):
+        CorporateAction.objects.create(
+            symbol="INFY", ex_date=date(2024, 2, 1), action_type="BONUS", factor=Decimal("3"),
+        )
+
+        self.assertEqual(
+            [row for row in _rows() if row[0] == "INFY"],
+            [
+                ("INFY", 1, date(2024, 1, 10), Decimal("1"), Decimal("10")),
+                ("INFY", 2, date(2024, 2, 1), Decimal("3"), Decimal("10")),
+                ("INFY", 3, date(2024, 3, 10), Decimal("6"), Decimal("10")),
+            ],
+        )
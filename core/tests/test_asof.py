@@ -0,0 +1,103 @@
+from datetime import date
+from decimal import Decimal
+from unittest import mock
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from core.models import StalePriceError
+from core.models import StockPrice
+from core.services import price_resolver
+from core.services import price_store
+
+FRI, SAT, SUN, MON, TUE, WED = (date(2024, 1, d) for d in (5, 6, 7, 8, 9, 10))
+
+
+class AsofPairsTests(TestCase):
+
+    def setUp(self):
+        rows = [
+            ("INFY", FRI, "101.10"),
+            ("INFY", MON, "102.20"),
+            # TUE is a holiday: nothing traded
+            ("INFY", WED, "103.30"),
+            ("TCS", FRI, "3500.00"),
+            ("OLD", date(2023, 6, 1), "10.00"),
+        ]
+        StockPrice.objects.bulk_create([
+            StockPrice(symbol=s, trade_date=d, close_price=Decimal(c)) for s, d, c in rows
+        ])
+
+    def test_weekend_and_holiday_resolve_to_the_previous_session(self):
+        prices, errors = StockPrice.objects.asof_pairs([
+            ("INFY", SAT), ("INFY", SUN), ("INFY", TUE), ("INFY", "2024-01-10"),
+        ])
+
+        self.assertEqual(errors, {})
+        self.assertEqual(prices[("INFY", SAT)], (FRI, Decimal("101.10")))
+        self.assertEqual(prices[("INFY", SUN)], (FRI, Decimal("101.10")))
+        self.assertEqual(prices[("INFY", TUE)], (MON, Decimal("102.20")))
+        self.assertEqual(prices[("INFY", "2024-01-10")], (WED, Decimal("103.30")))
+
+    def test_close_past_the_staleness_limit_is_an_error(self):
+        prices, errors = StockPrice.objects.asof_pairs(
+            [("OLD", WED), ("TCS", WED)], max_staleness=30
+        )
+
+        self.assertEqual(prices, {("TCS", WED): (FRI, Decimal("3500.00"))})
+        error = errors[("OLD", WED)]
+        self.assertIsInstance(error, StalePriceError)
+        self.assertEqual(error.last_trade_date, date(2023, 6, 1))
+
+    def test_missing_symbol_or_no_earlier_close_is_in_neither(self):
+        prices, errors = StockPrice.objects.asof_pairs(
+            [("NOPE", WED), ("INFY", date(2024, 1, 1))], max_staleness=30
+        )
+
+        self.assertEqual((prices, errors), ({}, {}))
+
+    def test_batches_past_max_query_params(self):
+        pairs = [
+            (symbol, day)
+            for symbol in ("INFY", "TCS", "NOPE")
+            for day in (SAT, TUE, WED)
+        ]
+        expected = StockPrice.objects.asof_pairs(pairs)
+
+        # Two parameters per pair: 4 allows two pairs per statement.
+        with mock.patch.object(connection.features, "max_query_params", 4), \
+                CaptureQueriesContext(connection) as queries:
+            batched = StockPrice.objects.asof_pairs(pairs)
+
+        self.assertEqual(len(queries), 5)
+        self.assertEqual(batched, expected)
+        self.assertEqual(len(batched[0]), 6)
+
+    def test_asof_crosses_symbols_and_dates(self):
+        prices, _ = StockPrice.objects.asof(["INFY", "TCS"], [SUN, WED])
+
+        self.assertEqual(prices[("TCS", WED)], (FRI, Decimal("3500.00")))
+        self.assertEqual(len(prices), 4)
+
+
+class ResolverStalenessTests(TestCase):
+
+    def test_unresolved_stale_pair_reports_the_stale_close(self):
+        StockPrice.objects.create(
+            symbol="OLD", trade_date=date(2023, 6, 1), close_price=Decimal("10.00")
+        )
+
+        async def no_quotes(symbols, date):
+            return {}
+
+        with mock.patch.object(price_store, "get_store", return_value=None), \
+                mock.patch.object(price_resolver, "_resolve_date", no_quotes):
+            prices, errors = price_resolver.get_stock_prices_many(
+                [("OLD", "2024-01-10"), ("NOPE", "2024-01-10")]
+            )
+
+        self.assertEqual(prices, {})
+        self.assertIsInstance(errors[("OLD", "2024-01-10")], StalePriceError)
+        self.assertNotIsInstance(errors[("NOPE", "2024-01-10")], StalePriceError)
+        self.assertIsInstance(errors[("NOPE", "2024-01-10")], ValueError)
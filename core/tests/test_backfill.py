@@ -0,0 +1,79 @@
+import os
+import tempfile
+from datetime import date
+from decimal import Decimal
+from unittest import mock
+
+from django.test import TestCase
+
+from core.benchmarks import fixtures
+from core.models import StockPrice
+from core.models import TradingDay
+from core.services import backfill
+from core.services import trading_calendar
+
+SYMBOLS = 20
+
+
+class BackfillTests(TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+
+        patcher = mock.patch.multiple(trading_calendar, _open=[], _closed=[])
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        # Both NSE schemas: the UDIFF format starts on 2024-07-08.
+        self.days = [date(2024, 7, 4), date(2024, 7, 5), date(2024, 7, 8)]
+        self.paths = []
+        for day in self.days:
+            path = os.path.join(tmp.name, fixtures.archive_name(day))
+            with open(path, "wb") as f:
+                f.write(fixtures.bhavcopy_zip(day, SYMBOLS))
+            self.paths.append(path)
+
+        self.broken = os.path.join(tmp.name, "broken.csv.zip")
+        with open(self.broken, "wb") as f:
+            f.write(b"not a zip")
+
+    def test_loads_every_file_and_skips_broken_ones(self):
+        seen = []
+        stats = backfill.backfill(
+            self.paths + [self.broken],
+            workers=1,
+            batch_size=7,
+            on_file=lambda path, rows, stats: seen.append((path, rows)),
+        )
+
+        self.assertEqual(stats.files, 3)
+        self.assertEqual(stats.rows, 3 * SYMBOLS)
+        self.assertEqual([path for path, _ in stats.failed], [self.broken])
+        self.assertEqual(sorted(seen), sorted((p, SYMBOLS) for p in self.paths))
+
+        self.assertEqual(StockPrice.objects.count(), 3 * SYMBOLS)
+        for day in self.days:
+            close = StockPrice.objects.get(symbol="SYM00007", trade_date=day).close_price
+            expected = Decimal(str(fixtures.closes(day, SYMBOLS)[7]))
+            self.assertEqual(close, expected.quantize(Decimal("0.01")))
+
+        self.assertEqual(
+            set(TradingDay.objects.filter(is_open=True).values_list("trade_date", flat=True)),
+            set(self.days),
+        )
+
+    def test_rerun_upserts_instead_of_duplicating(self):
+        StockPrice.objects.create(
+            symbol="SYM00000", trade_date=self.days[0], close_price=Decimal("1.00")
+        )
+
+        backfill.backfill(self.paths, workers=1)
+        stats = backfill.backfill(self.paths, workers=1)
+
+        self.assertEqual(stats.rows, 3 * SYMBOLS)
+        self.assertEqual(StockPrice.objects.count(), 3 * SYMBOLS)
+        self.assertNotEqual(
+            StockPrice.objects.get(symbol="SYM00000", trade_date=self.days[0]).close_price,
+            Decimal("1.00"),
+        )
@@ -0,0 +1,94 @@
+import json
+import os
+import tempfile
+import time
+from datetime import date
+from datetime import timedelta
+from pathlib import Path
+from unittest import mock
+
+from django.test import SimpleTestCase
+from django.test import override_settings
+
+from core.services import bhavcopy_cache
+
+
+def _days_ago(n):
+    return (date.today() - timedelta(days=n)).isoformat()
+
+
+class ArchiveCacheTests(SimpleTestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.root = Path(tmp.name)
+
+        settings = override_settings(BHAVCOPY_CACHE_DIR=self.root, BHAVCOPY_NEGATIVE_TTL=60)
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def _objects(self):
+        return sorted(p.name for p in (self.root / "objects").glob("*/*.zip"))
+
+    def test_identical_content_is_stored_once(self):
+        bhavcopy_cache.store_archive("2024-01-02", b"same")
+        bhavcopy_cache.store_archive("2024-01-03", b"same")
+
+        self.assertEqual(len(self._objects()), 1)
+        self.assertEqual(bhavcopy_cache.lookup_archive("2024-01-02"), (True, b"same"))
+        self.assertEqual(bhavcopy_cache.lookup_archive("2024-01-03"), (True, b"same"))
+
+    def test_unknown_date_is_a_miss(self):
+        self.assertEqual(bhavcopy_cache.lookup_archive("2024-01-02"), (False, None))
+
+    def test_eviction_drops_the_least_recently_used_object(self):
+        bhavcopy_cache.store_archive("2024-01-02", b"a" * 10)
+        bhavcopy_cache.store_archive("2024-01-03", b"b" * 10)
+
+        # Backdate the first object so it is the least recently used.
+        for path in (self.root / "objects").glob("*/*.zip"):
+            if path.read_bytes() == b"a" * 10:
+                os.utime(path, (time.time() - 100, time.time() - 100))
+
+        with override_settings(BHAVCOPY_CACHE_MAX_BYTES=25):
+            bhavcopy_cache.store_archive("2024-01-04", b"c" * 10)
+
+        self.assertEqual(len(self._objects()), 2)
+        self.assertEqual(bhavcopy_cache.lookup_archive("2024-01-02"), (False, None))
+        self.assertEqual(bhavcopy_cache.lookup_archive("2024-01-03"), (True, b"b" * 10))
+        # The dangling date entry is dropped on the miss.
+        self.assertFalse((self.root / "dates" / "2024-01-02.json").exists())
+
+    def test_negative_entry_expires_for_an_unsettled_date(self):
+        day = _days_ago(1)
+        bhavcopy_cache.store_missing(day)
+        self.assertEqual(bhavcopy_cache.lookup_archive(day), (True, None))
+
+        path = self.root / "dates" / f"{day}.json"
+        path.write_text(json.dumps({"missing": True, "checked_at": time.time() - 61}))
+
+        self.assertEqual(bhavcopy_cache.lookup_archive(day), (False, None))
+        self.assertFalse(path.exists())
+
+    def test_negative_entry_of_a_settled_date_does_not_expire(self):
+        day = _days_ago(30)
+        path = self.root / "dates" / f"{day}.json"
+        path.parent.mkdir(parents=True)
+        path.write_text(json.dumps({"missing": True, "checked_at": 0}))
+
+        self.assertEqual(bhavcopy_cache.lookup_archive(day), (True, None))
+
+
+class IsSettledTests(SimpleTestCase):
+
+    def test_settled_after_three_days(self):
+        self.assertFalse(bhavcopy_cache.is_settled(_days_ago(0)))
+        self.assertFalse(bhavcopy_cache.is_settled(_days_ago(3)))
+        self.assertTrue(bhavcopy_cache.is_settled(_days_ago(4)))
+
+    def test_uses_today(self):
+        with mock.patch.object(bhavcopy_cache, "date_cls") as date_cls:
+            date_cls.today.return_value = date(2024, 1, 10)
+            self.assertTrue(bhavcopy_cache.is_settled("2024-01-06"))
+            self.assertFalse(bhavcopy_cache.is_settled("2024-01-07"))
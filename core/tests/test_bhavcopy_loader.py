@@ -0,0 +1,69 @@
+from datetime import date
+from decimal import Decimal
+from unittest import mock
+
+from django.test import TestCase
+
+from core.models import StockPrice
+from core.models import TradingDay
+from core.services import bhavcopy_loader
+from core.services import trading_calendar
+from core.services.nse_price_provider import OHLCV
+
+MON, TUE, WED, THU = (date(2024, 1, d) for d in (1, 2, 3, 4))
+
+
+class CandidateDatesTests(TestCase):
+
+    def setUp(self):
+        patcher = mock.patch.object(trading_calendar, "FULL_SESSION_MIN_SYMBOLS", 3)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        rows = [(MON, s) for s in ("A", "B", "C")] + [(TUE, "A")]
+        StockPrice.objects.bulk_create([
+            StockPrice(symbol=s, trade_date=d, close_price=Decimal("1")) for d, s in rows
+        ])
+        TradingDay.objects.create(trade_date=WED, is_open=False)
+
+    def test_partial_dates_are_still_candidates(self):
+        self.assertEqual(bhavcopy_loader.candidate_dates(MON, THU), [TUE, THU])
+
+    def test_with_symbols_a_date_needs_every_symbol(self):
+        self.assertEqual(
+            bhavcopy_loader.candidate_dates(MON, THU, {"A", "B"}), [TUE, THU]
+        )
+        self.assertEqual(bhavcopy_loader.candidate_dates(MON, THU, {"A"}), [THU])
+
+
+class LoadDatesTests(TestCase):
+
+    def setUp(self):
+        # Loaded dates go into the in-memory calendar too; keep them local.
+        patcher = mock.patch.multiple(trading_calendar, _open=[], _closed=[])
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_a_failed_date_is_reported_and_the_rest_load(self):
+        def snapshot(trading_date):
+            if trading_date == "2024-01-02":
+                raise ConnectionError("reset by peer")
+            if trading_date == "2024-01-03":
+                return None
+            return {"A": OHLCV(1.0, 1.0, 1.0, 1.5, 10)}
+
+        with mock.patch.object(
+            bhavcopy_loader.nse_price_provider, "get_price_snapshot", side_effect=snapshot
+        ):
+            results = {
+                d: (rows, error)
+                for d, rows, error in bhavcopy_loader.load_dates([MON, TUE, WED], workers=2)
+            }
+
+        self.assertEqual(results["2024-01-01"], (1, None))
+        self.assertEqual(results["2024-01-03"], (None, None))
+        rows, error = results["2024-01-02"]
+        self.assertIsNone(rows)
+        self.assertIsInstance(error, ConnectionError)
+
+        self.assertEqual(StockPrice.objects.get(symbol="A").close_price, Decimal("1.50"))
@@ -0,0 +1,22 @@
+from django.test import TestCase
+
+from core.services import data_versions
+
+
+class DataVersionTests(TestCase):
+
+    def test_unknown_symbols_start_at_one(self):
+        self.assertEqual(data_versions.get_versions(["INFY", "tcs"]), {"INFY": 1, "tcs": 1})
+
+    def test_bump_moves_the_symbols_and_the_market(self):
+        data_versions.bump(["infy "])
+        data_versions.bump(["INFY", "TCS"])
+
+        self.assertEqual(
+            data_versions.get_versions(["INFY", "TCS", "WIPRO", data_versions.MARKET]),
+            {"INFY": 3, "TCS": 2, "WIPRO": 1, data_versions.MARKET: 3},
+        )
+
+    def test_bump_of_nothing_is_a_no_op(self):
+        data_versions.bump([])
+        self.assertEqual(data_versions.get_version(data_versions.MARKET), 1)
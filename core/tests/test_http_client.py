@@ -0,0 +1,48 @@
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from core.services.http_client import CircuitBreaker
+from core.services.http_client import CircuitOpenError
+from core.services.http_client import ProviderClient
+
+
+class ProviderClientBreakerTests(SimpleTestCase):
+
+    def _half_open_client(self):
+        breaker = CircuitBreaker(threshold=1, cooldown=60)
+        breaker.record_failure()
+        breaker._opened_at -= 60
+        self.assertEqual(breaker.state, "half-open")
+        return ProviderClient("test", retries=0, breaker=breaker)
+
+    def test_unexpected_exception_fails_the_trial(self):
+        client = self._half_open_client()
+
+        with mock.patch.object(client._session, "get", side_effect=KeyError("boom")):
+            with self.assertRaises(KeyError):
+                client.get("http://example.invalid/")
+
+        # The trial was settled: the circuit re-opened instead of
+        # rejecting every call as a trial still in flight.
+        self.assertEqual(client.breaker.state, "open")
+        with self.assertRaises(CircuitOpenError):
+            client.get("http://example.invalid/")
+
+    def test_successful_trial_closes_the_circuit(self):
+        client = self._half_open_client()
+        response = mock.Mock(status_code=200, headers={})
+
+        with mock.patch.object(client._session, "get", return_value=response):
+            self.assertIs(client.get("http://example.invalid/"), response)
+
+        self.assertEqual(client.breaker.state, "closed")
+
+    def test_retryable_status_counts_as_a_failure(self):
+        client = ProviderClient("test", retries=0, breaker=CircuitBreaker(threshold=1))
+        response = mock.Mock(status_code=503, headers={})
+
+        with mock.patch.object(client._session, "get", return_value=response):
+            self.assertIs(client.get("http://example.invalid/"), response)
+
+        self.assertEqual(client.breaker.state, "open")
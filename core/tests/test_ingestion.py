@@ -0,0 +1,109 @@
+import tempfile
+from datetime import date
+from decimal import Decimal
+from unittest import mock
+
+import pandas as pd
+from django.test import TestCase
+from django.test import override_settings
+
+from core.models import IngestionCheckpoint
+from core.models import StockPrice
+from core.models import TradingDay
+from core.services import bhavcopy_cache
+from core.services import ingestion
+from core.services import trading_calendar
+
+# Mon 2024-01-01 .. Fri 2024-01-05
+D1, D2, D3, D4, D5 = (date(2024, 1, d) for d in range(1, 6))
+
+
+def _frame(*symbols):
+    return pd.DataFrame({"close": [100.0] * len(symbols)}, index=list(symbols))
+
+
+class IngestTests(TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+
+        settings = override_settings(INGEST_LOCK_DIR=tmp.name, BHAVCOPY_CACHE_DIR=tmp.name)
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+        for patcher in (
+            mock.patch.object(trading_calendar, "FULL_SESSION_MIN_SYMBOLS", 2),
+            mock.patch.multiple(trading_calendar, _open=[], _closed=[]),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        self.frames = {}
+
+    def _ingest(self, **kwargs):
+        with mock.patch.object(
+            ingestion.nse_price_provider,
+            "download_bhavcopy",
+            side_effect=lambda key: self.frames.get(key),
+        ):
+            return ingestion.ingest(**kwargs)
+
+    def _checkpoint(self):
+        return IngestionCheckpoint.objects.get(name=ingestion.CHECKPOINT).last_trade_date
+
+    def test_stops_at_a_failed_download_and_resumes_there(self):
+        self.frames = {"2024-01-01": _frame("A", "B"), "2024-01-03": _frame("A", "B")}
+        bhavcopy_cache.store_missing("2024-01-02")     # a recorded 404
+
+        done = self._ingest(start=D1, until=D5)
+
+        # D4 has no bhavcopy and no record of a closure: a failed download.
+        self.assertEqual(done, [(D1, 2), (D2, None), (D3, 2)])
+        self.assertEqual(self._checkpoint(), D3)
+
+        self.frames["2024-01-04"] = _frame("A", "B")
+        TradingDay.objects.create(trade_date=D5, is_open=False)
+
+        done = self._ingest(until=D5)
+
+        self.assertEqual(done, [(D4, 2), (D5, None)])
+        self.assertEqual(self._checkpoint(), D5)
+        self.assertEqual(StockPrice.objects.count(), 6)
+
+    def test_recent_holiday_does_not_hold_up_later_sessions(self):
+        # Every date is "recent": not settled yet.
+        with mock.patch.object(bhavcopy_cache, "is_settled", return_value=False):
+            self.frames = {"2024-01-01": _frame("A", "B"), "2024-01-03": _frame("A", "B")}
+            TradingDay.objects.create(trade_date=D2, is_open=False)
+
+            self.assertEqual(
+                self._ingest(start=D1, until=D3), [(D1, 2), (D2, None), (D3, 2)]
+            )
+
+            # A recent 404 counts once the next session is published.
+            bhavcopy_cache.store_missing("2024-01-04")
+            self.frames["2024-01-05"] = _frame("A", "B")
+
+            self.assertEqual(self._ingest(until=D5), [(D4, None), (D5, 2)])
+            self.assertEqual(self._checkpoint(), D5)
+
+    def test_recent_404_without_a_later_session_is_retried(self):
+        with mock.patch.object(bhavcopy_cache, "is_settled", return_value=False):
+            self.frames = {"2024-01-01": _frame("A", "B")}
+            bhavcopy_cache.store_missing("2024-01-02")
+
+            self.assertEqual(self._ingest(start=D1, until=D5), [(D1, 2)])
+            self.assertEqual(self._checkpoint(), D1)
+
+    def test_bootstraps_from_the_last_full_session(self):
+        StockPrice.objects.bulk_create([
+            StockPrice(symbol=s, trade_date=d, close_price=Decimal("1"))
+            for d, s in ((D1, "A"), (D1, "B"), (D4, "A"))    # D4: a write-back
+        ])
+        self.frames = {"2024-01-02": _frame("A", "B")}
+
+        done = self._ingest(until=D5)
+
+        self.assertEqual(done[0], (D2, 2))
+        self.assertEqual(self._checkpoint(), D2)
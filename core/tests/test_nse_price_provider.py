@@ -0,0 +1,30 @@
+import io
+import zipfile
+
+from django.test import SimpleTestCase
+
+from core.services import bhavcopy_parser
+from core.services.nse_price_provider import snapshot_from_frame
+
+BHAVCOPY = (
+    b"SYMBOL,SERIES,OPEN,HIGH,LOW,CLOSE,LAST,PREVCLOSE,TOTTRDQTY,TOTTRDVAL,TIMESTAMP,TOTALTRADES,ISIN\n"
+    b"INFY,EQ,100,110,95,105.5,105,99,1000,105000,01-JAN-2024,10,INE009A01021\n"
+    b"SUSP,EQ,-,-,-,-,-,50,0,0,01-JAN-2024,0,INE000000001\n"
+)
+
+
+
+def _zip(csv):
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w") as z:
+        z.writestr("cm01JAN2024bhav.csv", csv)
+    return buf.getvalue()
+
+
+class SnapshotFromFrameTests(SimpleTestCase):
+
+    def test_drops_rows_without_a_close(self):
+        snapshot = snapshot_from_frame(bhavcopy_parser.parse(_zip(BHAVCOPY)))
+
+        self.assertEqual(list(snapshot), ["INFY"])
+        self.assertEqual(snapshot["INFY"].close, 105.5)
@@ -0,0 +1,113 @@
+import asyncio
+import threading
+import time
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django.test import SimpleTestCase
+
+from core.services import price_resolver
+
+
+class WithDeadlineTests(SimpleTestCase):
+
+    def _wait_for_release(self):
+        for _ in range(200):
+            if price_resolver.abandoned_calls() == 0:
+                return
+            time.sleep(0.01)
+        self.fail("abandoned calls were not released")
+
+    def test_more_calls_than_threads_queue_instead_of_failing(self):
+        def slow(n):
+            time.sleep(0.02)
+            return n
+
+        async def many():
+            return await asyncio.gather(*(
+                price_resolver._with_deadline(5, slow, n) for n in range(40)
+            ))
+
+        self.assertEqual(async_to_sync(many)(), list(range(40)))
+        self.assertEqual(price_resolver.abandoned_calls(), 0)
+
+    def test_fails_fast_only_once_abandoned_calls_hold_every_thread(self):
+        release = threading.Event()
+
+        async def saturate():
+            calls = [
+                price_resolver._with_deadline(0.2, release.wait)
+                for _ in range(price_resolver.EXECUTOR_WORKERS)
+            ]
+            return await asyncio.gather(*calls, return_exceptions=True)
+
+        try:
+            results = async_to_sync(saturate)()
+            self.assertTrue(
+                all(isinstance(r, asyncio.TimeoutError) for r in results)
+            )
+            self.assertEqual(
+                price_resolver.abandoned_calls(), price_resolver.EXECUTOR_WORKERS
+            )
+
+            started = time.monotonic()
+            with self.assertRaises(asyncio.TimeoutError):
+                async_to_sync(price_resolver._with_deadline)(5, lambda: None)
+            self.assertLess(time.monotonic() - started, 1)
+        finally:
+            release.set()
+
+        self._wait_for_release()
+        self.assertEqual(
+            async_to_sync(price_resolver._with_deadline)(5, lambda: 42), 42
+        )
+
+    def test_call_cancelled_while_queued_is_not_abandoned(self):
+        release = threading.Event()
+
+        async def crowd():
+            calls = [
+                price_resolver._with_deadline(0.2, release.wait)
+                for _ in range(price_resolver.EXECUTOR_WORKERS + 4)
+            ]
+            return await asyncio.gather(*calls, return_exceptions=True)
+
+        try:
+            async_to_sync(crowd)()
+            # The 4 calls that never got a thread were cancelled, not held.
+            self.assertEqual(
+                price_resolver.abandoned_calls(), price_resolver.EXECUTOR_WORKERS
+            )
+        finally:
+            release.set()
+
+        self._wait_for_release()
+
+    def test_closes_db_connections_after_each_call(self):
+        with mock.patch.object(price_resolver, "close_old_connections") as close:
+            async_to_sync(price_resolver._with_deadline)(5, lambda: None)
+
+        close.assert_called_once_with()
+
+
+class ManyDatesTests(SimpleTestCase):
+
+    def test_every_date_resolves_past_the_thread_count(self):
+        dates = [f"2023-{m:02d}-{d:02d}" for m in range(1, 5) for d in range(1, 11)]
+
+        def nse(symbols, date):
+            time.sleep(0.05)    # every date is in flight at once
+            return {symbol: (date, 100.0) for symbol in symbols}
+
+        with mock.patch.object(
+            price_resolver, "get_stock_prices_db_many", return_value=({}, {})
+        ), mock.patch.object(price_resolver, "nse_quotes", nse), \
+                mock.patch.object(price_resolver, "store_stock_prices") as store:
+            prices, errors = price_resolver.get_stock_prices_many(
+                [("INFY", d) for d in dates]
+            )
+
+        self.assertEqual(len(dates), 40)
+        self.assertEqual(errors, {})
+        self.assertEqual(len(prices), 40)
+        self.assertEqual(len(store.call_args.args[0]), 40)
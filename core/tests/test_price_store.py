@@ -0,0 +1,68 @@
+import tempfile
+from datetime import date
+from decimal import Decimal
+from pathlib import Path
+from unittest import mock
+
+from django.test import TestCase
+from django.test import override_settings
+
+from core.models import StockPrice
+from core.services import data_versions
+from core.services import price_store
+from core.services.db_price_provider import get_stock_prices_db_many
+
+
+class PriceStoreTests(TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.root = Path(tmp.name)
+
+        settings = override_settings(PRICE_STORE_DIR=self.root)
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+        # get_store() keeps the last store it opened; forget this one.
+        patcher = mock.patch.multiple(price_store, _store=None, _checked_at=0.0)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        for symbol in ("INFY", "TCS"):
+            StockPrice.objects.create(
+                symbol=symbol, trade_date=date(2024, 1, 2), close_price=Decimal("100.00")
+            )
+
+    def test_symbols_written_after_the_build_come_from_the_table(self):
+        price_store.build_store()
+
+        # An import overwrites both closes, but only INFY's version moves.
+        StockPrice.objects.update(close_price=Decimal("150.00"))
+        data_versions.bump(["INFY"])
+
+        prices, errors = get_stock_prices_db_many(
+            {("INFY", "2024-01-02"), ("TCS", "2024-01-02")}
+        )
+
+        self.assertEqual(errors, {})
+        self.assertEqual(prices[("INFY", "2024-01-02")], 150.0)
+        self.assertEqual(prices[("TCS", "2024-01-02")], 100.0)
+
+        store = price_store.get_store()
+        self.assertFalse(store.is_current())
+        self.assertEqual(store.fresh(["INFY", "TCS"]), {"TCS"})
+
+        price_store.build_store()
+        self.assertTrue(price_store.get_store().is_current())
+
+    def test_keeps_the_build_it_replaces(self):
+        builds = []
+        for _ in range(3):
+            price_store.build_store()
+            builds.append((self.root / "CURRENT").read_text().strip())
+
+        self.assertEqual(
+            sorted(p.name for p in self.root.glob("build-*")), sorted(builds[1:])
+        )
+        self.assertEqual(price_store.get_store().path.name, builds[-1])
@@ -0,0 +1,167 @@
+from datetime import date
+from decimal import Decimal
+
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from core.services.adjustment_index import SymbolIndex
+from core.services.returns import _holding_return
+from core.services.returns import calculate_holdings_returns
+from core.services.returns import parse_shares
+
+
+def _rows(*actions):
+    """
+    AdjustmentFactor-like rows for (ex_date, action_type, value) tuples,
+    with the running totals rebuild_symbol would store.
+    """
+    rows = []
+    cum_factor, cum_dividend = Decimal("1"), Decimal("0")
+
+    for ex_date, action_type, value in actions:
+        factor = cash_value = None
+        if action_type == "DIVIDEND":
+            cash_value = Decimal(value)
+            cum_dividend += cum_factor * cash_value
+        else:
+            factor = Decimal(value)
+            cum_factor *= factor
+
+        rows.append({
+            "ex_date": ex_date,
+            "action_type": action_type,
+            "factor": factor,
+            "cash_value": cash_value,
+            "cum_factor": cum_factor,
+            "cum_dividend": cum_dividend,
+        })
+
+    return SymbolIndex(rows)
+
+
+class HoldingReturnTests(SimpleTestCase):
+
+    def setUp(self):
+        self.index = _rows(
+            (date(2020, 3, 2), "DIVIDEND", "5"),
+            (date(2021, 6, 1), "BONUS", "2"),
+            (date(2022, 1, 3), "DIVIDEND", "1.5"),
+            (date(2023, 5, 5), "SPLIT", "5"),
+            (date(2023, 8, 1), "DIVIDEND", "0.1"),
+        )
+
+    def test_window_excludes_actions_on_start_date(self):
+        result = _holding_return(
+            "ABC", date(2021, 6, 1), date(2023, 9, 1), "10", 100.0, 130.0, self.index,
+        )
+
+        self.assertEqual(result["final_shares"], 50.0)
+        self.assertEqual(
+            [a["type"] for a in result["corporate_actions"]],
+            ["DIVIDEND_CASH", "SPLIT", "DIVIDEND_CASH"],
+        )
+        # 10 shares x 1.5, then 50 shares x 0.1
+        self.assertEqual(result["dividend_gain"], 20.0)
+        self.assertEqual(result["price_gain"], 1500.0)
+        self.assertEqual(result["total_gain"], 1520.0)
+        self.assertEqual(result["final_value"], 2520.0)
+        self.assertEqual(result["total_gain_pct"], 152.0)
+
+    def test_action_log_tracks_shares_and_cash(self):
+        result = _holding_return(
+            "ABC", date(2020, 1, 1), date(2023, 9, 1), "3", 10.0, 1.0, self.index,
+        )
+        actions = result["corporate_actions"]
+
+        self.assertEqual(actions[0]["cash_received"], 15.0)
+        self.assertEqual(actions[1]["shares_before"], 3.0)
+        self.assertEqual(actions[1]["shares_after"], 6.0)
+        self.assertEqual(actions[2]["cash_received"], 9.0)
+        self.assertEqual(actions[2]["total_cash"], 24.0)
+        self.assertEqual(actions[3]["shares_after"], 30.0)
+        self.assertEqual(actions[4]["total_cash"], 27.0)
+        self.assertEqual(result["dividend_gain"], 27.0)
+
+    def test_figures_are_exact_not_float_accumulated(self):
+        index = _rows(*[
+            (date(2020, 1, day), "DIVIDEND", "0.1") for day in range(1, 31)
+        ])
+        result = _holding_return(
+            "ABC", date(2019, 1, 1), date(2021, 1, 1), "3", 0.1, 0.2, index,
+        )
+
+        self.assertEqual(result["dividend_gain"], 9.0)
+        self.assertEqual(result["price_gain"], 0.3)
+        self.assertEqual(result["total_gain"], 9.3)
+        self.assertEqual(result["final_value"], 9.6)
+
+    def test_no_actions(self):
+        result = _holding_return(
+            "ABC", date(2024, 1, 1), date(2024, 2, 1), "1", 1.005, 2.0, self.index,
+        )
+
+        self.assertEqual(result["start_price"], 1.01)   # half-up to paise
+        self.assertEqual(result["final_shares"], 1.0)
+        self.assertEqual(result["corporate_actions"], [])
+
+    def test_rejects_invalid_shares(self):
+        for shares in ("0", "-1", "NaN", "Infinity", "abc"):
+            with self.subTest(shares=shares):
+                with self.assertRaises(ValueError):
+                    _holding_return(
+                        "ABC", date(2024, 1, 1), date(2024, 2, 1),
+                        shares, 1.0, 2.0, self.index,
+                    )
+
+
+class ParseSharesTests(SimpleTestCase):
+
+    def test_accepts_positive_numbers(self):
+        self.assertEqual(parse_shares("2.5"), Decimal("2.5"))
+        self.assertEqual(parse_shares(7), Decimal("7"))
+
+    def test_rejects_non_positive_and_non_finite(self):
+        for value in ("0", "-3", "nan", "sNaN", "inf", "-Infinity", "", None, "1e"):
+            with self.subTest(value=value):
+                with self.assertRaises(ValueError):
+                    parse_shares(value)
+
+
+class HoldingValidationTests(SimpleTestCase):
+
+    def test_invalid_holdings_get_their_own_error(self):
+        prices = {
+            ("INFY", "2024-01-01"): 100.0,
+            ("INFY", "2024-02-01"): 110.0,
+        }
+        holdings = [
+            {"symbol": "infy", "shares": 2},
+            {"symbol": 42, "shares": 1},
+            {"symbol": "TCS", "shares": "0"},
+            {"symbol": "TCS", "shares": "NaN"},
+            {"symbol": "TCS", "buy_date": "01/01/2024"},
+            "INFY",
+        ]
+
+        with mock.patch(
+            "core.services.returns.get_stock_prices_many",
+            return_value=(prices, {}),
+        ) as resolve, mock.patch(
+            "core.services.adjustment_index.get_indexes",
+            return_value={"INFY": SymbolIndex([])},
+        ):
+            result = calculate_holdings_returns(holdings, "2024-01-01", "2024-02-01")
+
+        resolve.assert_called_once_with(set(prices))
+
+        first, *invalid = result["holdings"]
+        self.assertEqual(first["total_gain"], 20.0)
+        self.assertEqual(
+            [r["symbol"] for r in invalid], [42, "TCS", "TCS", "TCS", None]
+        )
+        for r in invalid:
+            self.assertTrue(r["error"].startswith("invalid holding: "))
+
+        self.assertEqual(result["summary"]["holdings"], 6)
+        self.assertEqual(result["summary"]["priced_holdings"], 1)
@@ -0,0 +1,65 @@
+from datetime import date
+from decimal import Decimal
+from unittest import mock
+
+from django.test import TestCase
+from django.test import override_settings
+
+from core.models import StockPrice
+from core.services import screener
+from core.services import trading_calendar
+from core.services.nse_price_provider import OHLCV
+
+
+def _quote(close):
+    return OHLCV(close, close, close, close, 0)
+
+
+@override_settings(PRICE_STORE_DIR="/nonexistent/price_store")
+class GetClosesTests(TestCase):
+
+    def setUp(self):
+        patcher = mock.patch.object(trading_calendar, "FULL_SESSION_MIN_SYMBOLS", 3)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.snapshot = {s: _quote(50.0) for s in ("A", "B", "C", "D")}
+
+    def _store(self, *symbols):
+        StockPrice.objects.bulk_create([
+            StockPrice(symbol=s, trade_date=date(2024, 1, 2), close_price=Decimal("10"))
+            for s in symbols
+        ])
+
+    def test_partial_session_falls_through_to_the_bhavcopy(self):
+        self._store("A")   # a single written-back close
+
+        with mock.patch.object(
+            screener.nse_price_provider, "get_price_snapshot", return_value=self.snapshot
+        ) as snapshot:
+            closes = screener.get_closes("2024-01-02")
+
+        snapshot.assert_called_once_with("2024-01-02")
+        self.assertEqual(sorted(closes.index), ["A", "B", "C", "D"])
+        self.assertEqual(closes["A"], 50.0)
+
+    def test_full_session_comes_from_the_table(self):
+        self._store("A", "B", "C")
+
+        with mock.patch.object(
+            screener.nse_price_provider, "get_price_snapshot"
+        ) as snapshot:
+            closes = screener.get_closes("2024-01-02")
+
+        snapshot.assert_not_called()
+        self.assertEqual(closes.to_dict(), {"A": 10.0, "B": 10.0, "C": 10.0})
+
+    def test_partial_session_is_used_without_a_bhavcopy(self):
+        self._store("A")
+
+        with mock.patch.object(
+            screener.nse_price_provider, "get_price_snapshot", return_value=None
+        ):
+            closes = screener.get_closes("2024-01-02")
+
+        self.assertEqual(closes.to_dict(), {"A": 10.0})
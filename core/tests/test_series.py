@@ -0,0 +1,90 @@
+from datetime import date
+from decimal import Decimal
+from unittest import mock
+
+import numpy as np
+from django.test import SimpleTestCase
+
+from core.services import adjustment_index
+from core.services import series
+
+START = date(2024, 1, 1).toordinal()
+
+
+def _index(*actions):
+    """
+    SymbolIndex from (day offset, cum_factor, cum_dividend) tuples.
+    """
+    return adjustment_index.SymbolIndex([
+        {
+            "ex_date": date.fromordinal(START + offset),
+            "cum_factor": Decimal(cum_factor),
+            "cum_dividend": Decimal(cum_dividend),
+        }
+        for offset, cum_factor, cum_dividend in actions
+    ])
+
+
+class LttbTests(SimpleTestCase):
+
+    def setUp(self):
+        self.x = np.arange(100, dtype=np.float64)
+        self.y = np.sin(self.x / 5)
+
+    def test_keeps_both_endpoints(self):
+        keep = series.lttb(self.x, self.y, 10)
+
+        self.assertEqual(len(keep), 10)
+        self.assertEqual(keep[0], 0)
+        self.assertEqual(keep[-1], 99)
+        self.assertTrue((np.diff(keep) > 0).all())
+
+    def test_keeps_a_spike(self):
+        self.y = np.zeros(100)
+        self.y[42] = 10.0
+
+        self.assertIn(42, series.lttb(self.x, self.y, 10))
+
+    def test_threshold_at_or_above_the_length_keeps_everything(self):
+        for threshold in (100, 150):
+            with self.subTest(threshold=threshold):
+                np.testing.assert_array_equal(series.lttb(self.x, self.y, threshold), np.arange(100))
+
+    def test_threshold_below_three_keeps_everything(self):
+        for threshold in (0, 1, 2):
+            with self.subTest(threshold=threshold):
+                np.testing.assert_array_equal(series.lttb(self.x, self.y, threshold), np.arange(100))
+
+
+class AdjustTests(SimpleTestCase):
+
+    def _adjust(self, index, close):
+        days = np.arange(START, START + len(close), dtype=np.int32)
+        with mock.patch.object(adjustment_index, "get_index", return_value=index):
+            return series.adjust("INFY", days, np.asarray(close, dtype=np.float64))
+
+    def test_without_actions_the_series_is_unchanged(self):
+        adj_close, tr_index = self._adjust(_index(), [100.0, 110.0, 99.0])
+
+        np.testing.assert_allclose(adj_close, [100.0, 110.0, 99.0])
+        np.testing.assert_allclose(tr_index, [100.0, 110.0, 99.0])
+
+    def test_split_is_adjusted_to_end_date_shares(self):
+        adj_close, tr_index = self._adjust(_index((2, "2", "0")), [100.0, 100.0, 50.0, 55.0])
+
+        np.testing.assert_allclose(adj_close, [50.0, 50.0, 50.0, 55.0])
+        np.testing.assert_allclose(tr_index, [100.0, 100.0, 100.0, 110.0])
+
+    def test_dividend_is_reinvested_in_the_index_only(self):
+        adj_close, tr_index = self._adjust(_index((1, "1", "5")), [100.0, 100.0, 100.0])
+
+        np.testing.assert_allclose(adj_close, [100.0, 100.0, 100.0])
+        np.testing.assert_allclose(tr_index, [100.0, 105.0, 105.0])
+
+    def test_dividend_after_a_split_is_per_original_share(self):
+        # 2:1 split, then 5 per new share, i.e. 10 per original share.
+        index = _index((1, "2", "0"), (2, "2", "10"))
+        adj_close, tr_index = self._adjust(index, [100.0, 50.0, 50.0])
+
+        np.testing.assert_allclose(adj_close, [50.0, 50.0, 50.0])
+        np.testing.assert_allclose(tr_index, [100.0, 100.0, 110.0])
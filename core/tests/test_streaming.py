@@ -0,0 +1,131 @@
+import json
+from datetime import date
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django.http import StreamingHttpResponse
+from django.test import AsyncClient
+from django.test import Client
+from django.test import RequestFactory
+from django.test import SimpleTestCase
+
+from core import views
+from core.middleware import TimingMiddleware
+from core.utils import streaming
+from core.utils import tracing
+
+
+def _result():
+    # Cached screener results are ordered by total_return_pct.
+    rows = [
+        {"symbol": "A", "total_return_pct": 30.0, "price_return_pct": 10.0, "dividend_yield_pct": 1.0},
+        {"symbol": "B", "total_return_pct": 20.0, "price_return_pct": 30.0, "dividend_yield_pct": 3.0},
+        {"symbol": "C", "total_return_pct": 10.0, "price_return_pct": 20.0, "dividend_yield_pct": 2.0},
+    ]
+    return {
+        "from": date(2024, 1, 1),
+        "to": date(2024, 6, 1),
+        "from_session": "2024-01-01",
+        "to_session": "2024-05-31",
+        "rows": rows,
+    }
+
+
+class AsyncLinesTests(SimpleTestCase):
+
+    def test_lines_are_pulled_one_at_a_time(self):
+        produced = []
+
+        def lines():
+            for i in range(3):
+                produced.append(i)
+                yield f"{i}\n"
+
+        async def first(body):
+            async for line in body:
+                return line
+
+        body = streaming.async_lines(lines())
+        self.assertEqual(async_to_sync(first)(body), "0\n")
+        self.assertEqual(produced, [0])
+
+    def test_asynchronous_response_is_async(self):
+        response = streaming.streaming_response("ndjson", [{"a": 1}], asynchronous=True)
+        self.assertTrue(response.is_async)
+
+        self.assertFalse(streaming.streaming_response("ndjson", [{"a": 1}]).is_async)
+
+
+class ScreenerStreamTests(SimpleTestCase):
+
+    def setUp(self):
+        patcher = mock.patch.object(views, "get_screener", return_value=_result())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _params(self, **params):
+        return {"from": "2024-01-01", "to": "2024-06-01", "format": "ndjson", **params}
+
+    @staticmethod
+    def _symbols(body):
+        return [json.loads(line)["symbol"] for line in body.decode().splitlines()]
+
+    def test_wsgi_streams_best_first(self):
+        response = Client().get("/api/screener/", self._params(sort="price_return_pct", limit=2))
+
+        self.assertFalse(response.is_async)
+        self.assertEqual(self._symbols(b"".join(response.streaming_content)), ["B", "C"])
+
+    def test_asgi_gets_an_async_body(self):
+        async def fetch():
+            response = await AsyncClient().get("/api/screener/", self._params())
+            return response, b"".join([part async for part in response.streaming_content])
+
+        response, body = async_to_sync(fetch)()
+
+        self.assertTrue(response.is_async)
+        self.assertEqual(self._symbols(body), ["A", "B", "C"])
+
+    def test_csv_keeps_the_cached_order(self):
+        response = Client().get("/api/screener/", self._params(format="csv", limit=2))
+        lines = b"".join(response.streaming_content).decode().splitlines()
+
+        self.assertEqual([line.split(",")[0] for line in lines], ["symbol", "A", "B"])
+
+
+class TimingMiddlewareStreamTests(SimpleTestCase):
+
+    def setUp(self):
+        tracing.reset()
+        self.addCleanup(tracing.reset)
+
+    def _chunks(self):
+        for i in range(3):
+            with tracing.span("chunk"):
+                yield f"{i}\n"
+
+    def test_sync_stream_is_traced_until_it_ends(self):
+        middleware = TimingMiddleware(lambda request: StreamingHttpResponse(self._chunks()))
+        response = middleware(RequestFactory().get("/"))
+
+        self.assertIn("total;dur=", response["Server-Timing"])
+        self.assertNotIn("request unmatched", tracing.histograms())
+
+        self.assertEqual(b"".join(response.streaming_content), b"0\n1\n2\n")
+        self.assertEqual(tracing.histograms()["chunk"]["count"], 3)
+        self.assertEqual(tracing.histograms()["request unmatched"]["count"], 1)
+        self.assertIsNone(tracing.current_trace())
+
+    def test_async_stream_is_traced_until_it_ends(self):
+        def get_response(request):
+            return StreamingHttpResponse(streaming.async_lines(self._chunks()))
+
+        response = TimingMiddleware(get_response)(RequestFactory().get("/"))
+        self.assertTrue(response.is_async)
+
+        async def consume():
+            return b"".join([part async for part in response.streaming_content])
+
+        self.assertEqual(async_to_sync(consume)(), b"0\n1\n2\n")
+        self.assertEqual(tracing.histograms()["chunk"]["count"], 3)
+        self.assertEqual(tracing.histograms()["request unmatched"]["count"], 1)
@@ -0,0 +1,109 @@
+import tempfile
+from datetime import date
+from datetime import timedelta
+from unittest import mock
+
+from django.test import TestCase
+from django.test import override_settings
+
+from core.models import TradingDay
+from core.services import nse_price_provider
+from core.services import trading_calendar
+
+# Mon 2024-01-08 .. Sun 2024-01-14
+MON, TUE, WED, THU, FRI, SAT, SUN = (date(2024, 1, d) for d in range(8, 15))
+
+
+class CalendarTestCase(TestCase):
+
+    def setUp(self):
+        patcher = mock.patch.multiple(
+            trading_calendar, _open=[], _closed=[], _loaded_at=None
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+
+class PreviousSessionTests(CalendarTestCase):
+
+    def setUp(self):
+        super().setUp()
+        trading_calendar.record_sessions(
+            open_dates=[MON, "2024-01-10", FRI], closed_dates=[TUE]
+        )
+
+    def test_sessions_holidays_and_weekends(self):
+        cases = {
+            MON: MON,
+            TUE: MON,           # a known holiday
+            WED: WED,
+            SAT: FRI,           # weekends need no record
+            SUN: FRI,
+            THU: None,          # a hole in the calendar
+            date(2024, 1, 5): None,   # before the first session
+        }
+        for day, expected in cases.items():
+            with self.subTest(day=day):
+                self.assertEqual(trading_calendar.previous_session(day), expected)
+
+        self.assertEqual(trading_calendar.previous_session("2024-01-09"), MON)
+
+    def test_answers_survive_a_reload_from_the_database(self):
+        trading_calendar.load(force=True)
+
+        self.assertEqual(trading_calendar.previous_session(TUE), MON)
+        self.assertEqual(trading_calendar.previous_session(SUN), FRI)
+        self.assertIsNone(trading_calendar.previous_session(THU))
+
+    def test_an_observed_session_overrides_a_closure(self):
+        trading_calendar.record_sessions(open_dates=[TUE])
+        trading_calendar.record_sessions(closed_dates=[TUE])    # ignored
+
+        self.assertEqual(trading_calendar.previous_session(TUE), TUE)
+        self.assertTrue(TradingDay.objects.get(trade_date=TUE).is_open)
+
+    def test_has_session_after(self):
+        self.assertTrue(trading_calendar.has_session_after(THU))
+        self.assertFalse(trading_calendar.has_session_after(FRI))
+
+
+class ArchiveClosureTests(CalendarTestCase):
+
+    def setUp(self):
+        super().setUp()
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+
+        settings = override_settings(BHAVCOPY_CACHE_DIR=tmp.name)
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def _not_found(self, day):
+        with mock.patch.object(
+            nse_price_provider, "_download_archive", return_value=(None, "url", True)
+        ):
+            return nse_price_provider._fetch_and_store_archive(day.strftime("%Y-%m-%d"))
+
+    def test_unpublished_today_is_not_a_closure(self):
+        today = date.today()
+
+        self.assertIsNone(self._not_found(today))
+
+        self.assertFalse(TradingDay.objects.filter(trade_date=today).exists())
+        self.assertIsNone(trading_calendar.previous_session(today))
+
+    def test_settled_404_is_a_closure(self):
+        day = date.today() - timedelta(days=10)
+
+        self._not_found(day)
+
+        self.assertFalse(TradingDay.objects.get(trade_date=day).is_open)
+
+    def test_recent_404_before_a_known_session_is_a_closure(self):
+        today = date.today()
+        day = today - timedelta(days=1)
+        trading_calendar.record_sessions(open_dates=[today])
+
+        self._not_found(day)
+
+        self.assertFalse(TradingDay.objects.get(trade_date=day).is_open)
@@ -0,0 +1,135 @@
+from datetime import date
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import SimpleTestCase
+from django.test import TestCase
+from django.test import override_settings
+from rest_framework.test import APIRequestFactory
+from rest_framework.test import force_authenticate
+
+from core import views
+from core.models import StockPrice
+from core.services import price_resolver
+from core.services import price_store
+from core.utils import tracing
+
+
+class ReturnsApiTests(SimpleTestCase):
+
+    def setUp(self):
+        self.factory = APIRequestFactory()
+
+    def _get(self, headers=None, **params):
+        params = {"symbol": "INFY", "from": "2020-01-01", "to": "2020-06-01", **params}
+        request = self.factory.get("/api/returns/", params, headers=headers)
+        with mock.patch.object(
+            views, "get_portfolio_return", return_value={"symbol": "INFY"}
+        ), mock.patch.object(views, "etag", return_value='"abc"'):
+            return views.returns_api(request)
+
+    def test_invalid_shares_are_a_400(self):
+        for shares in ("x", "0", "-2", "NaN", "Infinity"):
+            with self.subTest(shares=shares):
+                self.assertEqual(self._get(shares=shares).status_code, 400)
+
+    def test_invalid_dates_are_a_400(self):
+        self.assertEqual(self._get(**{"from": "2020/01/01"}).status_code, 400)
+
+    def test_if_none_match(self):
+        cases = {
+            '"abc"': 304,
+            'W/"abc"': 304,
+            '"x", W/"abc"': 304,
+            "*": 304,
+            '"abcd"': 200,
+            '"ab"': 200,
+            'W/"abc1", "zabc"': 200,
+        }
+        for header, status in cases.items():
+            with self.subTest(header=header):
+                response = self._get(headers={"If-None-Match": header})
+                self.assertEqual(response.status_code, status)
+                self.assertEqual(response["ETag"], '"abc"')
+
+
+class ReturnsApiPriceErrorTests(TestCase):
+
+    def setUp(self):
+        StockPrice.objects.create(
+            symbol="GONE", trade_date=date(2015, 3, 2), close_price=Decimal("12.00")
+        )
+
+        async def no_quotes(symbols, date):
+            return {}
+
+        for patcher in (
+            mock.patch.object(price_store, "get_store", return_value=None),
+            mock.patch.object(price_resolver, "_resolve_date", no_quotes),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def _get(self, symbol):
+        request = APIRequestFactory().get(
+            "/api/returns/", {"symbol": symbol, "from": "2020-01-01", "to": "2020-06-01"}
+        )
+        return views.returns_api(request)
+
+    def test_stale_close_is_a_422(self):
+        response = self._get("GONE")
+
+        self.assertEqual(response.status_code, 422)
+        self.assertIn("staleness limit", response.data["error"])
+        self.assertNotIn("ETag", response)
+
+    def test_unknown_symbol_is_a_404(self):
+        response = self._get("NOPE")
+
+        self.assertEqual(response.status_code, 404)
+        self.assertIn("NOPE", response.data["error"])
+
+
+class MetricsApiTests(SimpleTestCase):
+
+    def _get(self, user=None):
+        request = APIRequestFactory().get("/api/metrics/")
+        if user is not None:
+            force_authenticate(request, user=user)
+        return views.metrics_api(request)
+
+    @override_settings(DEBUG=False)
+    def test_anonymous_is_a_403(self):
+        self.assertEqual(self._get().status_code, 403)
+
+    @override_settings(DEBUG=False)
+    def test_non_staff_is_a_403(self):
+        self.assertEqual(self._get(User(username="u")).status_code, 403)
+
+    @override_settings(DEBUG=False)
+    def test_staff_gets_the_metrics(self):
+        response = self._get(User(username="u", is_staff=True))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("spans", response.data)
+
+    @override_settings(DEBUG=True)
+    def test_open_under_debug(self):
+        self.assertEqual(self._get().status_code, 200)
+
+
+@override_settings(DEBUG=True, TRACING_ENABLED=True)
+class ServerTimingTests(SimpleTestCase):
+
+    def test_header_carries_the_spans_and_the_total(self):
+        with mock.patch.object(views.bhavcopy_cache, "cache_stats", tracing.traced("stats")(dict)):
+            response = self.client.get("/api/metrics/")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertRegex(response["Server-Timing"], r'^stats;dur=[\d.]+;desc="x1", total;dur=[\d.]+$')
+
+    def test_debug_timing_adds_the_summary(self):
+        response = self.client.get("/api/metrics/", {"debug": "timing"})
+
+        self.assertIn("total_ms", response.json()["timing"])
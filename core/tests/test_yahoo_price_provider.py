@@ -0,0 +1,98 @@
+from unittest import mock
+
+import pandas as pd
+from django.test import SimpleTestCase
+
+from core.services import yahoo_price_provider
+
+
+class StubDownloader:
+    """
+    yfinance.download stand-in: serves `closes` ({ticker: {date: close}})
+    in yfinance's layout and records every call.
+    """
+
+    def __init__(self, closes):
+        self.closes = closes
+        self.calls = []
+
+    def __call__(self, tickers, start, end, **kwargs):
+        self.calls.append((tuple(tickers), start, end, kwargs))
+
+        frame = pd.DataFrame({
+            ticker: pd.Series(self.closes.get(ticker, {}), dtype=float)
+            for ticker in tickers
+        })
+        frame.index = pd.to_datetime(frame.index)
+        frame = frame[(frame.index >= start) & (frame.index < end)]
+
+        if len(tickers) == 1:
+            return frame.rename(columns={tickers[0]: "Close"})
+
+        frame.columns = pd.MultiIndex.from_product([["Close"], frame.columns])
+        return frame
+
+
+class YahooQuotesTests(SimpleTestCase):
+
+    def setUp(self):
+        self.stub = StubDownloader({
+            "INFY.NS": {"2024-01-04": 1500.0, "2024-01-05": 1510.5},
+            "TCS.NS": {"2024-01-05": 3700.0},
+            "OLD.NS": {"2023-01-02": 10.0},
+        })
+        yahoo_price_provider.set_downloader(self.stub)
+        self.addCleanup(yahoo_price_provider.set_downloader, None)
+
+    def test_requests_raw_closes(self):
+        yahoo_price_provider.get_stock_quotes_yahoo([("INFY", "2024-01-05")])
+
+        _, _, _, kwargs = self.stub.calls[0]
+        self.assertIs(kwargs["auto_adjust"], False)
+        self.assertIs(kwargs["progress"], False)
+
+    def test_batch_as_of_lookup(self):
+        quotes = yahoo_price_provider.get_stock_quotes_yahoo([
+            ("INFY", "2024-01-07"),     # Sunday -> Friday
+            ("INFY", "2024-01-04"),
+            ("TCS", "2024-01-05"),
+            ("TCS", "2024-01-04"),      # nothing on or before
+            ("OLD", "2024-01-05"),      # past LOOKBACK_DAYS
+            ("NOPE", "2024-01-05"),
+        ])
+
+        self.assertEqual(quotes, {
+            ("INFY", "2024-01-07"): ("2024-01-05", 1510.5),
+            ("INFY", "2024-01-04"): ("2024-01-04", 1500.0),
+            ("TCS", "2024-01-05"): ("2024-01-05", 3700.0),
+        })
+        self.assertEqual(len(self.stub.calls), 1)
+        self.assertEqual(
+            self.stub.calls[0][0], ("INFY.NS", "NOPE.NS", "OLD.NS", "TCS.NS")
+        )
+
+    def test_single_ticker_layout(self):
+        self.assertEqual(
+            yahoo_price_provider.get_stock_quote_yahoo("TCS", "2024-01-06"),
+            ("2024-01-05", 3700.0),
+        )
+        with self.assertRaises(ValueError):
+            yahoo_price_provider.get_stock_price_yahoo("TCS", "2024-01-04")
+
+    def test_covered_requests_reuse_the_downloaded_frame(self):
+        yahoo_price_provider.get_stock_quotes_yahoo(
+            [("INFY", "2024-01-05"), ("TCS", "2024-01-05")]
+        )
+        quotes = yahoo_price_provider.get_stock_quotes_yahoo([("TCS", "2024-01-05")])
+
+        self.assertEqual(quotes[("TCS", "2024-01-05")], ("2024-01-05", 3700.0))
+        self.assertEqual(len(self.stub.calls), 1)
+
+    def test_default_downloader_is_yfinance_without_adjustment(self):
+        yahoo_price_provider.set_downloader(None)
+        download = mock.Mock(return_value=pd.DataFrame())
+
+        with mock.patch.dict("sys.modules", {"yfinance": mock.Mock(download=download)}):
+            yahoo_price_provider.get_stock_quotes_yahoo([("INFY", "2024-01-05")])
+
+        self.assertIs(download.call_args.kwargs["auto_adjust"], False)
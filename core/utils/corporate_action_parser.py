@@ -1,5 +1,11 @@
 import re
 from decimal import Decimal
+from functools import lru_cache
+
+_PURPOSE_SEPARATOR = re.compile(r"[\/;&]| AND ", flags=re.I)
+_NUMBER = re.compile(r"\d+\.?\d*")
+_INTEGER = re.compile(r"\d+")
+
 
 def split_purpose(purpose: str):
     """
@@ -8,7 +14,7 @@ def split_purpose(purpose: str):
     'Div 30%/Bonus 1:1'
     'Dividend Rs 20 AND Bonus 1:1'
     """
-    return [p.strip() for p in re.split(r"[\/;&]| AND ", purpose, flags=re.I) if p.strip()]
+    return [p.strip() for p in _PURPOSE_SEPARATOR.split(purpose) if p.strip()]
 
 
 def classify_action(text: str):
@@ -32,12 +38,12 @@ def parse_dividend(text: str, face_value: Decimal):
 
     # Percentage dividend (old NSE data)
     if "%" in t:
-        nums = re.findall(r"\d+\.?\d*", t)
+        nums = _NUMBER.findall(t)
         if nums:
             return (Decimal(nums[0]) / Decimal("100")) * face_value
 
     # Cash dividend
-    nums = re.findall(r"\d+\.?\d*", t)
+    nums = _NUMBER.findall(t)
     if nums:
         return Decimal(nums[0])
 
@@ -49,7 +55,7 @@ def parse_bonus(text: str):
     Bonus 1:1 -> factor = 2
     Bonus 2:1 -> factor = 1.5
     """
-    nums = re.findall(r"\d+", text)
+    nums = _INTEGER.findall(text)
     if len(nums) >= 2:
         a, b = Decimal(nums[0]), Decimal(nums[1])
         return (a + b) / a
@@ -60,9 +66,41 @@ def parse_split(text: str):
     """
     Split from Rs 10 to Rs 5 -> factor = 2
     """
-    nums = re.findall(r"\d+", text)
+    nums = _INTEGER.findall(text)
     if len(nums) >= 2:
         old, new = Decimal(nums[0]), Decimal(nums[1])
         if new != 0:
             return old / new
     return None
+
+
+@lru_cache(maxsize=65536)
+def parse_purpose(purpose: str, face_value: Decimal):
+    """
+    Full parse of one PURPOSE field into a tuple of
+    (action_type, factor, cash_value, part), OTHER fragments dropped.
+    Cached: the same PURPOSE strings repeat across thousands of rows.
+    """
+    actions = []
+
+    for part in split_purpose(purpose):
+        action_type = classify_action(part)
+
+        factor = None
+        cash_value = None
+
+        if action_type == "DIVIDEND":
+            cash_value = parse_dividend(part, face_value)
+
+        elif action_type == "BONUS":
+            factor = parse_bonus(part)
+
+        elif action_type == "SPLIT":
+            factor = parse_split(part)
+
+        if action_type == "OTHER":
+            continue
+
+        actions.append((action_type, factor, cash_value, part))
+
+    return tuple(actions)
@@ -0,0 +1,39 @@
+from decimal import Decimal, ROUND_HALF_UP
+
+import numpy as np
+
+# Money is held as integer paise (int, or int64 in NumPy arrays).
+# Rounding to paise is half-up (away from zero), the convention for
+# rupee amounts.
+
+PAISE = 100
+
+# Added before flooring in the vectorised conversion so that values like
+# 1.005 (stored as 1.00499999...) still round half-up.
+_EPSILON = 1e-6
+
+
+def to_paise(value):
+    """
+    Rupees (float, Decimal, str or int) -> int paise, half-up.
+    Floats round like to_paise_array, so 1.005 -> 101.
+    """
+    if isinstance(value, (float, int)):
+        paise = int(abs(value) * PAISE + 0.5 + _EPSILON)
+        return -paise if value < 0 else paise
+
+    return int(
+        (Decimal(value) * PAISE).quantize(Decimal("1"), rounding=ROUND_HALF_UP)
+    )
+
+
+def to_paise_array(values):
+    """
+    Vectorised to_paise for a float array; returns int64 paise.
+    """
+    values = np.asarray(values, dtype=np.float64) * PAISE
+    return (np.sign(values) * np.floor(np.abs(values) + 0.5 + _EPSILON)).astype(np.int64)
+
+
+def from_paise_array(paise):
+    return np.asarray(paise, dtype=np.float64) / PAISE
@@ -0,0 +1,77 @@
+import csv
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+
+CONTENT_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+FORMATS = tuple(CONTENT_TYPES)
+
+
+class _Echo:
+    # csv.writer target that hands each formatted row straight back.
+    def write(self, value):
+        return value
+
+
+def ndjson_lines(items):
+    encoder = DjangoJSONEncoder()
+    for item in items:
+        yield encoder.encode(item) + "\n"
+
+
+def csv_lines(items, fields):
+    """
+    CSV rows of `fields` for each dict item; header first. Items without
+    a field (e.g. an error row) leave it empty; other keys are ignored.
+    """
+    writer = csv.writer(_Echo())
+    yield writer.writerow(fields)
+    for item in items:
+        yield writer.writerow([item.get(field, "") for field in fields])
+
+
+def is_asgi(request):
+    return isinstance(getattr(request, "_request", request), ASGIRequest)
+
+
+async def async_lines(lines):
+    """
+    Async iterator over a sync one for ASGI servers, which would otherwise
+    buffer a sync body whole (sync_to_async(list)). Each line is produced
+    on the thread-sensitive sync thread, so the ORM keeps working.
+    """
+    pull = sync_to_async(next)
+    try:
+        while True:
+            line = await pull(lines, None)
+            if line is None:
+                return
+            yield line
+    finally:
+        await sync_to_async(lines.close)()
+
+
+def streaming_response(fmt, items, fields=None, filename="export", asynchronous=False):
+    """
+    StreamingHttpResponse that encodes `items` lazily, one line each, as
+    NDJSON or (with `fields`) CSV. Pass asynchronous=is_asgi(request):
+    an ASGI server needs an async body to stream it.
+    """
+    if fmt == "csv":
+        body = csv_lines(items, fields)
+    else:
+        body = ndjson_lines(items)
+
+    if asynchronous:
+        body = async_lines(body)
+
+    response = StreamingHttpResponse(body, content_type=CONTENT_TYPES[fmt])
+    if fmt == "csv":
+        response["Content-Disposition"] = f'attachment; filename="{filename}.csv"'
+    return response
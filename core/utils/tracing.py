@@ -0,0 +1,183 @@
+import functools
+import threading
+import time
+from contextvars import ContextVar
+
+# Upper bounds (milliseconds) of the span histogram buckets.
+SPAN_BUCKETS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+
+_current = ContextVar("trace", default=None)
+
+_lock = threading.Lock()
+_histograms = {}
+
+
+class Trace:
+    """
+    Per-request span totals: {name: (total_ms, count)}. Spans running
+    concurrently (e.g. NSE and Yahoo) each add their own duration.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.spans = {}
+        self._lock = threading.Lock()
+
+    def add(self, name, ms):
+        with self._lock:
+            total, count = self.spans.get(name, (0.0, 0))
+            self.spans[name] = (total + ms, count + 1)
+
+    def elapsed_ms(self):
+        return (time.perf_counter() - self.started) * 1000
+
+    def summary(self):
+        with self._lock:
+            spans = dict(self.spans)
+
+        return {
+            "total_ms": round(self.elapsed_ms(), 3),
+            "spans": {
+                name: {"ms": round(total, 3), "count": count}
+                for name, (total, count) in spans.items()
+            },
+        }
+
+    def server_timing(self):
+        """
+        Server-Timing header value, one metric per span name.
+        """
+        with self._lock:
+            spans = dict(self.spans)
+
+        metrics = [
+            f'{name};dur={total:.1f};desc="x{count}"'
+            for name, (total, count) in spans.items()
+        ]
+        metrics.append(f"total;dur={self.elapsed_ms():.1f}")
+        return ", ".join(metrics)
+
+
+class _Span:
+    __slots__ = ("trace", "name", "started")
+
+    def __init__(self, trace, name):
+        self.trace = trace
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        ms = (time.perf_counter() - self.started) * 1000
+        self.trace.add(self.name, ms)
+        observe(self.name, ms)
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+
+_NOOP = _NoopSpan()
+
+
+def span(name):
+    """
+    Times a block into the current trace and the process histograms.
+    Outside a trace it is a shared no-op (one ContextVar lookup).
+    """
+    trace = _current.get()
+    if trace is None:
+        return _NOOP
+    return _Span(trace, name)
+
+
+def traced(name):
+    """
+    Decorator form of span().
+    """
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            trace = _current.get()
+            if trace is None:
+                return fn(*args, **kwargs)
+            with _Span(trace, name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def start_trace():
+    """
+    Starts a trace in the current context. Returns (trace, token); pass
+    the token to end_trace().
+    """
+    trace = Trace()
+    return trace, _current.set(trace)
+
+
+def resume_trace(trace):
+    """
+    Makes an existing trace current again, e.g. while a streamed body is
+    produced after the view has returned. Returns a token for end_trace().
+    """
+    return _current.set(trace)
+
+
+def end_trace(token):
+    _current.reset(token)
+
+
+def current_trace():
+    return _current.get()
+
+
+def observe(name, ms):
+    with _lock:
+        entry = _histograms.get(name)
+        if entry is None:
+            entry = _histograms[name] = {
+                "count": 0,
+                "total_ms": 0.0,
+                "max_ms": 0.0,
+                "buckets": [0] * (len(SPAN_BUCKETS) + 1),
+            }
+
+        entry["count"] += 1
+        entry["total_ms"] += ms
+        entry["max_ms"] = max(entry["max_ms"], ms)
+
+        for i, bound in enumerate(SPAN_BUCKETS):
+            if ms <= bound:
+                entry["buckets"][i] += 1
+                break
+        else:
+            entry["buckets"][-1] += 1
+
+
+def histograms():
+    labels = [str(b) for b in SPAN_BUCKETS] + ["+Inf"]
+
+    with _lock:
+        return {
+            name: {
+                "count": entry["count"],
+                "avg_ms": round(entry["total_ms"] / entry["count"], 3),
+                "max_ms": round(entry["max_ms"], 3),
+                "buckets": dict(zip(labels, entry["buckets"])),
+            }
+            for name, entry in _histograms.items()
+        }
+
+
+def reset():
+    with _lock:
+        _histograms.clear()
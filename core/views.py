@@ -1,7 +1,32 @@
-from decimal import Decimal
-from rest_framework.decorators import api_view
+from datetime import datetime
+from rest_framework.decorators import api_view, renderer_classes
+from rest_framework.settings import api_settings
 from rest_framework.response import Response
-from core.services.returns import calculate_portfolio_return
+from django.conf import settings
+from django.utils.cache import patch_cache_control
+from django.utils.http import parse_etags
+from core.models import StalePriceError
+from core.renderers import CSVRenderer, NDJSONRenderer
+from core.services.returns import HOLDING_FIELDS, Summary, parse_shares
+from core.services.returns import calculate_holdings_returns, iter_holdings_returns
+from core.services.returns_cache import etag, get_portfolio_return, is_cacheable
+from core.services.series import FREQUENCIES, get_price_series
+from core.services.screener import ROW_FIELDS, SORT_KEYS, get_screener, ranked_rows, top_movers
+from core.services import bhavcopy_cache
+from core.services import nse_price_provider
+from core.utils import tracing
+from core.utils.streaming import FORMATS, is_asgi, streaming_response
+
+MAX_HOLDINGS = 1000
+MAX_SCREENER_ROWS = 500
+
+# ?format=ndjson / ?format=csv stream results as they are computed.
+MAX_STREAMED_HOLDINGS = 50_000
+STREAM_BATCH_SIZE = 250
+STREAMING_RENDERERS = api_settings.DEFAULT_RENDERER_CLASSES + [
+    NDJSONRenderer,
+    CSVRenderer,
+]
 
 
 @api_view(["GET"])
@@ -10,19 +35,260 @@ def returns_api(request):
     start = request.GET.get("from")
     end = request.GET.get("to")
 
-    shares = Decimal(request.GET.get("shares", "1"))
-
     if not symbol or not start or not end:
         return Response(
             {"error": "symbol, from, to are required"},
             status=400
         )
 
-    result = calculate_portfolio_return(
-        symbol=symbol,
+    try:
+        shares = parse_shares(request.GET.get("shares", "1"))
+        for value in (start, end):
+            datetime.strptime(value, "%Y-%m-%d")
+    except ValueError as exc:
+        return Response({"error": str(exc)}, status=400)
+
+    try:
+        if not is_cacheable(start, end):
+            result = get_portfolio_return(symbol, start, end, shares)
+            response = Response(result)
+            patch_cache_control(response, no_cache=True)
+            return response
+
+        tag = etag(symbol.upper().strip(), start, end, shares)
+
+        if _etag_matches(tag, request.headers.get("If-None-Match", "")):
+            response = Response(status=304)
+        else:
+            response = Response(get_portfolio_return(symbol, start, end, shares))
+
+    # A close too old to use (delisted / suspended), or none at all.
+    except StalePriceError as exc:
+        return Response({"error": str(exc)}, status=422)
+    except ValueError as exc:
+        return Response({"error": str(exc)}, status=404)
+
+    response["ETag"] = tag
+    patch_cache_control(
+        response,
+        public=True,
+        max_age=getattr(settings, "RETURNS_HTTP_MAX_AGE", 3600),
+    )
+    return response
+
+
+def _etag_matches(tag, header):
+    """
+    If-None-Match check (weak comparison, RFC 9110): "*" or any listed
+    entity-tag equal to tag once a W/ prefix is removed.
+    """
+    etags = parse_etags(header)
+    if etags == ["*"]:
+        return True
+
+    return any(
+        (etag[2:] if etag.startswith("W/") else etag) == tag for etag in etags
+    )
+
+
+@api_view(["POST"])
+@renderer_classes(STREAMING_RENDERERS)
+def portfolio_returns_api(request):
+    """
+    Body: {"from": "YYYY-MM-DD", "to": "YYYY-MM-DD",
+           "holdings": [{"symbol": "INFY", "shares": 10,
+                         "buy_date": "YYYY-MM-DD"}, ...]}
+    "from" is only required for holdings without a buy_date.
+    With ?format=ndjson (one holding per line, then the summary) or
+    ?format=csv the results are streamed as they are computed.
+    """
+    fmt = request.query_params.get("format")
+    streamed = fmt in FORMATS
+    max_holdings = MAX_STREAMED_HOLDINGS if streamed else MAX_HOLDINGS
+
+    start = request.data.get("from")
+    end = request.data.get("to")
+    holdings = request.data.get("holdings")
+
+    if not end or not isinstance(holdings, list) or not holdings:
+        return Response(
+            {"error": "to and a non-empty holdings list are required"},
+            status=400
+        )
+
+    if len(holdings) > max_holdings:
+        return Response(
+            {"error": f"at most {max_holdings} holdings per request"},
+            status=400
+        )
+
+    # Each holding is validated on its own and an invalid one comes back
+    # as an error result; only the request-wide dates fail the request.
+    try:
+        for value in (start, end):
+            if value:
+                datetime.strptime(value, "%Y-%m-%d")
+    except (ValueError, TypeError):
+        return Response(
+            {"error": "from and to must be YYYY-MM-DD"},
+            status=400
+        )
+
+    if streamed:
+        return streaming_response(
+            fmt,
+            _stream_holdings(holdings, start, end, summary=fmt == "ndjson"),
+            HOLDING_FIELDS,
+            filename="portfolio",
+            asynchronous=is_asgi(request),
+        )
+
+    result = calculate_holdings_returns(
+        holdings=holdings,
         start_date=start,
         end_date=end,
-        initial_shares=shares,
     )
 
     return Response(result)
+
+
+@api_view(["GET"])
+def series_api(request):
+    symbol = request.GET.get("symbol")
+    start = request.GET.get("from")
+    end = request.GET.get("to")
+    freq = request.GET.get("freq", "daily")
+
+    if not symbol or not start or not end:
+        return Response(
+            {"error": "symbol, from, to are required"},
+            status=400
+        )
+
+    if freq not in FREQUENCIES:
+        return Response(
+            {"error": f"freq must be one of {', '.join(FREQUENCIES)}"},
+            status=400
+        )
+
+    try:
+        start_date = datetime.strptime(start, "%Y-%m-%d").date()
+        end_date = datetime.strptime(end, "%Y-%m-%d").date()
+        points = int(request.GET.get("points", "500"))
+    except ValueError:
+        return Response(
+            {"error": "from/to must be YYYY-MM-DD and points an integer"},
+            status=400
+        )
+
+    result = get_price_series(symbol, start_date, end_date, freq, points)
+
+    if result is None:
+        return Response(
+            {"error": f"No stored prices for {symbol} in range"},
+            status=404
+        )
+
+    return Response(result)
+
+
+def _stream_holdings(holdings, start, end, summary):
+    totals = Summary()
+
+    for result in iter_holdings_returns(holdings, start, end, STREAM_BATCH_SIZE):
+        totals.add(result)
+        yield result
+
+    if summary:
+        yield {"to": end, "summary": totals.as_dict()}
+
+
+@api_view(["GET"])
+@renderer_classes(STREAMING_RENDERERS)
+def screener_api(request):
+    """
+    Best and worst `limit` symbols between two dates by total return
+    (dividends included), or by `sort` (one of SORT_KEYS).
+    With ?format=ndjson / ?format=csv every symbol is streamed, best
+    first (the first `limit` only, when given).
+    """
+    start = request.GET.get("from")
+    end = request.GET.get("to")
+    sort = request.GET.get("sort", "total_return_pct")
+    fmt = request.GET.get("format")
+    streamed = fmt in FORMATS
+
+    if not start or not end:
+        return Response(
+            {"error": "from, to are required"},
+            status=400
+        )
+
+    if sort not in SORT_KEYS:
+        return Response(
+            {"error": f"sort must be one of {', '.join(SORT_KEYS)}"},
+            status=400
+        )
+
+    try:
+        for value in (start, end):
+            datetime.strptime(value, "%Y-%m-%d")
+        limit = int(request.GET.get("limit", "0" if streamed else "20"))
+    except ValueError:
+        return Response(
+            {"error": "from/to must be YYYY-MM-DD and limit an integer"},
+            status=400
+        )
+
+    if streamed and limit < 0 or not streamed and not 1 <= limit <= MAX_SCREENER_ROWS:
+        return Response(
+            {"error": f"limit must be between 1 and {MAX_SCREENER_ROWS}"},
+            status=400
+        )
+
+    try:
+        result = get_screener(start, end)
+    except ValueError as exc:
+        return Response({"error": str(exc)}, status=404)
+
+    if streamed:
+        return streaming_response(
+            fmt,
+            ranked_rows(result, sort, limit),
+            ROW_FIELDS,
+            filename=f"screener-{start}-{end}",
+            asynchronous=is_asgi(request),
+        )
+
+    best, worst = top_movers(result, limit, sort)
+
+    return Response({
+        "from": result["from"],
+        "to": result["to"],
+        "from_session": result["from_session"],
+        "to_session": result["to_session"],
+        "symbols": len(result["rows"]),
+        "sort": sort,
+        "best": best,
+        "worst": worst,
+    })
+
+
+@api_view(["GET"])
+def metrics_api(request):
+    """
+    In-process counters: span / request latency histograms, bhavcopy
+    cache stats and the NSE HTTP client. Per worker process; staff only
+    unless DEBUG.
+    """
+    if not settings.DEBUG and not request.user.is_staff:
+        return Response(
+            {"error": "metrics are restricted to staff"},
+            status=403
+        )
+
+    return Response({
+        "spans": tracing.histograms(),
+        "bhavcopy_cache": bhavcopy_cache.cache_stats(),
+        "http": {"nse": nse_price_provider.client.metrics()},
+    })
@@ -10,7 +10,9 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/6.0/ref/settings/
 """
 
+import os
 from pathlib import Path
+from django.core.exceptions import ImproperlyConfigured
 from corsheaders.defaults import default_headers
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -48,6 +50,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.TimingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -91,12 +94,83 @@ WSGI_APPLICATION = 'stockengine.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/6.0/ref/settings/#databases
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+#
+# DB_ENGINE picks the profile:
+#   sqlite    single-node default. WAL lets API reads run while an import
+#             holds the write lock; IMMEDIATE transactions queue writers
+#             on the busy timeout instead of failing mid-transaction.
+#   mysql     persistent connections (DB_CONN_MAX_AGE), one per worker
+#             thread, so gunicorn workers x threads is the pool size.
+#   postgres  persistent connections, or psycopg's connection pool when
+#             DB_POOL_MAX_SIZE > 0 (a pooled database cannot also use
+#             CONN_MAX_AGE).
+#
+# requirements.txt covers the sqlite and mysql profiles. The postgres
+# driver is an optional dependency, installed only where that profile is
+# used: pip install "psycopg[binary,pool]" (the pool extra is only
+# needed with DB_POOL_MAX_SIZE > 0).
+
+DB_ENGINE = os.environ.get("DB_ENGINE", "sqlite")
+DB_CONN_MAX_AGE = int(os.environ.get("DB_CONN_MAX_AGE", "600"))
+DB_POOL_MIN_SIZE = int(os.environ.get("DB_POOL_MIN_SIZE", "2"))
+DB_POOL_MAX_SIZE = int(os.environ.get("DB_POOL_MAX_SIZE", "0"))
+DB_SQLITE_WAL = os.environ.get("DB_SQLITE_WAL", "1") == "1"
+
+if DB_ENGINE == "sqlite":
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.environ.get("DB_NAME", BASE_DIR / 'db.sqlite3'),
+            'OPTIONS': {
+                'init_command': (
+                    "PRAGMA journal_mode=WAL; PRAGMA synchronous=NORMAL;"
+                    if DB_SQLITE_WAL else "PRAGMA journal_mode=DELETE;"
+                ),
+                'transaction_mode': 'IMMEDIATE',
+                'timeout': 20,
+            },
+        }
     }
-}
+
+elif DB_ENGINE in ("mysql", "postgres"):
+    DATABASES = {
+        'default': {
+            'ENGINE': (
+                'django.db.backends.mysql' if DB_ENGINE == "mysql"
+                else 'django.db.backends.postgresql'
+            ),
+            'NAME': os.environ.get("DB_NAME", "stockengine"),
+            'USER': os.environ.get("DB_USER", ""),
+            'PASSWORD': os.environ.get("DB_PASSWORD", ""),
+            'HOST': os.environ.get("DB_HOST", "localhost"),
+            'PORT': os.environ.get("DB_PORT", ""),
+            'CONN_MAX_AGE': DB_CONN_MAX_AGE,
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {},
+        }
+    }
+
+    if DB_ENGINE == "mysql":
+        DATABASES['default']['OPTIONS'] = {
+            'charset': 'utf8mb4',
+            'isolation_level': 'read committed',
+            'init_command': "SET sql_mode='STRICT_TRANS_TABLES'",
+        }
+
+    elif DB_POOL_MAX_SIZE:
+        DATABASES['default']['CONN_MAX_AGE'] = 0
+        DATABASES['default']['OPTIONS'] = {
+            'pool': {
+                'min_size': DB_POOL_MIN_SIZE,
+                'max_size': DB_POOL_MAX_SIZE,
+                'timeout': 10,
+            },
+        }
+
+else:
+    raise ImproperlyConfigured(
+        f"DB_ENGINE must be sqlite, mysql or postgres, not {DB_ENGINE!r}"
+    )
 
 
 # Password validation
@@ -138,6 +212,89 @@ STATIC_ROOT = BASE_DIR / "staticfiles"
 MEDIA_ROOT = BASE_DIR / "media"
 MEDIA_URL = "/media/"
 
+# Request tracing
+# Per-stage spans (network, parse, DB, compute) in a Server-Timing header
+# and /api/metrics/ histograms. When off, ?debug=timing still traces
+# that one request.
+
+TRACING_ENABLED = True
+
+# Caches
+# "returns" holds per-share /api/returns/ results. Both are per-process
+# by default; point them at a shared backend (e.g. FileBasedCache with a
+# directory LOCATION) to share results and data versions across workers.
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "default",
+    },
+    "returns": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "returns",
+        "TIMEOUT": 24 * 3600,
+        "OPTIONS": {"MAX_ENTRIES": 50_000},
+    },
+}
+
+RETURNS_CACHE_ALIAS = "returns"
+
+# Cache-Control max-age for /api/returns/ responses whose dates are both
+# in the past (seconds).
+
+RETURNS_HTTP_MAX_AGE = 3600
+
+# NSE bhavcopy cache
+# Raw archives are kept on disk (content-addressed, LRU-evicted); parsed
+# DataFrames and per-date symbol -> OHLCV snapshots are kept in small
+# per-process LRUs.
+
+BHAVCOPY_CACHE_DIR = BASE_DIR / "cache" / "bhavcopy"
+BHAVCOPY_CACHE_MAX_BYTES = 512 * 1024 * 1024
+BHAVCOPY_FRAME_CACHE_SIZE = 32
+BHAVCOPY_SNAPSHOT_CACHE_SIZE = 256
+BHAVCOPY_NEGATIVE_TTL = 3600
+
+# Stored closes older than this many days before the requested date are
+# not used; the symbol is reported as delisted or suspended unless the
+# network has a price.
+
+PRICE_MAX_STALENESS_DAYS = 30
+
+# Network price resolution (seconds)
+# Yahoo is started as a hedge when NSE has not answered within
+# PRICE_HEDGE_DELAY; each provider is abandoned after its deadline.
+
+PRICE_NSE_DEADLINE = 20
+PRICE_YAHOO_DEADLINE = 15
+PRICE_HEDGE_DELAY = 3
+
+# NSE archive HTTP client
+# Exponential backoff on 429/5xx; after NSE_BREAKER_THRESHOLD consecutive
+# failures the circuit opens for NSE_BREAKER_COOLDOWN seconds.
+
+NSE_ARCHIVE_BASE_URL = "https://archives.nseindia.com/content/cm/"
+NSE_HTTP_POOL_SIZE = 16
+NSE_HTTP_MAX_CONCURRENCY = 4
+NSE_HTTP_RETRIES = 3
+NSE_HTTP_BACKOFF = 0.5
+NSE_BREAKER_THRESHOLD = 5
+NSE_BREAKER_COOLDOWN = 300
+
+# Columnar price store (see `manage.py build_price_store`)
+
+PRICE_STORE_DIR = BASE_DIR / "cache" / "price_store"
+
+# Cached /api/series/ payloads (seconds); entries are also dropped as
+# soon as the symbol's prices or corporate actions change.
+
+SERIES_CACHE_TTL = 3600
+
+# Cached /api/screener/ results per (from, to) (seconds); dropped as soon
+# as any symbol's prices or corporate actions change.
+
+SCREENER_CACHE_TTL = 3600
+
 CSRF_TRUSTED_ORIGINS = [
     "http://localhost:5173",
     "https://stockreturns.in",
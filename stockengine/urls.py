@@ -1,8 +1,13 @@
 from django.contrib import admin
 from django.urls import path
-from core.views import returns_api
+from core.views import returns_api, portfolio_returns_api, series_api
+from core.views import screener_api, metrics_api
 
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("api/returns/", returns_api),
+    path("api/portfolio/returns/", portfolio_returns_api),
+    path("api/series/", series_api),
+    path("api/screener/", screener_api),
+    path("api/metrics/", metrics_api),
 ]